@@ -9,16 +9,25 @@ Usage:
     python3 brain_server.py --port 9200
 """
 
+import asyncio
+import hashlib
+import http.client
+import inspect
 import json
 import os
 import re
+import shutil
+import socket
 import subprocess
 import sys
+import threading
 import time
 import traceback
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from collections import OrderedDict, deque
+from http import HTTPStatus
+from itertools import islice
 from pathlib import Path
-from urllib.parse import quote as url_quote
+from urllib.parse import quote as url_quote, urlsplit
 
 try:
     import requests
@@ -26,6 +35,67 @@ try:
 except ImportError:
     HAS_REQUESTS = False
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    import uvloop
+    HAS_UVLOOP = True
+except ImportError:
+    HAS_UVLOOP = False
+
+try:
+    import msgpack
+    HAS_MSGPACK = True
+except ImportError:
+    HAS_MSGPACK = False
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+    HAS_SELECTOLAX = True
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser  # selectolax < 1.0
+        HAS_SELECTOLAX = True
+    except ImportError:
+        HAS_SELECTOLAX = False
+
+try:
+    import ahocorasick
+    HAS_AHOCORASICK = True
+except ImportError:
+    HAS_AHOCORASICK = False
+
+try:
+    import hyperscan
+    HAS_HYPERSCAN = True
+except ImportError:
+    HAS_HYPERSCAN = False
+
+
+def json_loads(data):
+    """Parse JSON from str or bytes (orjson when available)."""
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_bytes(obj, pretty: bool = False) -> bytes:
+    """Serialize obj to UTF-8 JSON bytes (orjson when available)."""
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else None)
+    return json.dumps(obj, indent=2 if pretty else None).encode()
+
+
+def json_dumps(obj, pretty: bool = False) -> str:
+    """Serialize obj to a JSON str (orjson when available)."""
+    if HAS_ORJSON:
+        return json_bytes(obj, pretty).decode()
+    return json.dumps(obj, indent=2 if pretty else None)
+
 # ---------------------------------------------------------------------------
 # Configuration
 # ---------------------------------------------------------------------------
@@ -33,6 +103,10 @@ except ImportError:
 DEFAULT_PORT = 9200
 CLAUDE_MODEL = "sonnet"
 MAX_HISTORY = 20
+# Conversation history survives restarts when set; *.msgpack paths use msgpack
+HISTORY_FILE = os.environ.get("BRAIN_HISTORY_FILE", "")
+KEEPALIVE_IDLE_TIMEOUT = 15  # seconds an idle keep-alive connection is held open
+MAX_INPUT_CHARS = 4096  # longer queries are rejected before any regex or Claude call
 HOME = os.path.expanduser("~")
 
 # Ollama config for local model proactive insights
@@ -40,6 +114,11 @@ OLLAMA_URL = os.environ.get("OLLAMA_URL", "http://localhost:11434")
 OLLAMA_MODEL = os.environ.get("OLLAMA_MODEL", "phi3:mini")
 USE_LOCAL_MODEL = os.environ.get("USE_LOCAL_MODEL", "false") == "true"
 
+# Timer-driven dashboard/proactive prompts repeat; reuse recent model answers
+RESPONSE_CACHE_TTL = 180  # seconds
+RESPONSE_CACHE_MAX = 128
+QUERY_CACHE_TTL = 30  # seconds; omnibar answers go stale faster than proactive ones
+
 BRAIN_SYSTEM_PROMPT = """You are the brain of AetherOS, a generative AI-native operating system built by Aeternum Labs. You run inside the OS. The user types natural language into the omni-bar and you respond with exactly what they need.
 
 You are NOT a chatbot — you ARE the operating system's intelligence.
@@ -63,27 +142,88 @@ Be direct, helpful, and concise. You are the OS — act like it. No emoji unless
 # Tool implementations (executed locally before calling Claude)
 # ---------------------------------------------------------------------------
 
-def tool_weather(location: str) -> dict:
-    """Fetch weather data from wttr.in."""
+# One pooled session for wttr.in, web fetches and Ollama, so repeat calls
+# reuse their TCP/TLS connection instead of handshaking every time.
+if HAS_REQUESTS:
+    from requests.adapters import HTTPAdapter
+    _SESSION = requests.Session()
+    _SESSION.headers.update({"User-Agent": "AetherOS-Brain/0.3"})
+    _adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+    _SESSION.mount("http://", _adapter)
+    _SESSION.mount("https://", _adapter)
+
+# Short-lived response caches: repeated "weather in X" queries and the
+# proactive loop would otherwise refetch identical data every time.
+WEATHER_TTL = 600    # seconds
+WEB_FETCH_TTL = 300
+_CACHE_MAX_ENTRIES = 256
+_weather_cache: dict = {}
+_web_fetch_cache: dict = {}
+
+
+def _cache_get(cache: dict, key: str, ttl: float):
+    hit = cache.get(key)
+    if hit and time.monotonic() - hit[0] < ttl:
+        return hit[1]
+    return None
+
+
+def _cache_put(cache: dict, key: str, value: dict):
+    cache.pop(key, None)
+    if len(cache) >= _CACHE_MAX_ENTRIES:
+        del cache[next(iter(cache))]  # oldest insertion
+    cache[key] = (time.monotonic(), value)
+
+
+async def run_process(*argv: str, timeout: float, shell: bool = False) -> tuple:
+    """Run a subprocess on the event loop instead of blocking a thread on it.
+
+    Returns (returncode, stdout, stderr). Raises asyncio.TimeoutError after
+    killing the process if it runs longer than timeout.
+    """
+    if shell:
+        proc = await asyncio.create_subprocess_shell(
+            argv[0], stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+    else:
+        proc = await asyncio.create_subprocess_exec(
+            *argv, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        raise
+    return proc.returncode, stdout.decode(errors="replace"), stderr.decode(errors="replace")
+
+
+async def tool_weather(location: str) -> dict:
+    """Fetch weather data from wttr.in (cached for WEATHER_TTL seconds)."""
+    key = location.strip().lower()
+    cached = _cache_get(_weather_cache, key, WEATHER_TTL)
+    if cached is not None:
+        return cached
+    result = await _fetch_weather(location)
+    if result["ok"]:
+        _cache_put(_weather_cache, key, result)
+    return result
+
+
+async def _fetch_weather(location: str) -> dict:
+    url = f"https://wttr.in/{url_quote(location)}?format=j1"
     try:
         if HAS_REQUESTS:
-            resp = requests.get(
-                f"https://wttr.in/{url_quote(location)}?format=j1",
-                timeout=10,
-                headers={"User-Agent": "AetherOS-Brain/0.3"}
-            )
+            resp = await asyncio.to_thread(_SESSION.get, url, timeout=10)
             if resp.status_code == 200:
-                return {"ok": True, "data": resp.json()}
+                return {"ok": True, "data": json_loads(resp.content)}
             return {"ok": False, "error": f"HTTP {resp.status_code}"}
         else:
-            result = subprocess.run(
-                ["curl", "-sf", f"https://wttr.in/{url_quote(location)}?format=j1",
-                 "-H", "User-Agent: AetherOS-Brain/0.3"],
-                capture_output=True, text=True, timeout=10
-            )
-            if result.returncode == 0:
-                return {"ok": True, "data": json.loads(result.stdout)}
+            returncode, stdout, _ = await run_process(
+                "curl", "-sf", url, "-H", "User-Agent: AetherOS-Brain/0.3", timeout=10)
+            if returncode == 0:
+                return {"ok": True, "data": json_loads(stdout)}
             return {"ok": False, "error": "fetch failed"}
+    except asyncio.TimeoutError:
+        return {"ok": False, "error": "fetch timed out"}
     except Exception as e:
         return {"ok": False, "error": str(e)}
 
@@ -93,12 +233,22 @@ def tool_read_file(path: str, max_lines: int = 100) -> dict:
         p = Path(path).expanduser().resolve()
         if not p.exists():
             return {"ok": False, "error": f"File not found: {path}"}
-        text = p.read_text(errors="replace")
-        lines = text.splitlines()
-        truncated = len(lines) > max_lines
-        if truncated:
-            lines = lines[:max_lines]
-        return {"ok": True, "path": str(p), "lines": lines, "total_lines": len(text.splitlines()), "truncated": truncated}
+        # Decode only the first max_lines; the rest is just newline-counted
+        lines = []
+        last = b""
+        with p.open("rb") as f:
+            for last in f:
+                lines.append(last.decode(errors="replace").rstrip("\r\n"))
+                if len(lines) >= max_lines:
+                    break
+            # Only the final line read can lack its newline
+            newlines = len(lines) - (1 if last and not last.endswith(b"\n") else 0)
+            while chunk := f.read(1 << 20):
+                newlines += chunk.count(b"\n")
+                last = chunk
+        total = newlines + (1 if last and not last.endswith(b"\n") else 0)
+        truncated = total > max_lines
+        return {"ok": True, "path": str(p), "lines": lines, "total_lines": total, "truncated": truncated}
     except Exception as e:
         return {"ok": False, "error": str(e)}
 
@@ -113,25 +263,75 @@ def tool_write_file(path: str, content: str) -> dict:
         return {"ok": False, "error": str(e)}
 
 
+_SEARCH_EXTENSIONS = (".txt", ".md", ".py", ".rs", ".toml", ".json", ".yaml", ".yml", ".sh")
+_SEARCH_TIMEOUT = 10  # seconds
+_SEARCH_MAX_RESULTS = 20
+
+
+def _walk_files(root: str, max_depth, deadline: float):
+    """Yield os.DirEntry for regular files under root, like `find -type f`.
+
+    Symlinks are not followed. max_depth=None walks the whole tree.
+    Raises TimeoutError once deadline (time.monotonic) passes.
+    """
+    stack = [(root, 0)]
+    while stack:
+        if time.monotonic() > deadline:
+            raise TimeoutError
+        directory, depth = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if max_depth is None or depth + 1 < max_depth:
+                                stack.append((entry.path, depth + 1))
+                        elif entry.is_file(follow_symlinks=False):
+                            yield entry
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+
+
+def _file_contains(path: str, needle: bytes, chunk_size: int = 1 << 20) -> bool:
+    """Streamed substring test that stops at the first hit (`grep -l -m 1`)."""
+    overlap = len(needle) - 1
+    tail = b""
+    try:
+        with open(path, "rb") as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    return False
+                if needle in tail + chunk[:overlap] or needle in chunk:
+                    return True
+                tail = chunk[-overlap:] if overlap else b""
+    except OSError:
+        return False
+
+
 def tool_search_files(query: str, path: str = "~", by_name: bool = False) -> dict:
     try:
         search_dir = str(Path(path).expanduser().resolve())
+        deadline = time.monotonic() + _SEARCH_TIMEOUT
+        files = []
         if by_name:
-            result = subprocess.run(
-                ["find", search_dir, "-maxdepth", "4", "-name", f"*{query}*", "-type", "f"],
-                capture_output=True, text=True, timeout=10
-            )
+            needle = query.lower()
+            for entry in _walk_files(search_dir, 4, deadline):
+                if needle in entry.name.lower():
+                    files.append(entry.path)
+                    if len(files) >= _SEARCH_MAX_RESULTS:
+                        break
         else:
-            result = subprocess.run(
-                ["grep", "-rl", "-m", "1", query, search_dir,
-                 "--include=*.txt", "--include=*.md", "--include=*.py",
-                 "--include=*.rs", "--include=*.toml", "--include=*.json",
-                 "--include=*.yaml", "--include=*.yml", "--include=*.sh"],
-                capture_output=True, text=True, timeout=10
-            )
-        files = [f for f in result.stdout.strip().split("\n") if f][:20]
+            needle = query.encode()
+            for entry in _walk_files(search_dir, None, deadline):
+                if entry.name.endswith(_SEARCH_EXTENSIONS) and _file_contains(entry.path, needle):
+                    files.append(entry.path)
+                    if len(files) >= _SEARCH_MAX_RESULTS:
+                        break
         return {"ok": True, "files": files, "count": len(files)}
-    except subprocess.TimeoutExpired:
+    except TimeoutError:
         return {"ok": False, "error": "Search timed out", "files": []}
     except Exception as e:
         return {"ok": False, "error": str(e)}
@@ -142,81 +342,158 @@ def tool_list_files(path: str = "~") -> dict:
         p = Path(path).expanduser().resolve()
         if not p.is_dir():
             return {"ok": False, "error": f"Not a directory: {path}"}
+        # Sort names from a single readdir, then stat only the 50 we return
+        with os.scandir(p) as it:
+            dir_entries = sorted(it, key=lambda e: e.name)
+        strftime, localtime = time.strftime, time.localtime
         entries = []
-        for entry in sorted(p.iterdir()):
+        for entry in dir_entries:
             try:
                 stat = entry.stat()
                 entries.append({
                     "name": entry.name + ("/" if entry.is_dir() else ""),
                     "size": stat.st_size,
-                    "modified": time.strftime("%Y-%m-%d %H:%M", time.localtime(stat.st_mtime))
+                    "modified": strftime("%Y-%m-%d %H:%M", localtime(stat.st_mtime))
                 })
             except (PermissionError, OSError):
                 continue
-        return {"ok": True, "path": str(p), "entries": entries[:50]}
+            if len(entries) == 50:
+                break
+        return {"ok": True, "path": str(p), "entries": entries}
     except Exception as e:
         return {"ok": False, "error": str(e)}
 
 
+def _human_size(n: float) -> str:
+    """Format a byte count like `df -h` (1024-based, one decimal below 10)."""
+    for unit in "BKMGTP":
+        if n < 1024 or unit == "P":
+            break
+        n /= 1024
+    if unit == "B":
+        return f"{int(n)}"
+    return f"{n:.1f}{unit}" if n < 10 else f"{n:.0f}{unit}"
+
+
+def _primary_ip() -> str:
+    """Address of the default-route interface (first field of `hostname -I`)."""
+    try:
+        # connect() on a UDP socket only selects a route; nothing is sent
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.connect(("10.255.255.255", 1))
+            return sock.getsockname()[0]
+    except OSError:
+        return "N/A"
+
+
+def _meminfo_kb(buf: bytes, key: bytes):
+    """Value in kB of a /proc/meminfo field such as b"MemTotal:", or None."""
+    i = buf.find(key)
+    if i < 0:
+        return None
+    start = i + len(key)
+    end = buf.find(b"\n", start)
+    return int(buf[start:end if end >= 0 else None].split()[0])
+
+
+# Small /proc files polled on every system-info call stay open; procfs
+# regenerates their content on each pread at offset 0.
+_PROC_FDS: dict = {}
+
+
+def _read_proc(path: str, size: int = 256) -> bytes:
+    fd = _PROC_FDS.get(path)
+    if fd is None:
+        new_fd = os.open(path, os.O_RDONLY | os.O_CLOEXEC)
+        fd = _PROC_FDS.setdefault(path, new_fd)
+        if fd != new_fd:
+            # Another executor thread opened it first: keep theirs
+            os.close(new_fd)
+    return os.pread(fd, size, 0)
+
+
 def tool_system_info() -> dict:
     info = {}
     try:
-        with open("/proc/uptime") as f:
-            secs = int(float(f.read().split()[0]))
-            mins, s = divmod(secs, 60)
-            hours, mins = divmod(mins, 60)
-            info["uptime"] = f"{hours}h {mins}m {s}s" if hours else f"{mins}m {s}s"
-        with open("/proc/meminfo") as f:
-            for line in f:
-                if line.startswith("MemTotal:"):
-                    info["mem_total_mb"] = int(line.split()[1]) // 1024
-                elif line.startswith("MemAvailable:"):
-                    info["mem_avail_mb"] = int(line.split()[1]) // 1024
-        with open("/proc/cpuinfo") as f:
-            info["cores"] = sum(1 for line in f if line.startswith("processor"))
-        with open("/proc/loadavg") as f:
-            info["load"] = f.read().split()[:3]
-        result = subprocess.run(["df", "-h", "/"], capture_output=True, text=True, timeout=5)
-        if result.returncode == 0:
-            parts = result.stdout.strip().split("\n")[-1].split()
-            info["disk"] = f"{parts[2]}/{parts[1]} ({parts[4]})"
-        result = subprocess.run(["hostname", "-I"], capture_output=True, text=True, timeout=5)
-        if result.returncode == 0:
-            info["ip"] = result.stdout.strip().split()[0] if result.stdout.strip() else "N/A"
+        secs = int(float(_read_proc("/proc/uptime").split(None, 1)[0]))
+        mins, s = divmod(secs, 60)
+        hours, mins = divmod(mins, 60)
+        info["uptime"] = f"{hours}h {mins}m {s}s" if hours else f"{mins}m {s}s"
+        buf = _read_proc("/proc/meminfo", 16384)
+        for key, field in ((b"MemTotal:", "mem_total_mb"), (b"MemAvailable:", "mem_avail_mb")):
+            value = _meminfo_kb(buf, key)
+            if value is not None:
+                info[field] = value // 1024
+        with open("/proc/cpuinfo", "rb") as f:
+            buf = f.read()
+        # One C-level scan instead of a Python loop over every cpuinfo line
+        info["cores"] = buf.count(b"\nprocessor") + buf.startswith(b"processor")
+        info["load"] = [v.decode() for v in _read_proc("/proc/loadavg").split()[:3]]
+        total, used, free = shutil.disk_usage("/")
+        # Same figures as `df -h /`: use% is used / (used + available), rounded up
+        pct = -(-used * 100 // (used + free)) if used + free else 0
+        info["disk"] = f"{_human_size(used)}/{_human_size(total)} ({pct}%)"
+        info["ip"] = _primary_ip()
     except Exception as e:
         info["error"] = str(e)
     return {"ok": True, **info}
 
 
-def tool_web_fetch(url: str) -> dict:
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+_WHITESPACE_RE = re.compile(r'\s+')
+WEB_FETCH_MAX_CHARS = 4000
+
+
+def html_to_text(html: str) -> str:
+    """Readable text of a page, at most WEB_FETCH_MAX_CHARS long.
+
+    With selectolax the page is parsed and script/style bodies dropped
+    before truncating; otherwise tags are stripped with regexes.
+    """
+    if HAS_SELECTOLAX:
+        tree = HTMLParser(html)
+        for tag in tree.css("script, style"):
+            tag.decompose()
+        text = tree.text(separator=" ")
+    else:
+        text = _HTML_TAG_RE.sub(' ', html[:WEB_FETCH_MAX_CHARS])
+    return _WHITESPACE_RE.sub(' ', text).strip()[:WEB_FETCH_MAX_CHARS]
+
+
+async def tool_web_fetch(url: str) -> dict:
+    """Fetch a page as plain text (cached for WEB_FETCH_TTL seconds)."""
+    cached = _cache_get(_web_fetch_cache, url, WEB_FETCH_TTL)
+    if cached is not None:
+        return cached
+    result = await _fetch_page(url)
+    if result["ok"]:
+        _cache_put(_web_fetch_cache, url, result)
+    return result
+
+
+async def _fetch_page(url: str) -> dict:
     try:
         if HAS_REQUESTS:
-            resp = requests.get(url, timeout=10, headers={"User-Agent": "AetherOS-Brain/0.3"})
-            text = resp.text[:4000]
+            resp = await asyncio.to_thread(_SESSION.get, url, timeout=10)
+            html = resp.text
         else:
-            result = subprocess.run(
-                ["curl", "-sf", "-L", url, "-H", "User-Agent: AetherOS-Brain/0.3"],
-                capture_output=True, text=True, timeout=10
-            )
-            text = result.stdout[:4000]
+            _, html, _ = await run_process(
+                "curl", "-sf", "-L", url, "-H", "User-Agent: AetherOS-Brain/0.3", timeout=10)
         # Strip HTML tags for readability
-        text = re.sub(r'<[^>]+>', ' ', text)
-        text = re.sub(r'\s+', ' ', text).strip()
-        return {"ok": True, "content": text}
+        return {"ok": True, "content": html_to_text(html)}
+    except asyncio.TimeoutError:
+        return {"ok": False, "error": "fetch timed out"}
     except Exception as e:
         return {"ok": False, "error": str(e)}
 
 
-def tool_run_command(command: str) -> dict:
+async def tool_run_command(command: str) -> dict:
     try:
-        result = subprocess.run(
-            command, shell=True, capture_output=True, text=True, timeout=15
-        )
-        output = result.stdout
-        if result.stderr:
-            output += "\n" + result.stderr
-        return {"ok": True, "output": output[:4000] if output else "(no output)", "exit_code": result.returncode}
-    except subprocess.TimeoutExpired:
+        returncode, output, stderr = await run_process(command, timeout=15, shell=True)
+        if stderr:
+            output += "\n" + stderr
+        return {"ok": True, "output": output[:4000] if output else "(no output)", "exit_code": returncode}
+    except asyncio.TimeoutError:
         return {"ok": False, "error": "Command timed out after 15s"}
     except Exception as e:
         return {"ok": False, "error": str(e)}
@@ -226,14 +503,108 @@ def tool_run_command(command: str) -> dict:
 # Intent detection — decides which tools to run BEFORE calling Claude
 # ---------------------------------------------------------------------------
 
-def detect_and_run_tools(user_input: str) -> str:
-    """Analyze user input, run relevant tools, return context string for Claude."""
+_WEATHER_RE = re.compile(r'weather\s+(?:in\s+|for\s+|at\s+)?(.+?)(?:\?|$|\.)')
+_READ_RE = re.compile(r'(?:read|open|show|cat|view|display|look at)\s+(?:me\s+)?(?:the\s+)?(?:file\s+|contents?\s+of\s+)?["\']?([~/][\w./-]+)["\']?', re.IGNORECASE)
+_SEARCH_RES = [re.compile(p) for p in (
+    r'(?:find|search|look for|where is|locate)\s+(?:files?\s+)?(?:about\s+|for\s+|named\s+|called\s+|containing\s+|with\s+|related to\s+)?["\']?(.+?)["\']?(?:\?|$|\.)',
+    r'(?:what|which)\s+files?\s+(?:do\s+I\s+have\s+)?(?:about|for|on|related to|containing|with)\s+["\']?(.+?)["\']?(?:\?|$|\.)',
+    r'files?\s+(?:about|for|on|related to|containing|with)\s+["\']?(.+?)["\']?(?:\?|$|\.)',
+)]
+_SEARCH_FILLER_RE = re.compile(r'\s+(language|project|file|code|stuff)$')
+_LS_RE = re.compile(r'(?:list|ls|what(?:\'s| is) in)\s+(?:files?\s+(?:in\s+)?)?["\']?([~/\w./-]+)["\']?')
+_URL_RE = re.compile(r'(?:fetch|get|visit|open)\s+(https?://\S+)')
+_CMD_RE = re.compile(r'(?:run|execute)\s+(?:command\s+)?["`](.+?)["`]')
+
+_INTENT_RES = [_WEATHER_RE, _READ_RE, *_SEARCH_RES, _LS_RE, _URL_RE, _CMD_RE]
+
+
+def _compile_intent_db():
+    """Compile every intent regex into one Hyperscan database, or None.
+
+    Hyperscan has no capture groups, so the database is only a prefilter:
+    one scan tells us which patterns can match, and only those are re-run
+    through `re` to extract groups. Patterns are compiled caseless so the
+    prefilter stays a superset of the `re` matches.
+    """
+    if not HAS_HYPERSCAN:
+        return None
+    flags = hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH | hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP
+    db = hyperscan.Database()
+    try:
+        db.compile(
+            expressions=[p.pattern.encode() for p in _INTENT_RES],
+            ids=list(range(len(_INTENT_RES))),
+            elements=len(_INTENT_RES),
+            flags=[flags] * len(_INTENT_RES),
+        )
+    except hyperscan.error as e:
+        print(f"[brain] Hyperscan compile failed, using re only: {e}", file=sys.stderr)
+        return None
+    return db
+
+
+_INTENT_DB = _compile_intent_db()
+
+
+def _intent_candidates(lower: str):
+    """Set of intent patterns that may match, or None if every one must be tried."""
+    if _INTENT_DB is None:
+        return None
+    hits = set()
+
+    def on_match(pattern_id, start, end, flags, context):
+        hits.add(_INTENT_RES[pattern_id])
+
+    _INTENT_DB.scan(lower.encode('utf-8', 'replace'), match_event_handler=on_match)
+    return hits
+
+
+# Plain keyword triggers, mapped to the intent they enable
+_INTENT_KEYWORDS = {
+    'weather': 'weather',
+    'system info': 'sysinfo', 'sysinfo': 'sysinfo', 'uptime': 'sysinfo', 'how long': 'sysinfo',
+    'cpu': 'sysinfo', 'memory usage': 'sysinfo', 'disk space': 'sysinfo', 'system status': 'sysinfo',
+}
+
+if HAS_AHOCORASICK:
+    _KEYWORD_AUTOMATON = ahocorasick.Automaton()
+    for _kw, _category in _INTENT_KEYWORDS.items():
+        _KEYWORD_AUTOMATON.add_word(_kw, _category)
+    _KEYWORD_AUTOMATON.make_automaton()
+else:
+    _KEYWORD_RE = re.compile('|'.join(map(re.escape, _INTENT_KEYWORDS)))
+
+
+def _keyword_intents(lower: str) -> set:
+    """Categories of every intent keyword in lower, found in one pass."""
+    if HAS_AHOCORASICK:
+        return {category for _, category in _KEYWORD_AUTOMATON.iter(lower)}
+    return {_INTENT_KEYWORDS[m.group()] for m in _KEYWORD_RE.finditer(lower)}
+
+
+async def detect_and_run_tools(user_input: str) -> str:
+    """Analyze user input, run relevant tools, return context string for Claude.
+
+    Every triggered tool runs concurrently (coroutine tools on the event
+    loop, blocking filesystem tools in worker threads), so the total wait is
+    the slowest tool rather than the sum; the context sections are then
+    assembled in a fixed order.
+    """
     lower = user_input.lower()
-    context_parts = []
+    candidates = _intent_candidates(lower)
+    keywords = _keyword_intents(lower)
+
+    def search(pattern, text):
+        if candidates is not None and pattern not in candidates:
+            return None
+        return pattern.search(text)
+
+    # (section formatter, tool function, *args) in context order
+    calls = []
 
     # Weather detection
-    weather_match = re.search(r'weather\s+(?:in\s+|for\s+|at\s+)?(.+?)(?:\?|$|\.)', lower)
-    if not weather_match and 'weather' in lower:
+    weather_match = search(_WEATHER_RE, lower)
+    if not weather_match and 'weather' in keywords:
         # Try broader match
         words = lower.split()
         if 'weather' in words:
@@ -249,79 +620,96 @@ def detect_and_run_tools(user_input: str) -> str:
         location = weather_match.group(1).strip(' ?.') if weather_match else None
 
     if weather_match and location and location != 'here':
-        result = tool_weather(location)
-        if result["ok"]:
+        def weather_section(result, location=location):
+            if not result["ok"]:
+                return [f"[WEATHER ERROR] {result['error']}"]
             data = result["data"]
             current = data.get("current_condition", [{}])[0]
-            context_parts.append(f"[WEATHER DATA for {location}]\n{json.dumps(current, indent=2)}")
+            parts = [f"[WEATHER DATA for {location}]\n{json_dumps(current, pretty=True)}"]
             forecasts = data.get("weather", [])[:3]
             if forecasts:
-                context_parts.append(f"[FORECAST]\n{json.dumps(forecasts, indent=2)}")
-        else:
-            context_parts.append(f"[WEATHER ERROR] {result['error']}")
+                parts.append(f"[FORECAST]\n{json_dumps(forecasts, pretty=True)}")
+            return parts
+        calls.append((weather_section, tool_weather, location))
 
     # File reading — match paths (case-insensitive verb, case-preserving path)
-    read_match = re.search(r'(?:read|open|show|cat|view|display|look at)\s+(?:me\s+)?(?:the\s+)?(?:file\s+|contents?\s+of\s+)?["\']?([~/][\w./-]+)["\']?', user_input, re.IGNORECASE)
+    read_match = search(_READ_RE, user_input)
     if read_match:
-        filepath = read_match.group(1)
-        result = tool_read_file(filepath)
-        if result["ok"]:
-            context_parts.append(f"[FILE: {result['path']}]\n" + "\n".join(result["lines"][:50]))
-        else:
-            context_parts.append(f"[FILE ERROR] {result['error']}")
+        def read_section(result):
+            if result["ok"]:
+                return [f"[FILE: {result['path']}]\n" + "\n".join(result["lines"][:50])]
+            return [f"[FILE ERROR] {result['error']}"]
+        calls.append((read_section, tool_read_file, read_match.group(1)))
 
     # File search — flexible patterns
-    search_patterns = [
-        r'(?:find|search|look for|where is|locate)\s+(?:files?\s+)?(?:about\s+|for\s+|named\s+|called\s+|containing\s+|with\s+|related to\s+)?["\']?(.+?)["\']?(?:\?|$|\.)',
-        r'(?:what|which)\s+files?\s+(?:do\s+I\s+have\s+)?(?:about|for|on|related to|containing|with)\s+["\']?(.+?)["\']?(?:\?|$|\.)',
-        r'files?\s+(?:about|for|on|related to|containing|with)\s+["\']?(.+?)["\']?(?:\?|$|\.)',
-    ]
     search_match = None
-    for pat in search_patterns:
-        search_match = re.search(pat, lower)
+    for pat in _SEARCH_RES:
+        search_match = search(pat, lower)
         if search_match:
             break
     if search_match:
         query = search_match.group(1).strip()
         # Remove trailing filler words
-        query = re.sub(r'\s+(language|project|file|code|stuff)$', '', query)
+        query = _SEARCH_FILLER_RE.sub('', query)
         if query and len(query) > 1:
-            result = tool_search_files(query, "~", by_name=True)
-            if result["ok"] and result["files"]:
-                context_parts.append(f"[SEARCH RESULTS for '{query}']\n" + "\n".join(result["files"]))
+            def name_section(result, query=query):
+                if result["ok"] and result["files"]:
+                    return [f"[SEARCH RESULTS for '{query}']\n" + "\n".join(result["files"])]
+                return []
+            def content_section(result, query=query):
+                if result["ok"] and result["files"]:
+                    return [f"[CONTENT SEARCH for '{query}']\n" + "\n".join(result["files"])]
+                return []
+            calls.append((name_section, tool_search_files, query, "~", True))
             # Also try content search
-            result2 = tool_search_files(query)
-            if result2["ok"] and result2["files"]:
-                context_parts.append(f"[CONTENT SEARCH for '{query}']\n" + "\n".join(result2["files"]))
+            calls.append((content_section, tool_search_files, query))
 
     # List files
-    ls_match = re.search(r'(?:list|ls|what(?:\'s| is) in)\s+(?:files?\s+(?:in\s+)?)?["\']?([~/\w./-]+)["\']?', lower)
+    ls_match = search(_LS_RE, lower)
     if ls_match:
-        dirpath = ls_match.group(1)
-        result = tool_list_files(dirpath)
-        if result["ok"]:
+        def ls_section(result):
+            if not result["ok"]:
+                return []
             entries = result["entries"][:30]
             lines = [f"{e['name']:30s} {e['size']:>8d}  {e['modified']}" for e in entries]
-            context_parts.append(f"[DIRECTORY: {result['path']}]\n" + "\n".join(lines))
+            return [f"[DIRECTORY: {result['path']}]\n" + "\n".join(lines)]
+        calls.append((ls_section, tool_list_files, ls_match.group(1)))
 
     # System info
-    if any(kw in lower for kw in ['system info', 'sysinfo', 'uptime', 'how long', 'cpu', 'memory usage', 'disk space', 'system status']):
-        result = tool_system_info()
-        context_parts.append(f"[SYSTEM INFO]\n{json.dumps(result, indent=2)}")
+    if 'sysinfo' in keywords:
+        calls.append((lambda result: [f"[SYSTEM INFO]\n{json_dumps(result, pretty=True)}"], tool_system_info))
 
     # Web fetch
-    url_match = re.search(r'(?:fetch|get|visit|open)\s+(https?://\S+)', lower)
+    url_match = search(_URL_RE, lower)
     if url_match:
-        result = tool_web_fetch(url_match.group(1))
-        if result["ok"]:
-            context_parts.append(f"[WEB CONTENT]\n{result['content'][:2000]}")
+        def web_section(result):
+            if result["ok"]:
+                return [f"[WEB CONTENT]\n{result['content'][:2000]}"]
+            return []
+        calls.append((web_section, tool_web_fetch, url_match.group(1)))
 
     # Command execution (explicit ! prefix handled at a higher level)
-    cmd_match = re.search(r'(?:run|execute)\s+(?:command\s+)?["`](.+?)["`]', lower)
+    cmd_match = search(_CMD_RE, lower)
     if cmd_match:
-        result = tool_run_command(cmd_match.group(1))
-        if result["ok"]:
-            context_parts.append(f"[COMMAND OUTPUT]\n{result['output']}")
+        def cmd_section(result):
+            if result["ok"]:
+                return [f"[COMMAND OUTPUT]\n{result['output']}"]
+            return []
+        calls.append((cmd_section, tool_run_command, cmd_match.group(1)))
+
+    if not calls:
+        return ""
+    results = await asyncio.gather(
+        *(fn(*args) if inspect.iscoroutinefunction(fn) else asyncio.to_thread(fn, *args)
+          for _, fn, *args in calls),
+        return_exceptions=True,
+    )
+    context_parts = []
+    for (section, fn, *_), result in zip(calls, results):
+        if isinstance(result, Exception):
+            print(f"[brain] Tool {fn.__name__} failed: {result}")
+            continue
+        context_parts.extend(section(result))
 
     if context_parts:
         return "\n\n".join(context_parts)
@@ -332,16 +720,161 @@ def detect_and_run_tools(user_input: str) -> str:
 # Claude CLI integration
 # ---------------------------------------------------------------------------
 
-def call_claude(user_input: str, tool_context: str, history: list) -> str:
-    """Call Claude via CLI with tool context and conversation history."""
+_FENCE_OPEN_RE = re.compile(r'^```(?:json)?\s*\n?')
+_FENCE_CLOSE_RE = re.compile(r'\n?```\s*$')
+
+CLAUDE_ENV = {**os.environ,
+              "CLAUDE_CODE_DISABLE_NONESSENTIAL_TRAFFIC": "1",
+              "DISABLE_AUTOUPDATER": "1"}
+
+
+# One idle, pre-spawned `claude` process per (system prompt, budget). The CLI
+# has no server mode, and a long-lived stream-json session would carry
+# context between unrelated prompts, so instead each worker answers exactly
+# one prompt while its replacement boots in the background. Node/CLI
+# startup then overlaps the idle time between requests rather than the
+# request itself.
+_WARM_CLAUDE: dict = {}
+_WARM_WATCHERS: set = set()  # live watchdog tasks (asyncio keeps only weak refs)
+_WARM_RESPAWN_DELAY: dict = {}  # key -> next respawn backoff, seconds
+WARM_RESPAWN_MAX_DELAY = 300
+CLAUDE_EVENT_LIMIT = 16 * 1024 * 1024  # longest stream-json event line we read
+
+
+async def _spawn_claude_worker(system_prompt: str, budget_usd: str):
+    # Call claude CLI from /tmp to avoid loading project context
+    return await asyncio.create_subprocess_exec(
+        "claude", "-p", "--model", CLAUDE_MODEL,
+        "--system-prompt", system_prompt,
+        "--input-format", "stream-json",
+        "--output-format", "stream-json", "--verbose",
+        "--no-session-persistence",
+        "--max-budget-usd", budget_usd,
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+        cwd="/tmp", env=CLAUDE_ENV,
+        limit=CLAUDE_EVENT_LIMIT,
+    )
+
+
+async def _watch_warm_worker(key: tuple, proc):
+    """Replace a warm worker that exits while still idle (crash, auth
+    expiry), so the next query does not pay a cold start. Respawns back off
+    exponentially while workers keep dying."""
+    await proc.wait()
+    if _WARM_CLAUDE.get(key) is not proc:
+        return  # handed to a query, which expects it to exit
+    del _WARM_CLAUDE[key]
+    delay = _WARM_RESPAWN_DELAY.get(key, 1)
+    _WARM_RESPAWN_DELAY[key] = min(delay * 2, WARM_RESPAWN_MAX_DELAY)
+    print(f"[brain] Idle claude worker exited ({proc.returncode}); respawning in {delay}s")
+    await asyncio.sleep(delay)
+    try:
+        await prewarm_claude(*key)
+    except OSError as e:
+        print(f"[brain] WARNING: could not respawn claude worker: {e}")
+
+
+async def prewarm_claude(system_prompt: str, budget_usd: str):
+    """Start an idle worker for this prompt/budget if none is waiting."""
+    key = (system_prompt, budget_usd)
+    proc = _WARM_CLAUDE.get(key)
+    if proc is None or proc.returncode is not None:
+        proc = _WARM_CLAUDE[key] = await _spawn_claude_worker(system_prompt, budget_usd)
+        task = asyncio.ensure_future(_watch_warm_worker(key, proc))
+        _WARM_WATCHERS.add(task)
+        task.add_done_callback(_WARM_WATCHERS.discard)
+
+
+async def _claude_exchange(proc, message: bytes, on_event) -> tuple:
+    """Send one message to a stream-json worker and read its events to EOF."""
+    stderr_task = asyncio.ensure_future(proc.stderr.read())
+    try:
+        try:
+            proc.stdin.write(message)
+            await proc.stdin.drain()
+            proc.stdin.close()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # worker already exited; its stderr says why
+
+        # stream-json emits one event per line; the last "result" event carries the answer
+        result = ""
+        async for line in proc.stdout:
+            if on_event is not None:
+                await on_event(line)
+            try:
+                event = json_loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(event, dict) and event.get("type") == "result":
+                result = line.decode(errors="replace").strip()
+        await proc.wait()
+        return proc.returncode, result, (await stderr_task).decode(errors="replace")
+    finally:
+        stderr_task.cancel()
+
+
+async def run_claude_cli(system_prompt: str, prompt: str, budget_usd: str, timeout: float,
+                         on_event=None) -> tuple:
+    """Run one Claude prompt on a pre-spawned CLI worker.
+
+    Returns (returncode, stdout, stderr) where stdout is the CLI's final
+    result object, the same JSON `--output-format json` prints. If on_event
+    is given it is awaited with each raw stream-json line as the CLI emits
+    it. Raises asyncio.TimeoutError after killing the process if it runs
+    longer than timeout.
+    """
+    key = (system_prompt, budget_usd)
+    proc = _WARM_CLAUDE.pop(key, None)
+    if proc is None or proc.returncode is not None:
+        proc = await _spawn_claude_worker(system_prompt, budget_usd)
+    else:
+        _WARM_RESPAWN_DELAY.pop(key, None)  # warm workers are surviving again
+    await prewarm_claude(system_prompt, budget_usd)
+
+    message = json_bytes({"type": "user", "message": {"role": "user", "content": prompt}}) + b"\n"
+    try:
+        return await asyncio.wait_for(_claude_exchange(proc, message, on_event), timeout)
+    except BaseException:
+        # Timed out, or the streaming client went away: don't leave it running
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+        raise
+
+
+def extract_response_json(response_text: str):
+    """Parse the {"text": ...} object out of Claude's reply, or return None.
+
+    The outermost braces bound the object whether or not it is wrapped in
+    markdown fences or prose, so the reply is parsed exactly once.
+    """
+    start = response_text.find("{")
+    end = response_text.rfind("}")
+    if start < 0 or end < start:
+        return None
+    try:
+        parsed = json_loads(response_text[start:end + 1])
+    except json.JSONDecodeError:
+        return None
+    if isinstance(parsed, dict) and "text" in parsed:
+        return parsed
+    return None
+
+
+async def call_claude(user_input: str, tool_context: str, history: deque, on_event=None) -> dict:
+    """Call Claude via CLI with tool context and conversation history.
+
+    on_event is passed through to run_claude_cli to stream the CLI's events.
+    """
     # Build the prompt with context
     parts = []
 
-    # Include recent conversation history (last 6 exchanges)
-    recent = history[-(MAX_HISTORY * 2):] if len(history) > MAX_HISTORY * 2 else history
-    if recent:
+    # Include recent conversation history (last 6 messages); the deque is
+    # already capped at MAX_HISTORY exchanges
+    if history:
         parts.append("Recent conversation:")
-        for msg in recent[-6:]:
+        for msg in islice(history, max(0, len(history) - 6), None):
             role = msg["role"].upper()
             content = msg["content"][:200]
             parts.append(f"  {role}: {content}")
@@ -358,64 +891,31 @@ def call_claude(user_input: str, tool_context: str, history: list) -> str:
 
     full_prompt = "\n".join(parts)
 
-    # Call claude CLI from /tmp to avoid loading project context
     try:
-        result = subprocess.run(
-            ["claude", "-p", "--model", CLAUDE_MODEL,
-             "--system-prompt", BRAIN_SYSTEM_PROMPT,
-             "--output-format", "json",
-             "--no-session-persistence",
-             "--max-budget-usd", "0.50",
-             full_prompt],
-            capture_output=True, text=True, timeout=90,
-            cwd="/tmp",
-            env={**os.environ,
-                 "CLAUDE_CODE_DISABLE_NONESSENTIAL_TRAFFIC": "1",
-                 "DISABLE_AUTOUPDATER": "1"}
-        )
-        if result.returncode != 0:
-            stderr = result.stderr[:200]
-            return json.dumps({"text": f"Brain error: {stderr}", "widgets": []})
+        returncode, stdout, stderr = await run_claude_cli(BRAIN_SYSTEM_PROMPT, full_prompt, "0.50", 90, on_event)
+        if returncode != 0:
+            stderr = stderr[:200]
+            return {"text": f"Brain error: {stderr}", "widgets": []}
 
         # Parse the JSON output from claude CLI
-        output = result.stdout.strip()
-        cli_result = json.loads(output)
+        cli_result = json_loads(stdout)
         response_text = cli_result.get("result", "")
 
-        # Strip markdown code fences if present
-        cleaned = response_text.strip()
-        if cleaned.startswith("```"):
-            # Remove ```json ... ``` wrapper
-            cleaned = re.sub(r'^```(?:json)?\s*\n?', '', cleaned)
-            cleaned = re.sub(r'\n?```\s*$', '', cleaned)
-            cleaned = cleaned.strip()
-
-        # Try to parse Claude's response as our JSON format
-        for attempt in [cleaned, response_text]:
-            try:
-                parsed = json.loads(attempt)
-                if "text" in parsed:
-                    return json.dumps(parsed)
-            except (json.JSONDecodeError, KeyError):
-                pass
-
-        # Try to extract JSON object containing "text" key
-        json_match = re.search(r'\{.*"text"\s*:.*\}', cleaned, re.DOTALL)
-        if json_match:
-            try:
-                parsed = json.loads(json_match.group())
-                if "text" in parsed:
-                    return json.dumps(parsed)
-            except json.JSONDecodeError:
-                pass
+        parsed = extract_response_json(response_text)
+        if parsed is not None:
+            return parsed
 
         # If still not JSON, wrap it
-        return json.dumps({"text": response_text, "widgets": []})
-
-    except subprocess.TimeoutExpired:
-        return json.dumps({"text": "Brain timed out. Try a simpler query.", "widgets": []})
+        return {"text": response_text, "widgets": []}
+
+    except asyncio.TimeoutError:
+        return {"text": "Brain timed out. Try a simpler query.", "widgets": []}
+    except ConnectionError:
+        # The stream client hung up (raised by on_event): abort the query so
+        # no turn is recorded for it (CancelledError isn't an Exception)
+        raise
     except Exception as e:
-        return json.dumps({"text": f"Brain error: {e}", "widgets": []})
+        return {"text": f"Brain error: {e}", "widgets": []}
 
 
 # ---------------------------------------------------------------------------
@@ -437,34 +937,74 @@ Rules:
 Respond with ONLY valid JSON. No markdown fences."""
 
 
-def call_ollama(prompt: str, system_prompt: str = "", timeout: int = 15) -> str:
-    """Call a local Ollama model for fast proactive insights."""
-    try:
-        payload = {
+# Without requests, Ollama is reached over a persistent stdlib connection
+# (one per worker thread) so proactive ticks reuse the same socket.
+_ollama_local = threading.local()
+
+
+def _ollama_connection(timeout: float) -> http.client.HTTPConnection:
+    conn = getattr(_ollama_local, "conn", None)
+    if conn is None:
+        url = urlsplit(OLLAMA_URL)
+        cls = http.client.HTTPSConnection if url.scheme == "https" else http.client.HTTPConnection
+        conn = _ollama_local.conn = cls(url.netloc, timeout=timeout)
+    conn.timeout = timeout
+    if conn.sock is not None:
+        conn.sock.settimeout(timeout)
+    return conn
+
+
+def _ollama_post(path: str, body: bytes, timeout: float) -> tuple:
+    """POST to Ollama on the kept-alive connection; returns (status, body bytes)."""
+    for attempt in range(2):
+        conn = _ollama_connection(timeout)
+        try:
+            conn.request("POST", urlsplit(OLLAMA_URL).path.rstrip("/") + path, body=body,
+                         headers={"Content-Type": "application/json"})
+            resp = conn.getresponse()
+            return resp.status, resp.read()
+        except (http.client.HTTPException, ConnectionError):
+            # Ollama may have closed the idle keep-alive socket; reconnect once
+            conn.close()
+            _ollama_local.conn = None
+            if attempt:
+                raise
+
+
+# Everything but the prompt is fixed per system prompt, so that part of the
+# /api/generate body is serialized once (without its closing brace).
+_ollama_payload_prefixes: dict = {}
+
+
+def _ollama_generate_body(prompt: str, system_prompt: str) -> bytes:
+    prefix = _ollama_payload_prefixes.get(system_prompt)
+    if prefix is None:
+        prefix = json_bytes({
             "model": OLLAMA_MODEL,
-            "prompt": prompt,
             "system": system_prompt,
             "stream": False,
             "options": {"temperature": 0.7, "num_predict": 200}
-        }
+        })[:-1]
+        _ollama_payload_prefixes[system_prompt] = prefix
+    return prefix + b',"prompt":' + json_bytes(prompt) + b"}"
+
+
+def call_ollama(prompt: str, system_prompt: str = "", timeout: int = 15) -> str:
+    """Call a local Ollama model for fast proactive insights."""
+    try:
+        payload = _ollama_generate_body(prompt, system_prompt)
         if HAS_REQUESTS:
-            resp = requests.post(
+            resp = _SESSION.post(
                 f"{OLLAMA_URL}/api/generate",
-                json=payload, timeout=timeout
+                data=payload, headers={"Content-Type": "application/json"}, timeout=timeout
             )
             if resp.status_code == 200:
-                return resp.json().get("response", "")
+                return json_loads(resp.content).get("response", "")
             return ""
         else:
-            result = subprocess.run(
-                ["curl", "-sf", "-X", "POST",
-                 f"{OLLAMA_URL}/api/generate",
-                 "-H", "Content-Type: application/json",
-                 "-d", json.dumps(payload)],
-                capture_output=True, text=True, timeout=timeout
-            )
-            if result.returncode == 0:
-                return json.loads(result.stdout).get("response", "")
+            status, body = _ollama_post("/api/generate", payload, timeout)
+            if status == 200:
+                return json_loads(body).get("response", "")
             return ""
     except Exception as e:
         print(f"[brain] Ollama error: {e}")
@@ -488,24 +1028,108 @@ Respond with ONLY valid JSON (no markdown fences) in this format:
 Card types: system, weather, text, news, tip, alert. Generate 3-5 cards based on user interests and context. Always include a system health card. Be creative and relevant."""
 
 
+def _bucket10(value) -> int:
+    """Round a percentage to the nearest 10 so similar states share a prompt."""
+    return int(round(float(value) / 10.0)) * 10
+
+
 class Brain:
     def __init__(self):
-        self.history = []
-        self.last_proactive_time = 0
+        self.history = deque(self._load_history(), maxlen=MAX_HISTORY * 2)
+        self.last_proactive_time = float("-inf")  # time.monotonic() of the last proactive call
         self.proactive_cooldown = 60  # minimum seconds between proactive calls
+        self._last_proactive_state = None  # state hash of the last answered proactive call
+        self._resp_cache = OrderedDict()  # prompt digest -> (time, parsed response)
 
-    def proactive(self, context: dict) -> dict:
+    @staticmethod
+    def _history_uses_msgpack() -> bool:
+        return HAS_MSGPACK and HISTORY_FILE.endswith(".msgpack")
+
+    def _load_history(self) -> list:
+        if not HISTORY_FILE:
+            return []
+        try:
+            with open(HISTORY_FILE, "rb") as f:
+                data = f.read()
+            if self._history_uses_msgpack():
+                try:
+                    return msgpack.unpackb(data, raw=False)
+                except ValueError:
+                    pass  # saved as JSON while msgpack was not installed
+            return json_loads(data)
+        except FileNotFoundError:
+            return []
+        except Exception as e:
+            print(f"[brain] Could not load history from {HISTORY_FILE}: {e}")
+            return []
+
+    def _save_history(self):
+        if not HISTORY_FILE:
+            return
+        if self._history_uses_msgpack():
+            data = msgpack.packb(list(self.history), use_bin_type=True)
+        else:
+            data = json_bytes(list(self.history))
+        tmp = f"{HISTORY_FILE}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, HISTORY_FILE)
+        except OSError as e:
+            print(f"[brain] Could not save history to {HISTORY_FILE}: {e}")
+
+    @staticmethod
+    def _prompt_key(system_prompt: str, prompt: str) -> bytes:
+        h = hashlib.blake2b(system_prompt.encode(), digest_size=16)
+        h.update(b"\0")
+        h.update(prompt.encode())
+        return h.digest()
+
+    def _cached_response(self, key: bytes, ttl: float = RESPONSE_CACHE_TTL):
+        hit = self._resp_cache.get(key)
+        if hit is None:
+            return None
+        if time.monotonic() - hit[0] >= ttl:
+            del self._resp_cache[key]
+            return None
+        self._resp_cache.move_to_end(key)
+        return hit[1]
+
+    def _remember_response(self, key: bytes, parsed: dict) -> dict:
+        self._resp_cache[key] = (time.monotonic(), parsed)
+        self._resp_cache.move_to_end(key)
+        while len(self._resp_cache) > RESPONSE_CACHE_MAX:
+            self._resp_cache.popitem(last=False)
+        return parsed
+
+    async def proactive(self, context: dict) -> dict:
         """Process system context and return proactive insight if warranted."""
-        now = time.time()
+        now = time.monotonic()
         if now - self.last_proactive_time < self.proactive_cooldown:
             return {"has_insight": False, "reason": "cooldown"}
         self.last_proactive_time = now
 
+        # Skip the model entirely while the meaningful state is unchanged.
+        # Uptime, process count and session length move every tick, so they
+        # are left out of the key.
+        t = context.get("telemetry", {})
+        wm = context.get("world_model", {})
+        state = hash((
+            _bucket10(t.get("cpu", 0)), _bucket10(t.get("mem_pct", 0)), str(t.get("network")),
+            str(wm.get("trend")), str(wm.get("learning_enabled")),
+            tuple(map(str, context.get("recent_alerts") or ()))[:5],
+            str(context.get("user_activity", {}).get("last_query")),
+            str(context.get("tasks")),
+            tuple(map(str, context.get("user_context", {}).get("topics", ())))[:5],
+        ))
+        if state == self._last_proactive_state:
+            return {"has_insight": False, "reason": "unchanged"}
+
         # Build a compact context string
         parts = []
         if "telemetry" in context:
             t = context["telemetry"]
-            parts.append(f"System: CPU {t.get('cpu', 0):.0f}%, Mem {t.get('mem_pct', 0):.0f}%, "
+            parts.append(f"System: CPU {_bucket10(t.get('cpu', 0))}%, Mem {_bucket10(t.get('mem_pct', 0))}%, "
                          f"Uptime {t.get('uptime', 'unknown')}, Procs {t.get('procs', 0)}, "
                          f"Net {t.get('network', 'unknown')}")
 
@@ -537,10 +1161,24 @@ class Brain:
 
         print(f"[brain] Proactive check with {len(context_str)} chars of context")
 
+        # Only "nothing to report" answers are reused: a real insight should
+        # not be surfaced again on the next tick.
+        cache_key = self._prompt_key(BRAIN_PROACTIVE_PROMPT, context_str)
+        cached = self._cached_response(cache_key)
+        if cached is not None:
+            return cached
+
+        def remember(parsed):
+            self._last_proactive_state = state
+            if isinstance(parsed, dict) and not parsed.get("has_insight"):
+                self._remember_response(cache_key, parsed)
+            return parsed
+
         # Route: proactive calls → local model (fast), complex queries → Claude (quality)
         if USE_LOCAL_MODEL:
             print(f"[brain] Proactive via local model ({OLLAMA_MODEL})")
-            response_text = call_ollama(
+            response_text = await asyncio.to_thread(
+                call_ollama,
                 f"Current system state:\n{context_str}\n\nIs there anything the user should know?",
                 system_prompt=BRAIN_PROACTIVE_PROMPT,
                 timeout=10
@@ -549,53 +1187,44 @@ class Brain:
                 try:
                     cleaned = response_text.strip()
                     if cleaned.startswith("```"):
-                        cleaned = re.sub(r'^```(?:json)?\s*\n?', '', cleaned)
-                        cleaned = re.sub(r'\n?```\s*$', '', cleaned)
-                    parsed = json.loads(cleaned)
-                    return parsed
+                        cleaned = _FENCE_OPEN_RE.sub('', cleaned)
+                        cleaned = _FENCE_CLOSE_RE.sub('', cleaned)
+                    parsed = json_loads(cleaned)
+                    return remember(parsed)
                 except (json.JSONDecodeError, KeyError):
                     print(f"[brain] Local model parse failed, falling back to Claude")
 
         # Call Claude with proactive prompt (cheaper, faster)
         try:
-            result = subprocess.run(
-                ["claude", "-p", "--model", CLAUDE_MODEL,
-                 "--system-prompt", BRAIN_PROACTIVE_PROMPT,
-                 "--output-format", "json",
-                 "--no-session-persistence",
-                 "--max-budget-usd", "0.05",
-                 f"Current system state:\n{context_str}\n\nIs there anything the user should know?"],
-                capture_output=True, text=True, timeout=30,
-                cwd="/tmp",
-                env={**os.environ,
-                     "CLAUDE_CODE_DISABLE_NONESSENTIAL_TRAFFIC": "1",
-                     "DISABLE_AUTOUPDATER": "1"}
-            )
-            if result.returncode != 0:
-                return {"has_insight": False, "error": result.stderr[:100]}
+            returncode, stdout, stderr = await run_claude_cli(
+                BRAIN_PROACTIVE_PROMPT,
+                f"Current system state:\n{context_str}\n\nIs there anything the user should know?",
+                "0.05", 30)
+            if returncode != 0:
+                return {"has_insight": False, "error": stderr[:100]}
 
-            output = result.stdout.strip()
-            cli_result = json.loads(output)
+            output = stdout.strip()
+            cli_result = json_loads(output)
             response_text = cli_result.get("result", "")
 
             # Clean markdown fences
             cleaned = response_text.strip()
             if cleaned.startswith("```"):
-                cleaned = re.sub(r'^```(?:json)?\s*\n?', '', cleaned)
-                cleaned = re.sub(r'\n?```\s*$', '', cleaned)
+                cleaned = _FENCE_OPEN_RE.sub('', cleaned)
+                cleaned = _FENCE_CLOSE_RE.sub('', cleaned)
                 cleaned = cleaned.strip()
 
-            parsed = json.loads(cleaned)
-            return parsed
+            parsed = json_loads(cleaned)
+            return remember(parsed)
 
-        except subprocess.TimeoutExpired:
+        except asyncio.TimeoutError:
             return {"has_insight": False, "error": "timeout"}
         except (json.JSONDecodeError, KeyError):
             return {"has_insight": False, "error": "parse_error"}
         except Exception as e:
             return {"has_insight": False, "error": str(e)}
 
-    def dashboard(self, context: dict) -> dict:
+    async def dashboard(self, context: dict) -> dict:
         """Generate a personalized dashboard layout based on user context."""
         name = context.get("name", "User")
         interests = context.get("interests", [])
@@ -616,14 +1245,20 @@ class Brain:
             f"Interests: {', '.join(interests) if interests else 'general'}",
         ]
         if telemetry:
-            prompt_parts.append(f"System: CPU {telemetry.get('cpu', 0):.0f}%, Mem {telemetry.get('mem_pct', 0):.0f}%, Uptime {telemetry.get('uptime', 'unknown')}")
+            prompt_parts.append(f"System: CPU {_bucket10(telemetry.get('cpu', 0))}%, Mem {_bucket10(telemetry.get('mem_pct', 0))}%, Uptime {telemetry.get('uptime', 'unknown')}")
 
         context_str = "\n".join(prompt_parts)
 
+        cache_key = self._prompt_key(BRAIN_DASHBOARD_PROMPT, context_str)
+        cached = self._cached_response(cache_key)
+        if cached is not None:
+            return cached
+
         # Route: proactive/dashboard generation → local model if available, else Claude
         if USE_LOCAL_MODEL:
             print(f"[brain] Dashboard via local model ({OLLAMA_MODEL})")
-            response_text = call_ollama(
+            response_text = await asyncio.to_thread(
+                call_ollama,
                 f"Generate a dashboard layout:\n{context_str}",
                 system_prompt=BRAIN_DASHBOARD_PROMPT,
                 timeout=15
@@ -637,42 +1272,31 @@ class Brain:
             try:
                 cleaned = response_text.strip()
                 if cleaned.startswith("```"):
-                    cleaned = re.sub(r'^```(?:json)?\s*\n?', '', cleaned)
-                    cleaned = re.sub(r'\n?```\s*$', '', cleaned)
-                parsed = json.loads(cleaned)
+                    cleaned = _FENCE_OPEN_RE.sub('', cleaned)
+                    cleaned = _FENCE_CLOSE_RE.sub('', cleaned)
+                parsed = json_loads(cleaned)
                 if "greeting" in parsed and "cards" in parsed:
                     print(f"[brain] Dashboard from local model OK")
-                    return parsed
+                    return self._remember_response(cache_key, parsed)
             except (json.JSONDecodeError, KeyError):
                 pass
 
         # Use Claude for dashboard
         print(f"[brain] Dashboard via Claude ({CLAUDE_MODEL})")
         try:
-            result = subprocess.run(
-                ["claude", "-p", "--model", CLAUDE_MODEL,
-                 "--system-prompt", BRAIN_DASHBOARD_PROMPT,
-                 "--output-format", "json",
-                 "--no-session-persistence",
-                 "--max-budget-usd", "0.10",
-                 f"Generate dashboard:\n{context_str}"],
-                capture_output=True, text=True, timeout=30,
-                cwd="/tmp",
-                env={**os.environ,
-                     "CLAUDE_CODE_DISABLE_NONESSENTIAL_TRAFFIC": "1",
-                     "DISABLE_AUTOUPDATER": "1"}
-            )
-            if result.returncode == 0:
-                output = result.stdout.strip()
-                cli_result = json.loads(output)
+            returncode, stdout, _ = await run_claude_cli(
+                BRAIN_DASHBOARD_PROMPT, f"Generate dashboard:\n{context_str}", "0.10", 30)
+            if returncode == 0:
+                output = stdout.strip()
+                cli_result = json_loads(output)
                 response_text = cli_result.get("result", "")
                 cleaned = response_text.strip()
                 if cleaned.startswith("```"):
-                    cleaned = re.sub(r'^```(?:json)?\s*\n?', '', cleaned)
-                    cleaned = re.sub(r'\n?```\s*$', '', cleaned)
-                parsed = json.loads(cleaned)
+                    cleaned = _FENCE_OPEN_RE.sub('', cleaned)
+                    cleaned = _FENCE_CLOSE_RE.sub('', cleaned)
+                parsed = json_loads(cleaned)
                 if "greeting" in parsed:
-                    return parsed
+                    return self._remember_response(cache_key, parsed)
         except Exception as e:
             print(f"[brain] Dashboard Claude error: {e}")
 
@@ -686,34 +1310,51 @@ class Brain:
             ]
         }
 
-    def query(self, user_input: str) -> dict:
-        """Process a natural language query and return structured response."""
+    def _query_key(self, user_input: str) -> bytes:
+        """Digest of the query plus the last two exchanges it is answered with."""
+        tail = islice(self.history, max(0, len(self.history) - 4), None)
+        return self._prompt_key(user_input, "|".join(m["content"] for m in tail))
+
+    async def query(self, user_input: str, on_event=None) -> dict:
+        """Process a natural language query and return structured response.
+
+        on_event, if given, is awaited with each Claude CLI stream-json line.
+        """
+        if len(user_input) > MAX_INPUT_CHARS:
+            return {"text": f"Query too long ({len(user_input)} characters, max {MAX_INPUT_CHARS}).",
+                    "widgets": []}
+
+        # Repeated queries (UI polls, dashboards) reuse the last answer. Commands
+        # are never cached: the user expects them to actually run again.
+        cacheable = not _CMD_RE.search(user_input.lower())
+        if cacheable:
+            cached = self._cached_response(self._query_key(user_input), QUERY_CACHE_TTL)
+            if cached is not None:
+                print(f"[brain] Cached answer for: {user_input[:60]}")
+                return cached
+
         # Step 1: Detect intent and run tools locally
         print(f"[brain] Detecting intent for: {user_input[:60]}")
-        tool_context = detect_and_run_tools(user_input)
+        tool_context = await detect_and_run_tools(user_input)
         if tool_context:
             print(f"[brain] Tool context: {len(tool_context)} chars")
 
         # Step 2: Call Claude with context
         print(f"[brain] Calling Claude ({CLAUDE_MODEL})...")
         start = time.time()
-        response_json = call_claude(user_input, tool_context, self.history)
+        result = await call_claude(user_input, tool_context, self.history, on_event)
         elapsed = time.time() - start
         print(f"[brain] Claude responded in {elapsed:.1f}s")
 
-        # Step 3: Parse and return
-        try:
-            result = json.loads(response_json)
-        except json.JSONDecodeError:
-            result = {"text": response_json, "widgets": []}
-
-        # Update history
+        # Step 3: Update history and return
         self.history.append({"role": "user", "content": user_input})
         self.history.append({"role": "assistant", "content": result.get("text", "")})
+        self._save_history()
 
-        # Trim history
-        if len(self.history) > MAX_HISTORY * 2:
-            self.history = self.history[-(MAX_HISTORY * 2):]
+        # Keyed on the updated history, so asking again right away is a hit
+        # (and a hit leaves the history, and therefore the key, unchanged)
+        if cacheable and not result.get("text", "").startswith(("Brain error", "Brain timed out")):
+            self._remember_response(self._query_key(user_input), result)
 
         return result
 
@@ -724,77 +1365,243 @@ class Brain:
 
 brain_instance = None
 
-class BrainHandler(BaseHTTPRequestHandler):
-    def log_message(self, format, *args):
-        print(f"[brain] {args[0]}")
+class BrainHandler:
+    """Serves one HTTP connection on the asyncio event loop.
 
-    def _send_json(self, status: int, data: dict):
-        body = json.dumps(data).encode()
-        self.send_response(status)
-        self.send_header("Content-Type", "application/json")
-        self.send_header("Content-Length", str(len(body)))
-        self.send_header("Connection", "close")
-        self.end_headers()
-        self.wfile.write(body)
+    Brain calls await their subprocesses instead of blocking, so concurrent
+    omnibar, proactive and dashboard requests overlap their waits.
+    """
 
-    def do_GET(self):
-        if self.path == "/v0/health":
-            self._send_json(200, {"ok": True, "service": "brain", "version": "0.3.0"})
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.headers = {}
+        self.content_length = 0
+        self.keep_alive = False
+        self.request_version = "HTTP/1.0"
+        self.chunked = False
+
+    def log_message(self, message: str):
+        print(f"[brain] {message}")
+
+    async def handle(self):
+        try:
+            while await self.handle_one_request():
+                pass
+        except (asyncio.IncompleteReadError, ConnectionError) as e:
+            self.log_message(f"connection error: {e}")
+        finally:
+            self.writer.close()
+
+    async def handle_one_request(self) -> bool:
+        """Serve one request; return True if the connection stays open."""
+        try:
+            line = await asyncio.wait_for(self.reader.readline(), KEEPALIVE_IDLE_TIMEOUT)
+        except asyncio.TimeoutError:
+            return False  # idle keep-alive connection
+        except ValueError as e:  # request line longer than the stream limit
+            return await self._bad_request(e)
+        request_line = line.decode("latin-1").strip()
+        if not request_line:
+            return False
+        parts = request_line.split()
+        self.command = parts[0] if parts else "GET"
+        self.path = parts[1] if len(parts) > 1 else "/"
+        version = parts[2] if len(parts) > 2 else "HTTP/1.0"
+        self.request_version = version
+
+        self.headers = {}
+        try:
+            while True:
+                line = await self.reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                self.headers[name.strip().lower()] = value.strip()
+            self.content_length = int(self.headers.get("content-length", 0))
+            if self.content_length < 0:
+                raise ValueError(f"negative Content-Length {self.content_length}")
+        except ValueError as e:  # over-long header line or bad Content-Length
+            return await self._bad_request(e, request_line)
+
+        # HTTP/1.1 defaults to keep-alive; aurorad sends Connection: close
+        connection = self.headers.get("connection", "").lower()
+        if version == "HTTP/1.1":
+            self.keep_alive = connection != "close"
         else:
-            self._send_json(404, {"ok": False, "error": "not_found"})
+            self.keep_alive = connection == "keep-alive"
+
+        if self.command == "POST":
+            status = await self.do_POST()
+        else:
+            # Drop any body so it isn't parsed as the next request
+            if self.content_length > 0:
+                await self.reader.readexactly(self.content_length)
+            if self.command == "GET":
+                status = await self.do_GET()
+            else:
+                status = await self._send_json(501, {"ok": False, "error": "unsupported method"})
+        self.log_message(f"{request_line} {status}")
+        return self.keep_alive
+
+    async def _bad_request(self, error: Exception, request_line: str = "-") -> bool:
+        """Reply 400 to a request that can't be framed, and close: the rest
+        of the stream can't be trusted to start at a request boundary."""
+        self.keep_alive = False
+        status = await self._send_json(400, {"ok": False, "error": f"bad request: {error}"})
+        self.log_message(f"{request_line} {status}")
+        return False
+
+    async def _send_json(self, status: int, data: dict) -> int:
+        body = json_bytes(data)
+        head = (
+            f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if self.keep_alive else 'close'}\r\n"
+            "\r\n"
+        ).encode()
+        self.writer.write(head + body)
+        await self.writer.drain()
+        return status
+
+    async def _start_stream(self, content_type: str = "application/x-ndjson"):
+        """Send headers for a body written piece by piece with _send_chunk.
+
+        HTTP/1.1 clients get chunked transfer encoding; older clients get a
+        plain body terminated by closing the connection.
+        """
+        self.chunked = self.request_version == "HTTP/1.1"
+        if not self.chunked:
+            self.keep_alive = False
+        head = (
+            "HTTP/1.1 200 OK\r\n"
+            f"Content-Type: {content_type}\r\n"
+            + ("Transfer-Encoding: chunked\r\n" if self.chunked else "")
+            + f"Connection: {'keep-alive' if self.keep_alive else 'close'}\r\n"
+            "\r\n"
+        ).encode()
+        self.writer.write(head)
+        await self.writer.drain()
+
+    async def _send_chunk(self, data: bytes):
+        if not data:
+            return  # a zero-length chunk would end the body
+        if self.chunked:
+            self.writer.write(b"%x\r\n%s\r\n" % (len(data), data))
+        else:
+            self.writer.write(data)
+        await self.writer.drain()
+
+    async def _end_stream(self):
+        if self.chunked:
+            self.writer.write(b"0\r\n\r\n")
+            await self.writer.drain()
+
+    async def _stream_brain(self, body: bytes) -> int:
+        """/v0/brain as NDJSON: each Claude CLI stream-json event as it
+        arrives, then one {"type": "brain_result", ...} line carrying the
+        same fields /v0/brain returns."""
+        try:
+            req = json_loads(body)
+        except ValueError as e:
+            return await self._send_json(400, {"ok": False, "error": f"bad json: {e}"})
+        user_input = req.get("input", "").strip()
+        if not user_input:
+            return await self._send_json(400, {"ok": False, "error": "empty input"})
+
+        print(f"[brain] Streaming query: {user_input[:80]}")
+        await self._start_stream()
+        start = time.time()
+        try:
+            result = await brain_instance.query(user_input, on_event=self._send_chunk)
+            result["ok"] = True
+        except ConnectionError:
+            raise
+        except Exception as e:
+            traceback.print_exc()
+            result = {"ok": False, "text": f"Brain error: {e}", "widgets": []}
+        result["latency_ms"] = int((time.time() - start) * 1000)
+        await self._send_chunk(json_bytes({"type": "brain_result", **result}) + b"\n")
+        await self._end_stream()
+        return 200
+
+    async def do_GET(self) -> int:
+        if self.path == "/v0/health":
+            return await self._send_json(200, {"ok": True, "service": "brain", "version": "0.3.0"})
+        return await self._send_json(404, {"ok": False, "error": "not_found"})
 
-    def do_POST(self):
-        content_length = int(self.headers.get("Content-Length", 0))
-        body = self.rfile.read(content_length).decode() if content_length > 0 else "{}"
+    async def do_POST(self) -> int:
+        # Parsed straight from bytes; no intermediate str copy of the body
+        body = await self.reader.readexactly(self.content_length) if self.content_length > 0 else b"{}"
 
-        if self.path == "/v0/brain":
+        # /v0/brain/full is an alias for clients that want the aggregated
+        # result explicitly; aurorad keeps using /v0/brain
+        if self.path in ("/v0/brain", "/v0/brain/full"):
             try:
-                req = json.loads(body)
+                req = json_loads(body)
                 user_input = req.get("input", "").strip()
                 if not user_input:
-                    self._send_json(400, {"ok": False, "error": "empty input"})
-                    return
+                    return await self._send_json(400, {"ok": False, "error": "empty input"})
 
                 print(f"[brain] Query: {user_input[:80]}")
                 start = time.time()
-                result = brain_instance.query(user_input)
+                result = await brain_instance.query(user_input)
                 elapsed = time.time() - start
                 result["ok"] = True
                 result["latency_ms"] = int(elapsed * 1000)
                 print(f"[brain] Done in {elapsed:.1f}s: {result.get('text', '')[:80]}")
-                self._send_json(200, result)
+                return await self._send_json(200, result)
 
             except Exception as e:
                 traceback.print_exc()
-                self._send_json(500, {"ok": False, "text": f"Brain error: {e}", "widgets": []})
+                return await self._send_json(500, {"ok": False, "text": f"Brain error: {e}", "widgets": []})
+
+        elif self.path == "/v0/brain/stream":
+            return await self._stream_brain(body)
 
         elif self.path == "/v0/brain/proactive":
             try:
-                context = json.loads(body) if body else {}
+                context = json_loads(body) if body else {}
                 print(f"[brain] Proactive check")
-                result = brain_instance.proactive(context)
+                result = await brain_instance.proactive(context)
                 result["ok"] = True
-                self._send_json(200, result)
+                return await self._send_json(200, result)
             except Exception as e:
                 traceback.print_exc()
-                self._send_json(500, {"ok": False, "has_insight": False, "error": str(e)})
+                return await self._send_json(500, {"ok": False, "has_insight": False, "error": str(e)})
 
         elif self.path == "/v0/brain/dashboard":
             try:
-                context = json.loads(body) if body else {}
+                context = json_loads(body) if body else {}
                 print(f"[brain] Dashboard request for {context.get('name', 'unknown')}")
                 start = time.time()
-                result = brain_instance.dashboard(context)
+                result = await brain_instance.dashboard(context)
                 elapsed = time.time() - start
                 result["ok"] = True
                 result["latency_ms"] = int(elapsed * 1000)
                 print(f"[brain] Dashboard done in {elapsed:.1f}s")
-                self._send_json(200, result)
+                return await self._send_json(200, result)
             except Exception as e:
                 traceback.print_exc()
-                self._send_json(500, {"ok": False, "error": str(e)})
+                return await self._send_json(500, {"ok": False, "error": str(e)})
         else:
-            self._send_json(404, {"ok": False, "error": "not_found"})
+            return await self._send_json(404, {"ok": False, "error": "not_found"})
+
+
+async def serve(port: int):
+    server = await asyncio.start_server(
+        lambda reader, writer: BrainHandler(reader, writer).handle(),
+        "0.0.0.0", port,
+    )
+    try:
+        await prewarm_claude(BRAIN_SYSTEM_PROMPT, "0.50")
+    except OSError as e:
+        print(f"[brain] WARNING: could not prewarm claude worker: {e}")
+    print(f"[brain] Listening on tcp://0.0.0.0:{port}")
+    print(f"[brain] Ready for queries.")
+    async with server:
+        await server.serve_forever()
 
 
 def main():
@@ -823,15 +1630,13 @@ def main():
 
     brain_instance = Brain()
 
-    server = HTTPServer(("0.0.0.0", port), BrainHandler)
-    print(f"[brain] Listening on tcp://0.0.0.0:{port}")
-    print(f"[brain] Ready for queries.")
-
+    # uvloop's libuv event loop when installed, stdlib asyncio otherwise
+    run = uvloop.run if HAS_UVLOOP else asyncio.run
+    print(f"[brain] Event loop: {'uvloop' if HAS_UVLOOP else 'asyncio'}")
     try:
-        server.serve_forever()
+        run(serve(port))
     except KeyboardInterrupt:
         print("\n[brain] Shutting down.")
-        server.shutdown()
 
 
 if __name__ == "__main__":
@@ -11,16 +11,39 @@ Usage:
 """
 
 import argparse
+import asyncio
+import hashlib
 import json
 import os
-import socket
 import sys
+import threading
 import time
 import traceback
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from http import HTTPStatus
 from pathlib import Path
 
 import torch
 
+try:
+    from torch._dynamo.exc import TorchDynamoException
+except ImportError:
+    TorchDynamoException = RuntimeError
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    import uvloop
+    HAS_UVLOOP = True
+except ImportError:
+    HAS_UVLOOP = False
+
 # Add model source to path
 MODEL_SRC = "/home/rob/jepaworlddiffusionlm/internal_world_model"
 sys.path.insert(0, MODEL_SRC)
@@ -29,10 +52,124 @@ from models.cfc_jepa_world_model import CFCJEPAWorldModel, CFCJEPAConfig
 
 from config import CFCDConfig
 from os_state_encoder import OSStateEncoder, OSStateVector
-from weight_manager import WeightManager
+from weight_manager import WeightManager, drop_gate_values, load_checkpoint, upcast_state_dict
 from online_learner import OnlineLearner, OSEncoderBootstrap
 
 
+INFERENCE_DTYPES = {"fp32": None, "bf16": torch.bfloat16, "fp16": torch.float16}
+PREDICT_CACHE_MAX = 64
+
+# Precomputed response header pieces: status line + JSON headers up to the length
+HDR_END = b"\r\n\r\n"
+
+
+def _response_prefix(status_code: int) -> bytes:
+    return (b"HTTP/1.1 %d %s\r\nContent-Type: application/json\r\nContent-Length: "
+            % (status_code, HTTPStatus(status_code).phrase.encode()))
+
+
+RESPONSE_PREFIXES = {code: _response_prefix(code) for code in (200, 400, 404, 500)}
+
+
+def json_loads(data):
+    """Parse a JSON request body (orjson when available)."""
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_bytes(obj) -> bytes:
+    """Serialize a response to JSON bytes; orjson also takes NumPy arrays."""
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj).encode()
+
+
+def tensor_payload(t: torch.Tensor):
+    """A tensor as a JSON-ready value: a NumPy array for orjson, else a list."""
+    t = t.detach().float().cpu()
+    return t.numpy() if HAS_ORJSON else t.tolist()
+
+
+def _content_length(head_lower: bytes, start: int = 0) -> int:
+    """Content-Length from a lowercased HTTP header block, 0 if absent."""
+    i = head_lower.find(b"\r\ncontent-length:", start)
+    if i < 0:
+        return 0
+    i += len(b"\r\ncontent-length:")
+    return int(head_lower[i:head_lower.find(b"\r\n", i)])
+
+
+class PredictBatcher:
+    """Coalesces concurrent predict requests into one batched forward pass.
+
+    The first queued embedding runs alone if nothing else is waiting;
+    otherwise requests arriving within `window_sec` (up to
+    `max_batch_size`) are concatenated into one [B, D] batch per
+    num_samples value and the output is split back along dim 0.
+    """
+
+    def __init__(self, run_batch, executor, max_batch_size: int = 16, window_sec: float = 0.003):
+        self.run_batch = run_batch  # (emb [B, D], num_samples) -> prediction [B, ...]
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.window_sec = window_sec
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self._worker = None
+
+    def start(self):
+        self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def submit(self, emb: torch.Tensor, num_samples: int) -> tuple:
+        """Queue one embedding; returns (prediction, batch latency in ms)."""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((emb, num_samples, future))
+        return await future
+
+    async def _collect(self) -> list:
+        pending = [await self.queue.get()]
+        if self.queue.empty():
+            return pending  # size-1 fast path, no added latency
+        deadline = asyncio.get_running_loop().time() + self.window_sec
+        while len(pending) < self.max_batch_size:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                pending.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return pending
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = await self._collect()
+            groups = {}
+            for item in pending:
+                groups.setdefault(item[1], []).append(item)
+            for num_samples, items in groups.items():
+                embs = [emb for emb, _, _ in items]
+                try:
+                    t0 = time.time()
+                    predicted = await loop.run_in_executor(
+                        self.executor, self._forward, embs, num_samples)
+                    latency_ms = (time.time() - t0) * 1000
+                except Exception as e:
+                    for _, _, future in items:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+                for (_, _, future), pred in zip(items, predicted):
+                    if not future.done():
+                        future.set_result((pred, latency_ms))
+
+    def _forward(self, embs: list, num_samples: int) -> tuple:
+        batch = embs[0] if len(embs) == 1 else torch.cat(embs, dim=0)
+        predicted = self.run_batch(batch, num_samples)
+        return predicted.split([emb.shape[0] for emb in embs], dim=0)
+
+
 class CFCDaemon:
     """Model runtime daemon. Loads CFC-JEPA, serves inference over Unix socket."""
 
@@ -51,8 +188,9 @@ class CFCDaemon:
         self.model, self.model_config = self._load_model(config.checkpoint_path)
         self.model.eval()
 
-        param_count = sum(p.numel() for p in self.model.parameters())
-        print(f"Model parameters: {param_count:,}")
+        # Weight rollbacks load same-shaped state dicts, so this never changes
+        self.param_count = sum(p.numel() for p in self.model.parameters())
+        print(f"Model parameters: {self.param_count:,}")
 
         # OS State Encoder
         self.os_encoder = OSStateEncoder(
@@ -61,11 +199,17 @@ class CFCDaemon:
         ).to(self.device)
         self.os_encoder.eval()
 
+        # Reused telemetry staging buffers for /v0/encode_state (pinned on CUDA)
+        self._enc_cpu = torch.empty(1, config.os_feature_dim, pin_memory=self.device.type == "cuda")
+        self._enc_dev = torch.empty(1, config.os_feature_dim, device=self.device)
+        self._enc_lock = threading.Lock()
+
         # Weight Manager
         weight_dir = config.resolve_weight_dir()
         self.weight_manager = WeightManager(
             self.model, str(weight_dir), config.max_weight_versions,
             config.auto_rollback_window,
+            save_dtype=INFERENCE_DTYPES[config.weight_save_dtype],
         )
 
         # Online Learner
@@ -84,15 +228,33 @@ class CFCDaemon:
         )
         self.learner.enabled = config.online_learning_enabled
 
+        # Reduced-precision inference (CUDA only). Model weights are only cast
+        # while learning is off, with an fp32 master copy kept to restore
+        # from; the OS encoder stays fp32 (the learner serves inference from
+        # its own reduced-precision copy), so --bootstrap trains it in fp32.
+        self.amp_dtype = self._resolve_amp_dtype(config.inference_dtype)
+        self.weights_dtype = torch.float32
+        self._fp32_master = None
+        self.learner.set_amp_dtype(self.amp_dtype)
+        if self.amp_dtype is not None and not self.learner.enabled:
+            self._cast_weights(self.amp_dtype)
+        print(f"Inference dtype: {self.amp_dtype or torch.float32}, weights: {self.weights_dtype}")
+
+        # Compiled predict path (falls back to eager predict_future)
+        self.predict_fn = self._compile_predict()
+
         # Prediction tracking
         self.total_predictions = 0
         self.total_latency_ms = 0.0
 
+        # Exact-match (embedding digest, num_samples) -> prediction, while frozen
+        self._predict_cache = OrderedDict()
+
     def _load_model(self, checkpoint_path: str):
         """Load CFC-JEPA model from checkpoint."""
         print(f"Loading checkpoint: {checkpoint_path}")
 
-        ckpt = torch.load(checkpoint_path, map_location=self.device, weights_only=False)
+        ckpt = load_checkpoint(checkpoint_path, map_location=self.device)
 
         # Reconstruct config from training_summary.json
         ckpt_dir = os.path.dirname(checkpoint_path)
@@ -126,18 +288,116 @@ class CFCDaemon:
 
         model = CFCJEPAWorldModel(config).to(self.device)
 
-        # Load weights
-        state_dict = ckpt.get("model_state_dict", ckpt)
-        filtered = {k: v for k, v in state_dict.items() if "gate_values" not in k}
-        missing, unexpected = model.load_state_dict(filtered, strict=False)
+        # Load weights: filter in place and adopt the checkpoint tensors
+        # (assign=True) rather than copying them into freshly initialized ones
+        # (saved versions may be bf16/fp16: adopted tensors must be fp32)
+        state_dict = upcast_state_dict(drop_gate_values(ckpt.get("model_state_dict", ckpt)))
+        missing, unexpected = model.load_state_dict(state_dict, strict=False, assign=True)
+        del ckpt, state_dict
         if missing:
             print(f"  Missing keys (expected for buffers): {len(missing)}")
 
         return model, config
 
+    def _resolve_amp_dtype(self, name: str):
+        """Map an inference_dtype name to a torch dtype, or None for fp32."""
+        if name not in INFERENCE_DTYPES:
+            raise ValueError(f"Unknown inference dtype: {name}")
+        dtype = INFERENCE_DTYPES[name]
+        if dtype is None or self.device.type != "cuda":
+            return None
+        if dtype == torch.bfloat16 and not torch.cuda.is_bf16_supported():
+            return torch.float16
+        return dtype
+
+    def _cast_weights(self, dtype: torch.dtype):
+        """Cast the model weights in place (optimizer refs stay valid).
+
+        Casting down first keeps an fp32 copy of the model's floating-point
+        state on the CPU; casting back to fp32 restores it, so learning and
+        saved versions never start from rounded weights.
+        """
+        if dtype == self.weights_dtype:
+            return
+        if dtype == torch.float32:
+            self.model.to(dtype=dtype)
+            # load_state_dict copies into the existing tensors
+            self.model.load_state_dict(self._fp32_master, strict=False)
+            self._fp32_master = None
+        else:
+            if self._fp32_master is None:
+                self._fp32_master = {
+                    k: v.detach().to("cpu", copy=True)
+                    for k, v in self.model.state_dict().items() if v.is_floating_point()
+                }
+            self.model.to(dtype=dtype)
+        self.weights_dtype = dtype
+
+    @contextmanager
+    def _fp32_weights(self):
+        """Run the block on the fp32 master weights, then cast back: saves
+        snapshot from them and rollbacks load into them, so the live fp32
+        weights survive both (saves still store weight_save_dtype)."""
+        dtype = self.weights_dtype
+        self._cast_weights(torch.float32)
+        try:
+            yield
+        finally:
+            self._cast_weights(dtype)
+
+    def _enable_learning(self) -> dict:
+        if self.weights_dtype != torch.float32:
+            # Gradient updates need the fp32 master weights back
+            self._cast_weights(torch.float32)
+            print("Learning enabled: weights restored to fp32")
+        self.learner.enabled = True
+        self._invalidate_predictions()
+        return {"ok": True, "learning_enabled": True}
+
+    def _disable_learning(self) -> dict:
+        self.learner.enabled = False
+        self._invalidate_predictions()  # weights may have moved since the last cached predict
+        return {"ok": True, "learning_enabled": False}
+
+    def _compile_predict(self):
+        """torch.compile model.predict_future once and warm it up.
+
+        On CUDA this uses mode="reduce-overhead", which captures CUDA graphs
+        over the diffusion steps. Those graphs reuse their output buffers on
+        the next replay, so results are cloned before they leave the call.
+        Warm-up runs every batch size the PredictBatcher can send, so no
+        request pays for a recompile or graph capture. Returns the eager
+        method if compilation is disabled or fails.
+        """
+        eager = self.model.predict_future
+        if not self.config.compile_predict or not hasattr(torch, "compile"):
+            return eager
+
+        cuda = self.device.type == "cuda"
+        compiled = torch.compile(eager, mode="reduce-overhead" if cuda else "default",
+                                 fullgraph=False)
+
+        def predict_fn(emb, num_samples=1):
+            out = compiled(emb, num_samples=num_samples)
+            return out.clone() if cuda else out
+
+        t0 = time.time()
+        try:
+            # PredictBatcher stacks up to max_batch_size requests into one
+            # [B, D] call, and each B is its own graph, so warm them all
+            with self._inference():
+                for batch in range(1, self.config.max_batch_size + 1):
+                    dummy = torch.zeros(batch, self.config.encoder_output_dim, device=self.device)
+                    predict_fn(dummy, num_samples=1)
+        except Exception as e:
+            print(f"torch.compile warmup failed, using eager predict: {e}")
+            return eager
+        print(f"Compiled predict path in {time.time() - t0:.1f}s")
+        return predict_fn
+
     # --- HTTP Request Handling ---
 
-    def handle_request(self, method: str, path: str, body: str) -> tuple:
+    def handle_request(self, method: str, path: str, body: bytes) -> tuple:
         """Route request to handler. Returns (status_code, response_dict)."""
         try:
             if method == "GET" and path == "/v0/health":
@@ -145,24 +405,25 @@ class CFCDaemon:
             elif method == "GET" and path == "/v0/introspect":
                 return 200, self._handle_introspect()
             elif method == "POST" and path == "/v0/predict":
-                return 200, self._handle_predict(json.loads(body) if body else {})
+                return 200, self._handle_predict(json_loads(body) if body else {})
             elif method == "POST" and path == "/v0/encode_state":
-                return 200, self._handle_encode_state(json.loads(body) if body else {})
+                return 200, self._handle_encode_state(json_loads(body) if body else {})
             elif method == "POST" and path == "/v0/update_weights":
-                return 200, self._handle_update_weights(json.loads(body) if body else {})
+                return 200, self._handle_update_weights(json_loads(body) if body else {})
             elif method == "POST" and path == "/v0/learning/enable":
-                self.learner.enabled = True
-                return 200, {"ok": True, "learning_enabled": True}
+                return 200, self._enable_learning()
             elif method == "POST" and path == "/v0/learning/disable":
-                self.learner.enabled = False
-                return 200, {"ok": True, "learning_enabled": False}
+                return 200, self._disable_learning()
             elif method == "POST" and path == "/v0/weights/save":
-                version = self.weight_manager.save_version()
+                with self._fp32_weights():
+                    version = self.weight_manager.save_version()
                 return 200, {"ok": True, "version": version}
             elif method == "POST" and path == "/v0/weights/rollback":
-                req = json.loads(body) if body else {}
+                req = json_loads(body) if body else {}
                 version = req.get("version", "")
-                ok = self.weight_manager.rollback(version)
+                with self._fp32_weights():
+                    ok = self.weight_manager.rollback(version)
+                self._invalidate_predictions()
                 return 200, {"ok": ok, "rolled_back_to": version}
             else:
                 return 404, {"error": f"Not found: {method} {path}"}
@@ -176,7 +437,7 @@ class CFCDaemon:
             "service": "cfcd",
             "version": "0.1.0",
             "device": str(self.device),
-            "param_count": sum(p.numel() for p in self.model.parameters()),
+            "param_count": self.param_count,
             "weight_version": self.weight_manager.get_current_version(),
             "uptime_seconds": int(time.time() - self.start_time),
             "learning_enabled": self.learner.enabled,
@@ -184,60 +445,177 @@ class CFCDaemon:
         }
 
     def _handle_predict(self, request: dict) -> dict:
-        state_list = request.get("state")
-        if state_list is None:
-            # If no state provided, encode current OS state
-            emb = self.learner.encode_os_state()
-        else:
-            emb = torch.tensor([state_list], dtype=torch.float32, device=self.device)
-
         num_samples = request.get("num_samples", 1)
-
         t0 = time.time()
-        with torch.no_grad():
-            predicted = self.model.predict_future(emb, num_samples=num_samples)
+        emb, key, predicted = self._predict_lookup(request, num_samples)
+        if predicted is None:
+            t0 = time.time()
+            predicted = self._run_predict(emb, num_samples)
+            self._remember_prediction(key, predicted)
         latency_ms = (time.time() - t0) * 1000
+        return self._predict_response(predicted, latency_ms, num_samples)
 
-        self.total_predictions += 1
-        self.total_latency_ms += latency_ms
+    async def _handle_predict_batched(self, body: bytes) -> tuple:
+        """/v0/predict through the PredictBatcher. Returns (status_code, response_dict)."""
+        loop = asyncio.get_running_loop()
+        try:
+            request = json_loads(body) if body else {}
+            num_samples = request.get("num_samples", 1)
+            t0 = time.time()
+            emb, key, predicted = await loop.run_in_executor(
+                self._model_executor, self._predict_lookup, request, num_samples)
+            if predicted is None:
+                predicted, latency_ms = await self._batcher.submit(emb, num_samples)
+                self._remember_prediction(key, predicted)
+            else:
+                latency_ms = (time.time() - t0) * 1000
+            return 200, await loop.run_in_executor(
+                self._model_executor, self._predict_response, predicted, latency_ms, num_samples)
+        except Exception as e:
+            traceback.print_exc()
+            return 500, {"error": str(e)}
 
-        # Gate stats
-        gate_stats = {}
+    def _predict_input(self, request: dict) -> torch.Tensor:
+        state_list = request.get("state")
+        if state_list is None:
+            # If no state provided, encode current OS state
+            return self.learner.encode_os_state()
+        return self._to_device(state_list)
+
+    def _predict_lookup(self, request: dict, num_samples: int) -> tuple:
+        """(emb, cache key, cached prediction or None) for a predict request.
+
+        The key is None, and nothing is cached, while online learning may be
+        changing the weights between calls.
+        """
+        emb = self._predict_input(request)
+        if self.learner.enabled:
+            return emb, None, None
+        digest = hashlib.blake2b(emb.detach().float().cpu().numpy().tobytes(), digest_size=16).digest()
+        key = (digest, num_samples)
+        cache = self._predict_cache
+        predicted = cache.get(key)
+        if predicted is not None:
+            try:
+                cache.move_to_end(key)
+            except KeyError:
+                pass  # evicted by the event loop thread in between
+        return emb, key, predicted
+
+    def _remember_prediction(self, key, predicted: torch.Tensor):
+        if key is None or self.learner.enabled:
+            return
+        cache = self._predict_cache
+        cache[key] = predicted
+        while len(cache) > PREDICT_CACHE_MAX:
+            cache.popitem(last=False)
+
+    def _invalidate_predictions(self):
+        # Rebind rather than clear(): the model thread may be using the old dict
+        self._predict_cache = OrderedDict()
+
+    def _to_device(self, values: list) -> torch.Tensor:
+        """[values] as a float32 [1, D] tensor on the model device."""
+        return torch.as_tensor(values, dtype=torch.float32).unsqueeze(0).to(self.device, non_blocking=True)
+
+    @contextmanager
+    def _inference(self):
+        """inference_mode while the model is frozen, no_grad while learning.
+
+        The online learner trains this same model, and tensors created under
+        inference_mode (such as gate values cached by a forward pass) cannot
+        take part in autograd afterwards. Forward passes run under autocast
+        when a reduced inference dtype is configured.
+        """
+        grad_mode = torch.no_grad() if self.learner.enabled else torch.inference_mode()
+        autocast = (torch.autocast(device_type="cuda", dtype=self.amp_dtype)
+                    if self.amp_dtype is not None else nullcontext())
+        with grad_mode, autocast:
+            yield
+
+    def _run_predict(self, emb: torch.Tensor, num_samples: int) -> torch.Tensor:
+        with self._inference():
+            try:
+                return self.predict_fn(emb, num_samples=num_samples)
+            except TorchDynamoException:
+                if self.predict_fn == self.model.predict_future:
+                    raise
+                traceback.print_exc()
+                print("Compiled predict failed, falling back to eager")
+                self.predict_fn = self.model.predict_future
+                return self.predict_fn(emb, num_samples=num_samples)
+
+    def _gate_stats(self) -> dict:
+        """Per-gate mean/std/min/max, copied off the device in one transfer."""
         try:
             raw_stats = self.model.get_gate_stats()
-            for k, v in raw_stats.items():
-                gate_stats[str(k)] = {
-                    "mean": float(v[0]),
-                    "std": float(v[1]),
-                    "min": float(v[2]),
-                    "max": float(v[3]),
-                }
         except Exception:
-            pass
+            return {}
+        if not raw_stats:
+            return {}
+        values = list(raw_stats.values())
+        if not any(isinstance(v, torch.Tensor) for v in values):
+            # Plain Python numbers: nothing to transfer, skip the stack
+            rows = [[float(x) for x in v[:4]] for v in values]
+        else:
+            try:
+                rows = torch.stack([torch.as_tensor(v, dtype=torch.float32)[:4] for v in values])
+                rows = rows.cpu().tolist()
+            except Exception:
+                rows = [[float(x) for x in v[:4]] for v in values]
+        return {
+            str(k): {"mean": row[0], "std": row[1], "min": row[2], "max": row[3]}
+            for k, row in zip(raw_stats, rows)
+        }
+
+    def _predict_response(self, predicted: torch.Tensor, latency_ms: float, num_samples: int) -> dict:
+        self.total_predictions += 1
+        self.total_latency_ms += latency_ms
+
+        gate_stats = self._gate_stats()
 
         return {
             "ok": True,
-            "prediction": predicted.squeeze(0).cpu().tolist(),
+            "prediction": tensor_payload(predicted.squeeze(0)),
             "gate_stats": gate_stats,
             "latency_ms": round(latency_ms, 2),
             "num_samples": num_samples,
         }
 
+    def _encode(self, raw: torch.Tensor) -> torch.Tensor:
+        """Run the learner's inference encoder (the reduced-precision copy
+        under AMP, fed and read back like OnlineLearner.encode_os_state)."""
+        encoder = self.learner.inference_encoder
+        if self.learner.amp_dtype is not None:
+            return encoder(raw.to(self.learner.amp_dtype)).float()
+        return encoder(raw)
+
     def _handle_encode_state(self, request: dict) -> dict:
         """Encode OS telemetry to 1024-dim embedding."""
         if "telemetry" in request:
-            raw = torch.tensor([request["telemetry"]], dtype=torch.float32, device=self.device)
+            values = torch.as_tensor(request["telemetry"], dtype=torch.float32)
         else:
-            raw_np = OSStateVector.collect()
-            raw = torch.from_numpy(raw_np).unsqueeze(0).to(self.device)
-
-        with torch.no_grad():
-            emb = self.os_encoder(raw)
+            values = torch.from_numpy(OSStateVector.collect())
+
+        if values.shape != self._enc_cpu.shape[1:]:
+            # Odd-sized telemetry: let the encoder report the shape mismatch
+            raw = values.unsqueeze(0).to(self.device)
+            with self._inference():
+                emb = self._encode(raw)
+            input_dim = raw.shape[-1]
+        else:
+            with self._enc_lock:
+                self._enc_cpu[0].copy_(values)
+                raw = self._enc_dev
+                raw.copy_(self._enc_cpu, non_blocking=True)
+                with self._inference():
+                    emb = self._encode(raw)
+                input_dim = raw.shape[-1]
 
         return {
             "ok": True,
-            "embedding": emb.squeeze(0).cpu().tolist(),
-            "input_dim": raw.shape[-1],
+            "embedding": tensor_payload(emb.squeeze(0)),
+            "input_dim": input_dim,
             "output_dim": emb.shape[-1],
         }
 
@@ -262,16 +640,7 @@ class CFCDaemon:
 
     def _handle_introspect(self) -> dict:
         """Full model introspection."""
-        gate_stats = {}
-        try:
-            raw_stats = self.model.get_gate_stats()
-            for k, v in raw_stats.items():
-                gate_stats[str(k)] = {
-                    "mean": float(v[0]), "std": float(v[1]),
-                    "min": float(v[2]), "max": float(v[3]),
-                }
-        except Exception:
-            pass
+        gate_stats = self._gate_stats()
 
         avg_latency = (self.total_latency_ms / self.total_predictions
                        if self.total_predictions > 0 else 0)
@@ -279,7 +648,7 @@ class CFCDaemon:
         return {
             "model": {
                 "weight_version": self.weight_manager.get_current_version(),
-                "param_count": sum(p.numel() for p in self.model.parameters()),
+                "param_count": self.param_count,
                 "encoder_dim": self.model_config.encoder_dim,
                 "hidden_dim": self.model_config.hidden_dim,
                 "diffusion_steps": self.model_config.diffusion_steps,
@@ -298,32 +667,51 @@ class CFCDaemon:
 
     # --- Unix Socket + TCP HTTP Server ---
 
+    # Cheap control routes answered on the event loop itself, so they never
+    # queue behind a slow predict in the model executor. learning/enable is
+    # not one of them: it may cast the weights back to fp32.
+    INLINE_ROUTES = {
+        ("GET", "/v0/health"),
+        ("POST", "/v0/learning/disable"),
+    }
+
     def run(self, tcp_port: int = 0):
         """Start the HTTP server on Unix socket and optionally TCP."""
+        # uvloop's libuv (epoll) event loop when installed, stdlib asyncio otherwise
+        run = uvloop.run if HAS_UVLOOP else asyncio.run
+        print(f"Event loop: {'uvloop' if HAS_UVLOOP else 'asyncio'}")
+        try:
+            run(self._serve(tcp_port))
+        except KeyboardInterrupt:
+            print("\nShutting down cfcd...")
+        finally:
+            self.learner.stop()
+            self.weight_manager.wait_for_pending_saves()
+            if os.path.exists(self.config.socket_path):
+                os.unlink(self.config.socket_path)
+
+    async def _serve(self, tcp_port: int):
         sock_path = self.config.socket_path
-        servers = []
+        # One worker owns every model call, keeping torch use serialized
+        self._model_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cfcd-model")
+        self._batcher = PredictBatcher(self._run_predict, self._model_executor,
+                                       max_batch_size=self.config.max_batch_size)
+        self._batcher.start()
 
         # Unix socket
         if os.path.exists(sock_path):
             os.unlink(sock_path)
 
-        unix_server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
-        unix_server.bind(sock_path)
-        unix_server.listen(5)
+        servers = [await asyncio.start_unix_server(self._handle_connection, path=sock_path)]
         os.chmod(sock_path, 0o666)
-        servers.append(unix_server)
 
         print(f"\ncfcd listening on {sock_path}")
         print(f"  Health: curl --unix-socket {sock_path} http://localhost/v0/health")
 
         # Optional TCP listener (for QEMU guest bridge)
-        tcp_server = None
         if tcp_port > 0:
-            tcp_server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            tcp_server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            tcp_server.bind(("0.0.0.0", tcp_port))
-            tcp_server.listen(5)
-            servers.append(tcp_server)
+            servers.append(await asyncio.start_server(
+                self._handle_connection, "0.0.0.0", tcp_port, reuse_address=True))
             print(f"  TCP:  http://0.0.0.0:{tcp_port}/v0/health")
 
         print(f"  Predict: curl --unix-socket {sock_path} -X POST "
@@ -335,79 +723,59 @@ class CFCDaemon:
             self.learner.start_background(interval_sec)
             print(f"Online learning started (interval={interval_sec}s)")
 
-        import select
-
         try:
-            while True:
-                readable, _, _ = select.select(servers, [], [], 1.0)
-                for srv in readable:
-                    conn, _ = srv.accept()
-                    try:
-                        self._handle_connection(conn)
-                    except Exception as e:
-                        print(f"Connection error: {e}")
-                    finally:
-                        conn.close()
-        except KeyboardInterrupt:
-            print("\nShutting down cfcd...")
+            await asyncio.gather(*(srv.serve_forever() for srv in servers))
         finally:
-            self.learner.stop()
             for srv in servers:
                 srv.close()
-            if os.path.exists(sock_path):
-                os.unlink(sock_path)
+            self._model_executor.shutdown(wait=False)
 
-    def _handle_connection(self, conn: socket.socket):
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
         """Handle a single HTTP connection."""
-        data = b""
-        while True:
-            chunk = conn.recv(4096)
-            if not chunk:
-                break
-            data += chunk
-            if b"\r\n\r\n" in data:
-                break
-
-        if not data:
-            return
-
-        request_str = data.decode("utf-8", errors="replace")
-        header_end = request_str.index("\r\n\r\n")
-        headers = request_str[:header_end]
-        body = request_str[header_end + 4:]
-
-        # Parse request line
-        first_line = headers.split("\r\n")[0]
-        parts = first_line.split(" ")
-        method = parts[0] if len(parts) >= 1 else "GET"
-        path = parts[1] if len(parts) >= 2 else "/"
-
-        # Check Content-Length for body
-        content_length = 0
-        for line in headers.split("\r\n"):
-            if line.lower().startswith("content-length:"):
-                content_length = int(line.split(":")[1].strip())
-
-        # Read remaining body if needed
-        while len(body.encode()) < content_length:
-            chunk = conn.recv(4096)
-            if not chunk:
-                break
-            body += chunk.decode("utf-8", errors="replace")
-
-        # Handle request
-        status_code, response = self.handle_request(method, path, body)
-
-        # Send HTTP response
-        response_json = json.dumps(response)
-        http_response = (
-            f"HTTP/1.1 {status_code} OK\r\n"
-            f"Content-Type: application/json\r\n"
-            f"Content-Length: {len(response_json)}\r\n"
-            f"\r\n"
-            f"{response_json}"
-        )
-        conn.sendall(http_response.encode())
+        try:
+            try:
+                head = await reader.readuntil(b"\r\n\r\n")
+            except asyncio.IncompleteReadError:
+                return
+
+            # Parse request line
+            line_end = head.find(b"\r\n")
+            parts = head[:line_end].decode("latin-1").split(" ")
+            method = parts[0] if len(parts) >= 1 else "GET"
+            path = parts[1] if len(parts) >= 2 else "/"
+
+            # Content-Length is the only header we need: one lowercase copy
+            # and a find, instead of splitting and scanning every header
+            content_length = _content_length(head.lower(), line_end)
+
+            # The body stays bytes; json_loads decodes it exactly once
+            body = b""
+            if content_length > 0:
+                try:
+                    body = await reader.readexactly(content_length)
+                except asyncio.IncompleteReadError as e:
+                    body = e.partial
+
+            # Handle request
+            if (method, path) in self.INLINE_ROUTES:
+                status_code, response = self.handle_request(method, path, body)
+            elif method == "POST" and path == "/v0/predict":
+                status_code, response = await self._handle_predict_batched(body)
+            else:
+                loop = asyncio.get_running_loop()
+                status_code, response = await loop.run_in_executor(
+                    self._model_executor, self.handle_request, method, path, body)
+
+            # Send HTTP response
+            response_body = json_bytes(response)
+            prefix = RESPONSE_PREFIXES.get(status_code) or _response_prefix(status_code)
+            # writelines hands the pieces to the transport without joining them here
+            writer.writelines((prefix, b"%d" % len(response_body), HDR_END, response_body))
+            await writer.drain()
+        except Exception as e:
+            print(f"Connection error: {e}")
+        finally:
+            writer.close()
 
 
 def main():
@@ -427,6 +795,12 @@ def main():
                         help="Seconds of telemetry to collect for bootstrap")
     parser.add_argument("--tcp-port", type=int, default=0,
                         help="Also listen on TCP port (for QEMU guest bridge)")
+    parser.add_argument("--no-compile", action="store_true",
+                        help="Run predict eagerly instead of through torch.compile")
+    parser.add_argument("--inference-dtype", choices=sorted(INFERENCE_DTYPES), default="bf16",
+                        help="Inference precision on CUDA (fp32 on CPU)")
+    parser.add_argument("--weight-save-dtype", choices=sorted(INFERENCE_DTYPES), default="bf16",
+                        help="Precision of saved weight versions")
     args = parser.parse_args()
 
     config = CFCDConfig(
@@ -436,6 +810,9 @@ def main():
         online_learning_enabled=args.enable_learning,
         telemetry_interval_ms=int(args.learning_interval * 1000),
         bootstrap_duration_sec=args.bootstrap_seconds,
+        compile_predict=not args.no_compile,
+        inference_dtype=args.inference_dtype,
+        weight_save_dtype=args.weight_save_dtype,
     )
 
     daemon = CFCDaemon(config)
@@ -454,6 +831,7 @@ def main():
             callback=lambda i, n: print(f"  Collected {i}/{n} samples")
         )
         result = bootstrap.train_encoder(telemetry)
+        daemon.learner.refresh_inference_encoder()
         print(f"Bootstrap complete: acc={result.get('final_accuracy', 0)*100:.1f}%")
 
     daemon.run(tcp_port=args.tcp_port)
@@ -1,10 +1,22 @@
 """Configuration for the cfcd model runtime daemon."""
 
-from dataclasses import dataclass, field
+import functools
+from dataclasses import dataclass
 from pathlib import Path
 
 
-@dataclass
+@functools.lru_cache(maxsize=None)
+def _resolve_weight_dir(weight_version_dir: str) -> Path:
+    p = Path(weight_version_dir).resolve()
+    try:
+        p.mkdir(parents=True, exist_ok=True)
+    except PermissionError:
+        p = Path.home() / ".aether" / "aurora" / "models"
+        p.mkdir(parents=True, exist_ok=True)
+    return p
+
+
+@dataclass(frozen=True, slots=True)
 class CFCDConfig:
     # Model loading
     checkpoint_path: str = ""
@@ -19,6 +31,8 @@ class CFCDConfig:
     # Inference
     ddim_steps: int = 10
     max_batch_size: int = 16
+    compile_predict: bool = True  # torch.compile the predict path at startup
+    inference_dtype: str = "bf16"  # "fp32", "bf16", "fp16" (CUDA only)
 
     # Online learning
     online_learning_enabled: bool = False
@@ -36,6 +50,7 @@ class CFCDConfig:
     weight_version_dir: str = "/var/lib/aether/aurora/models"
     max_weight_versions: int = 10
     auto_rollback_window: int = 100
+    weight_save_dtype: str = "bf16"  # "fp32", "bf16", "fp16": on-disk dtype of saved versions
 
     # OS State Encoder
     os_feature_dim: int = 128
@@ -45,12 +60,9 @@ class CFCDConfig:
     bootstrap_epochs: int = 50
 
     def resolve_weight_dir(self) -> Path:
-        """Return weight dir, creating if needed. Falls back to local."""
-        p = Path(self.weight_version_dir)
-        try:
-            p.mkdir(parents=True, exist_ok=True)
-            return p
-        except PermissionError:
-            fallback = Path.home() / ".aether" / "aurora" / "models"
-            fallback.mkdir(parents=True, exist_ok=True)
-            return fallback
+        """Return weight dir, creating if needed. Falls back to local.
+
+        The directory is resolved (and created) once per path; later calls
+        return the cached path without touching the filesystem.
+        """
+        return _resolve_weight_dir(self.weight_version_dir)
@@ -28,7 +28,7 @@ sys.path.insert(0, MODEL_SRC)
 from config import CFCDConfig
 from os_state_encoder import OSStateEncoder, OSStateVector
 from online_learner import OnlineLearner, OSEncoderBootstrap
-from weight_manager import WeightManager
+from weight_manager import WeightManager, drop_gate_values, load_checkpoint, upcast_state_dict
 from models.cfc_jepa_world_model import CFCJEPAWorldModel, CFCJEPAConfig
 
 import json
@@ -38,7 +38,8 @@ import os
 def load_model(checkpoint_path: str, device: torch.device):
     """Load CFC-JEPA from checkpoint."""
     print(f"Loading checkpoint: {checkpoint_path}")
-    ckpt = torch.load(checkpoint_path, map_location=device, weights_only=False)
+    # Also resolves a saved version's refs and reads .safetensors versions
+    ckpt = load_checkpoint(checkpoint_path, map_location=device)
 
     ckpt_dir = os.path.dirname(checkpoint_path)
     summary_path = os.path.join(ckpt_dir, "training_summary.json")
@@ -65,9 +66,10 @@ def load_model(checkpoint_path: str, device: torch.device):
         config = CFCJEPAConfig(diffusion_steps=10)
 
     model = CFCJEPAWorldModel(config).to(device)
-    state_dict = ckpt.get("model_state_dict", ckpt)
-    filtered = {k: v for k, v in state_dict.items() if "gate_values" not in k}
-    model.load_state_dict(filtered, strict=False)
+    # Saved versions may be bf16/fp16: load fp32 tensors, without gate_values
+    state_dict = upcast_state_dict(drop_gate_values(ckpt.get("model_state_dict", ckpt)))
+    model.load_state_dict(state_dict, strict=False, assign=True)
+    del ckpt, state_dict
     model.eval()
 
     param_count = sum(p.numel() for p in model.parameters())
@@ -142,6 +144,20 @@ def run_demo(args):
     else:
         print("\n  (Skipping bootstrap)")
 
+    # Compile the per-observation hot path. The small [1, 128] encoder MLP is
+    # scripted for inference (its eager module is kept for training); the
+    # predictor is compiled in place with Module.compile(), so state_dict
+    # keys (and therefore saved weight versions) are unchanged. No CUDA
+    # graphs ("reduce-overhead"): the loop keeps outputs of one call alive
+    # across the next, which graph replays would overwrite.
+    if not args.no_compile:
+        learner.script_encoder()
+        model.predictor.compile()
+        print("  Scripted OS encoder, compiled predictor; warming up...")
+        t0 = time.time()
+        learner.warmup()
+        print(f"  Warm-up done in {time.time() - t0:.1f}s")
+
     # Signal handler for clean shutdown
     running = [True]
 
@@ -190,6 +206,7 @@ def run_demo(args):
             print(f"  >>> Saved weight version: {v}")
 
     # Final stats
+    weight_manager.wait_for_pending_saves()
     stats = learner.get_stats()
     print(f"\n{'='*60}")
     print(f"  Session Summary")
@@ -220,6 +237,8 @@ def main():
                         help="Seconds of telemetry for bootstrap (default: 30)")
     parser.add_argument("--skip-bootstrap", action="store_true",
                         help="Skip encoder bootstrap (use random encoder)")
+    parser.add_argument("--no-compile", action="store_true",
+                        help="Run the encoder and predictor eagerly")
     args = parser.parse_args()
     run_demo(args)
 
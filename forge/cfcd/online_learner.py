@@ -6,9 +6,12 @@ compare to reality -> update weights when prediction error exceeds threshold.
 Includes experience buffer and OS encoder bootstrap.
 """
 
+import copy
+import queue
 import time
 import threading
 from collections import deque
+from contextlib import nullcontext
 from typing import Optional
 
 import numpy as np
@@ -20,40 +23,139 @@ from os_state_encoder import OSStateVector, OSStateEncoder
 from weight_manager import WeightManager
 
 
+# Layers whose forward depends on train()/eval(): dropout, batch/instance
+# norm running stats, and attention dropout
+_MODE_DEPENDENT = (
+    nn.modules.dropout._DropoutNd,
+    nn.modules.batchnorm._NormBase,
+    nn.MultiheadAttention,
+)
+
+
+def needs_train_mode(module: nn.Module) -> bool:
+    """True if switching module to train mode changes what it computes."""
+    return any(isinstance(m, _MODE_DEPENDENT) for m in module.modules())
+
+
 class ExperienceBuffer:
-    """Circular buffer of (state_t, state_t+1) observation pairs."""
+    """Circular buffer of (state_t, state_t+1) observation pairs.
 
-    def __init__(self, max_size: int = 64):
+    Pairs live in two preallocated [max_size, dim] tensors on the learner's
+    device (allocated on the first add, once dim is known), so adding a pair
+    and sampling a batch never leave the device.
+    """
+
+    def __init__(self, max_size: int = 64, device: str = "cpu"):
         self.max_size = max_size
-        self.current_states: list = []
-        self.future_states: list = []
+        self.device = torch.device(device)
+        self.current_buf: Optional[torch.Tensor] = None
+        self.future_buf: Optional[torch.Tensor] = None
+        self.size = 0
         self.position = 0
         self.full = False
 
+    def _allocate(self, dim: int):
+        def buf():
+            return torch.empty(self.max_size, dim, dtype=torch.float32, device=self.device)
+        self.current_buf, self.future_buf = buf(), buf()
+
     def add(self, current: torch.Tensor, future: torch.Tensor):
         """Add an observation pair."""
-        if len(self.current_states) < self.max_size:
-            self.current_states.append(current.detach().cpu())
-            self.future_states.append(future.detach().cpu())
+        if self.current_buf is None:
+            self._allocate(current.shape[-1])
+        self.current_buf[self.position].copy_(current.detach())
+        self.future_buf[self.position].copy_(future.detach())
+        if self.size < self.max_size:
+            self.size += 1
         else:
-            self.current_states[self.position] = current.detach().cpu()
-            self.future_states[self.position] = future.detach().cpu()
             self.full = True
         self.position = (self.position + 1) % self.max_size
 
-    def sample_batch(self, batch_size: int = 16, device: str = "cpu") -> tuple:
+    def sample_batch(self, batch_size: int = 16, device: Optional[str] = None) -> tuple:
         """Sample a random mini-batch for training."""
-        n = len(self.current_states)
-        indices = np.random.choice(n, size=min(batch_size, n), replace=False)
-        current = torch.stack([self.current_states[i] for i in indices]).to(device)
-        future = torch.stack([self.future_states[i] for i in indices]).to(device)
+        # Sampled without replacement by torch's RNG on the buffer's device
+        idx = torch.randperm(self.size, device=self.device)[:batch_size]
+        current = self.current_buf.index_select(0, idx)
+        future = self.future_buf.index_select(0, idx)
+        if device is not None:
+            current, future = current.to(device), future.to(device)
         return current, future
 
     def is_ready(self, min_samples: int = 16) -> bool:
-        return len(self.current_states) >= min_samples
+        return self.size >= min_samples
 
     def __len__(self):
-        return len(self.current_states)
+        return self.size
+
+
+class TelemetryProducer:
+    """Background thread sampling OSStateVector.collect() every interval_sec.
+
+    The learning loop pairs consecutive samples as (state_t, state_t+1), so
+    telemetry collection overlaps predict and gradient-update work instead
+    of running inline after it. Only the freshest samples are queued.
+    """
+
+    def __init__(self, interval_sec: float, maxsize: int = 2):
+        self.interval_sec = interval_sec
+        self.queue: queue.Queue = queue.Queue(maxsize=maxsize)
+        self._last: Optional[np.ndarray] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _run(self):
+        next_t = time.monotonic()
+        while not self._stop.is_set():
+            sample = OSStateVector.collect()
+            try:
+                self.queue.put_nowait(sample)
+            except queue.Full:
+                # Consumer fell behind: drop the stalest sample (only this
+                # thread puts, so there is room afterwards)
+                try:
+                    self.queue.get_nowait()
+                except queue.Empty:
+                    pass
+                self.queue.put_nowait(sample)
+            next_t = max(next_t + self.interval_sec, time.monotonic())
+            self._stop.wait(next_t - time.monotonic())
+
+    def _timeout(self) -> float:
+        return max(5.0, 4 * self.interval_sec)
+
+    def current(self) -> Optional[np.ndarray]:
+        """Freshest sample: a queued one if any, else the last one handed out
+        (the previous pair's future). None if the producer has stalled."""
+        sample = None
+        while True:
+            try:
+                sample = self.queue.get_nowait()
+            except queue.Empty:
+                break
+        if sample is None:
+            sample = self._last
+        if sample is None:
+            return self.next()
+        self._last = sample
+        return sample
+
+    def next(self) -> Optional[np.ndarray]:
+        """The next sample produced, waiting up to a few intervals for it."""
+        try:
+            self._last = self.queue.get(timeout=self._timeout())
+        except queue.Empty:
+            return None
+        return self._last
 
 
 class OSEncoderBootstrap:
@@ -82,23 +184,26 @@ class OSEncoderBootstrap:
 
     def collect_telemetry(self, callback=None) -> torch.Tensor:
         """Collect [N, 128] raw telemetry vectors."""
-        samples = []
         interval = 1.0 / self.sample_hz
         total_samples = self.collection_seconds * self.sample_hz
+        samples = np.empty((total_samples, OSStateVector.FEATURE_DIM), dtype=np.float32)
 
         print(f"Collecting {total_samples} telemetry samples "
               f"over {self.collection_seconds}s at {self.sample_hz}Hz...")
 
+        # Sleep to fixed deadlines so collect() time doesn't stretch the
+        # period; a tick that overruns is not made up with a burst
+        next_t = time.monotonic()
         for i in range(total_samples):
-            state = OSStateVector.collect()
-            samples.append(state)
+            OSStateVector.collect(out=samples[i])
 
             if callback and (i + 1) % (self.sample_hz * 10) == 0:
                 callback(i + 1, total_samples)
 
-            time.sleep(interval)
+            next_t = max(next_t + interval, time.monotonic())
+            time.sleep(max(0.0, next_t - time.monotonic()))
 
-        return torch.tensor(np.array(samples), dtype=torch.float32)
+        return torch.from_numpy(samples)
 
     def train_encoder(self, telemetry: torch.Tensor) -> dict:
         """Train encoder using temporal contrastive loss.
@@ -111,51 +216,54 @@ class OSEncoderBootstrap:
 
         self.encoder.train()
         self.encoder.to(self.device)
-        optimizer = torch.optim.AdamW(self.encoder.parameters(), lr=1e-3, weight_decay=1e-5)
+        # Fused AdamW updates every parameter in one multi-tensor kernel (CUDA only)
+        optimizer = torch.optim.AdamW(self.encoder.parameters(), lr=1e-3, weight_decay=1e-5,
+                                      fused=self.device.type == "cuda")
 
-        # Create adjacent pairs
-        current = telemetry[:-1].to(self.device)  # [N-1, 128]
-        future = telemetry[1:].to(self.device)     # [N-1, 128]
+        # Create adjacent pairs: two views of a single device copy
+        telemetry = telemetry.to(self.device)
+        current = telemetry[:-1]  # [N-1, 128]
+        future = telemetry[1:]    # [N-1, 128]
 
         batch_size = min(64, len(current))
         history = {"loss": [], "accuracy": []}
 
+        # Only full batches are used, so the InfoNCE targets never change
+        labels = torch.arange(batch_size, device=self.device)
+
         for epoch in range(self.epochs):
             # Shuffle pairs
-            perm = torch.randperm(len(current))
-            epoch_loss = 0.0
-            epoch_acc = 0.0
+            perm = torch.randperm(len(current), device=self.device)
+            # Per-epoch sums stay on the device: one host sync per epoch
+            epoch_loss = torch.zeros((), device=self.device)
+            epoch_acc = torch.zeros((), device=self.device)
             n_batches = 0
 
             for start in range(0, len(current) - batch_size + 1, batch_size):
                 idx = perm[start : start + batch_size]
-                c_batch = current[idx]
-                f_batch = future[idx]
 
-                # Encode both
-                z_c = F.normalize(self.encoder(c_batch), dim=-1)
-                z_f = F.normalize(self.encoder(f_batch), dim=-1)
+                # Encode both views in one forward pass (LayerNorm is per-row,
+                # so this matches encoding them separately)
+                z = F.normalize(self.encoder(torch.cat((current[idx], future[idx]))), dim=-1)
+                z_c, z_f = z.split(batch_size)
 
                 # InfoNCE: diagonal should be highest similarity
                 logits = z_c @ z_f.T / self.temperature
-                labels = torch.arange(len(logits), device=self.device)
                 loss = F.cross_entropy(logits, labels)
 
-                optimizer.zero_grad()
+                optimizer.zero_grad(set_to_none=True)
                 loss.backward()
                 torch.nn.utils.clip_grad_norm_(self.encoder.parameters(), 1.0)
                 optimizer.step()
 
                 with torch.no_grad():
-                    acc = (logits.argmax(dim=1) == labels).float().mean()
-
-                epoch_loss += loss.item()
-                epoch_acc += acc.item()
+                    epoch_acc += (logits.argmax(dim=1) == labels).float().mean()
+                    epoch_loss += loss.detach()
                 n_batches += 1
 
             if n_batches > 0:
-                avg_loss = epoch_loss / n_batches
-                avg_acc = epoch_acc / n_batches
+                avg_loss = epoch_loss.item() / n_batches
+                avg_acc = epoch_acc.item() / n_batches
                 history["loss"].append(avg_loss)
                 history["accuracy"].append(avg_acc)
 
@@ -185,6 +293,9 @@ class OnlineLearner:
     7. Optionally version the weights
     """
 
+    # Observations between batched hand-offs of errors to the weight manager
+    ERROR_FLUSH_INTERVAL = 50
+
     def __init__(
         self,
         model: nn.Module,
@@ -218,23 +329,61 @@ class OnlineLearner:
             + list(os_encoder.parameters())
         )
 
+        # Freeze everything else: the optimizer never steps it, so autograd
+        # should neither record nor back-propagate through it
+        trainable_ids = {id(p) for p in self.trainable_params}
+        for p in model.parameters():
+            if id(p) not in trainable_ids:
+                p.requires_grad_(False)
+
         self.optimizer = torch.optim.AdamW(
             self.trainable_params,
             lr=warmup_lr,
             weight_decay=1e-6,
+            fused=device.type == "cuda",
         )
 
-        self.buffer = ExperienceBuffer(max_size=buffer_size)
+        self.buffer = ExperienceBuffer(max_size=buffer_size, device=device)
+
+        # Checked once: models without dropout/norm layers compute the same
+        # in either mode, so updates skip the train()/eval() module walks
+        self._model_needs_train = needs_train_mode(model)
+        self._encoder_needs_train = needs_train_mode(os_encoder)
+
+        # Module encode_os_state runs; script_encoder() swaps in a TorchScript
+        # copy that shares os_encoder's parameters
+        self.inference_encoder: nn.Module = os_encoder
+
+        # Reused host staging row for encode_os_state (pinned on CUDA). The
+        # event marks when the last async copy out of it has finished.
+        self._raw_host = torch.empty(1, OSStateVector.FEATURE_DIM, pin_memory=device.type == "cuda")
+        self._raw_copied = torch.cuda.Event() if device.type == "cuda" else None
+        self._raw_lock = threading.Lock()
+
+        # Mixed precision (set_amp_dtype): autocast forward passes, fp32 master
+        # weights. encode_os_state runs a reduced-precision copy of os_encoder.
+        self.use_amp = False
+        self.amp_dtype: Optional[torch.dtype] = None
+        self.grad_scaler: Optional[torch.amp.GradScaler] = None
+        self._encoder_lp: Optional[nn.Module] = None
 
         # Statistics
         self.total_observations = 0
         self.total_updates = 0
         self.prediction_errors: deque = deque(maxlen=1000)
+        # Pre-update errors not yet handed to the weight manager
+        self._pending_errors: deque = deque(maxlen=256)
         self.update_history: list = []
         self.enabled = True
         self._running = False
         self._thread: Optional[threading.Thread] = None
 
+    def _flush_errors(self):
+        """Hand buffered pre-update errors to the weight manager in one batch."""
+        if self._pending_errors:
+            self.weight_manager.record_prediction_errors(self._pending_errors)
+            self._pending_errors.clear()
+
     def _get_lr(self) -> float:
         """Get current learning rate with warmup."""
         if self.total_updates < self.warmup_updates:
@@ -247,41 +396,148 @@ class OnlineLearner:
         for pg in self.optimizer.param_groups:
             pg["lr"] = lr
 
-    def encode_os_state(self) -> torch.Tensor:
-        """Collect and encode current OS state to 1024-dim embedding."""
-        raw = OSStateVector.collect()
-        x = torch.from_numpy(raw).unsqueeze(0).to(self.device)
+    def _autocast(self):
+        if self.use_amp and self.amp_dtype is not None and self.device.type == "cuda":
+            return torch.autocast(device_type="cuda", dtype=self.amp_dtype)
+        return nullcontext()
+
+    def set_amp_dtype(self, dtype: Optional[torch.dtype]):
+        """Enable mixed precision (CUDA only) with the given dtype, or disable it.
+
+        Gradient updates autocast against os_encoder, which must stay fp32
+        (callers don't cast it; cfcd's /v0/encode_state also goes through
+        inference_encoder); encode_os_state runs a copy of it cast to dtype,
+        which moves half the bytes per call. The copy is refreshed after
+        every update (refresh_inference_encoder). Call before
+        script_encoder() so the copy is what gets scripted.
+        """
+        self.use_amp = dtype is not None and self.device.type == "cuda"
+        self.amp_dtype = dtype if self.use_amp else None
+        if self.use_amp:
+            self._encoder_lp = copy.deepcopy(self.os_encoder).to(dtype=dtype).eval()
+            self._encoder_lp.requires_grad_(False)
+            self.inference_encoder = self._encoder_lp
+        else:
+            self._encoder_lp = None
+            self.inference_encoder = self.os_encoder
+
+    def refresh_inference_encoder(self):
+        """Copy os_encoder's weights into the reduced-precision inference copy
+        (no-op without one). Needed after anything trains os_encoder."""
+        if self._encoder_lp is None:
+            return
+        with self._raw_lock, torch.no_grad():
+            # copy_ casts each fp32 tensor into the copy's existing storage,
+            # so a scripted inference_encoder sees the new weights too
+            self._encoder_lp.load_state_dict(self.os_encoder.state_dict())
+
+    def script_encoder(self) -> nn.Module:
+        """Serve encode_os_state from a TorchScript copy of the OS encoder.
+
+        The scripted module shares its parameters with os_encoder (or with
+        the reduced-precision copy under AMP), so training stays visible to
+        it. One warm-up call pays the JIT cost up front.
+        """
+        source = self._encoder_lp if self._encoder_lp is not None else self.os_encoder
+        scripted = torch.jit.script(source.eval())
         with torch.no_grad():
-            emb = self.os_encoder(x)
+            scripted(torch.zeros(1, OSStateVector.FEATURE_DIM, device=self.device,
+                                 dtype=self.amp_dtype or torch.float32))
+        self.inference_encoder = scripted
+        return scripted
+
+    def warmup(self, iterations: int = 3):
+        """Run dummy encode / predict / loss passes at the loop's shapes.
+
+        Call after script_encoder() or compiling the model so TorchScript and
+        torch.compile specialization happens here instead of stalling the
+        first loop iterations. The loss pass runs backward too (compiling the
+        backward graph); its gradients are discarded and no weights change.
+        """
+        raw = np.zeros(OSStateVector.FEATURE_DIM, dtype=np.float32)
+        for _ in range(iterations):
+            emb = self.encode_os_state(raw)
+            self.predict_future(emb)
+
+        batch = emb.expand(self.min_buffer_for_update, -1).contiguous()
+        if self._model_needs_train:
+            self.model.train()
+        with self._autocast():
+            losses = self.model.compute_total_loss(batch, batch)
+        losses["total_loss"].backward()
+        self.optimizer.zero_grad(set_to_none=True)
+        if self._model_needs_train:
+            self.model.eval()
+        if self.device.type == "cuda":
+            torch.cuda.synchronize(self.device)
+
+    def encode_os_state(self, raw: Optional[np.ndarray] = None) -> torch.Tensor:
+        """Encode OS state (collected now, unless a raw [128] sample is given)
+        to 1024-dim embedding."""
+        with self._raw_lock:
+            if self._raw_copied is not None:
+                self._raw_copied.synchronize()  # don't overwrite a pending copy
+            if raw is None:
+                OSStateVector.collect(out=self._raw_host.numpy()[0])
+            else:
+                np.copyto(self._raw_host.numpy()[0], raw)
+            # On CPU x is the staging row itself, so encode before releasing it
+            x = self._raw_host.to(self.device, non_blocking=True)
+            if self._raw_copied is not None:
+                self._raw_copied.record()
+            with torch.no_grad():
+                if self._encoder_lp is not None:
+                    emb = self.inference_encoder(x.to(self.amp_dtype)).float()
+                else:
+                    emb = self.inference_encoder(x)
         return emb
 
     def predict_future(self, current_emb: torch.Tensor) -> torch.Tensor:
         """Predict future embedding from current state."""
-        with torch.no_grad():
+        with torch.no_grad(), self._autocast():
             return self.model.predict_future(current_emb, num_samples=1)
 
     def observe_and_learn(self, interval_sec: float = 1.0) -> dict:
         """Single observation-prediction-comparison cycle."""
+        result = self._observe_and_learn(interval_sec)
+        result["prediction_error"] = float(result["prediction_error"])
+        return result
+
+    def _observe_and_learn(self, interval_sec: float,
+                           telemetry: Optional[TelemetryProducer] = None) -> dict:
+        """observe_and_learn, with prediction_error left as a 0-d device tensor.
+
+        The error is only copied to the host when an update decision needs it
+        (learning enabled and the buffer ready), not on every observation.
+        With a telemetry producer, the two states come from its samples
+        (interval_sec apart) instead of inline collect() calls and a sleep.
+        """
         # Step 1: encode current state
-        current_emb = self.encode_os_state()
+        current_emb = self.encode_os_state(telemetry.current() if telemetry else None)
 
         # Step 2: predict future
         predicted_future = self.predict_future(current_emb)
 
         # Step 3: wait
-        time.sleep(interval_sec)
+        if telemetry is None:
+            time.sleep(interval_sec)
+            future_raw = None
+        else:
+            future_raw = telemetry.next()
 
         # Step 4: encode actual future state
-        actual_future = self.encode_os_state()
+        actual_future = self.encode_os_state(future_raw)
 
         # Step 5: compute prediction error
         with torch.no_grad():
             cos_sim = F.cosine_similarity(predicted_future, actual_future, dim=-1)
-            error = 1.0 - cos_sim.item()
+            error = (1.0 - cos_sim).squeeze().float()
 
         self.total_observations += 1
         self.prediction_errors.append(error)
-        self.weight_manager.record_prediction_error(error)
+        self._pending_errors.append(error)
+        if len(self._pending_errors) >= self.ERROR_FLUSH_INTERVAL:
+            self._flush_errors()
 
         # Step 6: add to buffer and conditionally update
         self.buffer.add(current_emb.squeeze(0), actual_future.squeeze(0))
@@ -289,17 +545,19 @@ class OnlineLearner:
         updated = False
         update_loss = None
 
-        if (
-            self.enabled
-            and error > self.prediction_error_threshold
-            and self.buffer.is_ready(self.min_buffer_for_update)
-        ):
+        # Host-side checks first: the error is read back (the one sync per
+        # observation) only when an update is possible at all
+        can_update = self.enabled and self.buffer.is_ready(self.min_buffer_for_update)
+        error_value = error.item() if can_update else None
+
+        if can_update and error_value > self.prediction_error_threshold:
             update_loss = self._do_gradient_update()
             updated = True
             self.total_updates += 1
-            self.weight_manager.record_prediction_error(error, is_post_update=True)
+            self.weight_manager.record_prediction_error(error_value, is_post_update=True)
 
-            # Check for auto-rollback
+            # Check for auto-rollback (against every error recorded so far)
+            self._flush_errors()
             rollback_version = self.weight_manager.auto_rollback_if_needed()
             if rollback_version:
                 print(f"Auto-rollback to {rollback_version} (errors worsened)")
@@ -316,36 +574,55 @@ class OnlineLearner:
 
     def _do_gradient_update(self) -> float:
         """Perform a single gradient update from the experience buffer."""
-        self.model.train()
-        self.os_encoder.train()
+        if self._model_needs_train:
+            self.model.train()
+        if self._encoder_needs_train:
+            self.os_encoder.train()
         self._update_lr()
 
-        current_batch, future_batch = self.buffer.sample_batch(
-            batch_size=self.min_buffer_for_update, device=str(self.device)
-        )
+        # The buffer lives on self.device already
+        current_batch, future_batch = self.buffer.sample_batch(batch_size=self.min_buffer_for_update)
 
         # Use the model's own loss function
-        losses = self.model.compute_total_loss(current_batch, future_batch)
+        with self._autocast():
+            losses = self.model.compute_total_loss(current_batch, future_batch)
         total_loss = losses["total_loss"]
 
-        self.optimizer.zero_grad()
-        total_loss.backward()
-        torch.nn.utils.clip_grad_norm_(self.trainable_params, self.grad_clip_norm)
-        self.optimizer.step()
-
-        self.model.eval()
-        self.os_encoder.eval()
-
+        self.optimizer.zero_grad(set_to_none=True)
+        if self.use_amp and self.amp_dtype == torch.float16:
+            # fp16 gradients underflow without loss scaling; bf16 does not need it
+            if self.grad_scaler is None:
+                self.grad_scaler = torch.amp.GradScaler("cuda")
+            self.grad_scaler.scale(total_loss).backward()
+            self.grad_scaler.unscale_(self.optimizer)
+            torch.nn.utils.clip_grad_norm_(self.trainable_params, self.grad_clip_norm)
+            self.grad_scaler.step(self.optimizer)
+            self.grad_scaler.update()
+        else:
+            total_loss.backward()
+            torch.nn.utils.clip_grad_norm_(self.trainable_params, self.grad_clip_norm)
+            self.optimizer.step()
+
+        if self._model_needs_train:
+            self.model.eval()
+        if self._encoder_needs_train:
+            self.os_encoder.eval()
+        self.refresh_inference_encoder()
+
+        # One device-to-host copy for all three losses
+        loss, diffusion_loss, infonce_loss = torch.stack((
+            total_loss.detach(), losses["diffusion_loss"].detach(), losses["infonce_loss"].detach(),
+        )).float().tolist()
         self.update_history.append({
             "update_num": self.total_updates + 1,
-            "loss": total_loss.item(),
-            "diffusion_loss": losses["diffusion_loss"].item(),
-            "infonce_loss": losses["infonce_loss"].item(),
+            "loss": loss,
+            "diffusion_loss": diffusion_loss,
+            "infonce_loss": infonce_loss,
             "lr": self._get_lr(),
             "timestamp": time.time(),
         })
 
-        return total_loss.item()
+        return loss
 
     def run_loop(self, interval_sec: float = 1.0, max_iterations: int = 0):
         """Main observation-prediction-comparison loop. Runs in current thread."""
@@ -355,20 +632,24 @@ class OnlineLearner:
         print(f"Online learning loop started (interval={interval_sec}s, "
               f"threshold={self.prediction_error_threshold})")
 
-        while self._running:
-            result = self.observe_and_learn(interval_sec)
-
-            if result["updated"]:
-                print(f"  [Update {result['total_updates']}] "
-                      f"error={result['prediction_error']:.4f} "
-                      f"loss={result['update_loss']:.4f} "
-                      f"lr={result['lr']:.2e}")
-
-            iteration += 1
-            if max_iterations > 0 and iteration >= max_iterations:
-                break
-
-        self._running = False
+        telemetry = TelemetryProducer(interval_sec)
+        telemetry.start()
+        try:
+            while self._running:
+                result = self._observe_and_learn(interval_sec, telemetry)
+
+                if result["updated"]:
+                    print(f"  [Update {result['total_updates']}] "
+                          f"error={float(result['prediction_error']):.4f} "
+                          f"loss={result['update_loss']:.4f} "
+                          f"lr={result['lr']:.2e}")
+
+                iteration += 1
+                if max_iterations > 0 and iteration >= max_iterations:
+                    break
+        finally:
+            telemetry.stop()
+            self._running = False
 
     def start_background(self, interval_sec: float = 1.0):
         """Start the learning loop in a background thread."""
@@ -387,7 +668,10 @@ class OnlineLearner:
             self._thread.join(timeout=5)
 
     def get_stats(self) -> dict:
+        # Errors are kept as device tensors; copy them over in one transfer
         errors = list(self.prediction_errors)
+        if errors:
+            errors = torch.stack(errors).cpu().tolist()
         return {
             "total_observations": self.total_observations,
             "total_updates": self.total_updates,
@@ -7,7 +7,11 @@ via a learned MLP.
 """
 
 import numpy as np
+import shutil
 import subprocess
+import threading
+from typing import Optional
+
 import torch
 import torch.nn as nn
 
@@ -16,6 +20,78 @@ try:
 except ImportError:
     psutil = None
 
+try:
+    import amdsmi
+    HAS_AMDSMI = True
+except ImportError:
+    HAS_AMDSMI = False
+
+# Per-thread feature scratch: collect() runs on both the learner thread and
+# the request executor, so one shared buffer would race
+_scratch = threading.local()
+
+_gpu_lock = threading.Lock()
+_gpu_handles: Optional[list] = None  # amdsmi processor handles, opened once
+_ROCM_SMI = shutil.which("rocm-smi")
+
+
+def _amdsmi_handles() -> list:
+    """GPU handles from the ROCm SMI library, initialized on first use ([] if unavailable)."""
+    global _gpu_handles
+    if _gpu_handles is None:
+        with _gpu_lock:
+            if _gpu_handles is None:
+                try:
+                    amdsmi.amdsmi_init()
+                    _gpu_handles = list(amdsmi.amdsmi_get_processor_handles())
+                except Exception:
+                    _gpu_handles = []
+    return _gpu_handles
+
+
+def _gpu_use() -> Optional[float]:
+    """First GPU's utilization in [0, 1], or None if it can't be read.
+
+    Uses the amdsmi binding when installed (an in-process library call);
+    otherwise falls back to running rocm-smi, if it exists at all.
+    """
+    if HAS_AMDSMI:
+        handles = _amdsmi_handles()
+        if not handles:
+            return None
+        activity = amdsmi.amdsmi_get_gpu_activity(handles[0]).get("gfx_activity")
+        return float(activity) / 100.0 if isinstance(activity, (int, float)) else None
+    if _ROCM_SMI is None:
+        return None
+    result = subprocess.run(
+        [_ROCM_SMI, "--showuse", "--showmeminfo", "vram", "--showtemp", "--csv"],
+        capture_output=True, text=True, timeout=2,
+    )
+    if result.returncode == 0:
+        lines = result.stdout.strip().split("\n")
+        if len(lines) >= 2:
+            # Parse CSV-like output
+            parts = lines[1].split(",")
+            if len(parts) >= 2:
+                return float(parts[1].strip().rstrip("%")) / 100.0
+    return None
+
+
+def _top_k_desc(values: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k largest values, largest first, ties in original order.
+
+    Same result as sorted(range(n), key=values.__getitem__, reverse=True)[:k],
+    but O(n) via a partition instead of a full sort.
+    """
+    n = len(values)
+    if n <= k:
+        return np.argsort(-values, kind="stable")
+    kth = np.partition(values, n - k)[n - k]  # k-th largest value
+    above = np.flatnonzero(values > kth)
+    ties = np.flatnonzero(values == kth)[:k - len(above)]
+    candidates = np.concatenate((above, ties))
+    return candidates[np.argsort(-values[candidates], kind="stable")]
+
 
 class OSStateVector:
     """Collects raw OS telemetry into a normalized 128-dim feature vector."""
@@ -23,18 +99,25 @@ class OSStateVector:
     FEATURE_DIM = 128
 
     @staticmethod
-    def collect() -> np.ndarray:
-        """Collect current OS state. Returns [128] float32 vector, values in [0, 1]."""
-        features = np.zeros(OSStateVector.FEATURE_DIM, dtype=np.float32)
+    def collect(out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Collect current OS state. Returns [128] float32 vector, values in [0, 1].
+
+        Features are assembled in a reused per-thread scratch buffer; the
+        result is written to out if given, else to a new array.
+        """
+        features = getattr(_scratch, "features", None)
+        if features is None:
+            features = _scratch.features = np.zeros(OSStateVector.FEATURE_DIM, dtype=np.float32)
+        else:
+            features.fill(0)
         idx = 0
 
         if psutil is None:
-            return features
+            return np.clip(features, 0.0, 1.0, out=out)
 
         # CPU per-core utilization (16 dims, capped at 16 cores)
-        cpu_pcts = psutil.cpu_percent(percpu=True)
-        for i in range(min(16, len(cpu_pcts))):
-            features[idx + i] = cpu_pcts[i] / 100.0
+        cpu_pcts = psutil.cpu_percent(percpu=True)[:16]
+        features[idx:idx + len(cpu_pcts)] = np.asarray(cpu_pcts, dtype=np.float32) / 100.0
         idx += 16
 
         # CPU frequencies per core (16 dims, normalized by max freq)
@@ -42,8 +125,8 @@ class OSStateVector:
             freqs = psutil.cpu_freq(percpu=True)
             if freqs:
                 max_freq = max(f.max for f in freqs) if freqs[0].max > 0 else 6000.0
-                for i in range(min(16, len(freqs))):
-                    features[idx + i] = freqs[i].current / max_freq
+                current = np.asarray([f.current for f in freqs[:16]], dtype=np.float32)
+                features[idx:idx + len(current)] = current / max_freq
         except Exception:
             pass
         idx += 16
@@ -81,9 +164,18 @@ class OSStateVector:
             pass
         idx += 8
 
+        # One pass over the process table feeds the process stats and both
+        # top-10 tables below
+        try:
+            infos = [p.info for p in psutil.process_iter(["status", "cpu_percent", "memory_percent"])]
+        except Exception:
+            infos = []
+        proc_cpu = np.asarray([i.get("cpu_percent") or 0 for i in infos], dtype=np.float32)
+        proc_mem = np.asarray([i.get("memory_percent") or 0 for i in infos], dtype=np.float32)
+
         # Process stats (4 dims)
         try:
-            statuses = [p.status() for p in psutil.process_iter(["status"])]
+            statuses = [i.get("status") for i in infos]
             total = len(statuses)
             features[idx] = min(total / 1000.0, 1.0)
             features[idx + 1] = sum(1 for s in statuses if s == "running") / max(total, 1)
@@ -103,50 +195,23 @@ class OSStateVector:
             pass
         idx += 3
 
-        # GPU via rocm-smi (4 dims)
+        # GPU via amdsmi / rocm-smi (4 dims)
         try:
-            result = subprocess.run(
-                ["rocm-smi", "--showuse", "--showmeminfo", "vram", "--showtemp", "--csv"],
-                capture_output=True, text=True, timeout=2,
-            )
-            if result.returncode == 0:
-                lines = result.stdout.strip().split("\n")
-                if len(lines) >= 2:
-                    # Parse CSV-like output
-                    parts = lines[1].split(",")
-                    if len(parts) >= 2:
-                        features[idx] = float(parts[1].strip().rstrip("%")) / 100.0  # GPU use
+            gpu_use = _gpu_use()
+            if gpu_use is not None:
+                features[idx] = gpu_use
         except Exception:
             pass
         idx += 4
 
-        # Top 10 processes by CPU (20 dims: cpu%, mem% each)
-        try:
-            procs = sorted(
-                psutil.process_iter(["cpu_percent", "memory_percent"]),
-                key=lambda p: p.info.get("cpu_percent", 0) or 0,
-                reverse=True,
-            )[:10]
-            for i, p in enumerate(procs):
-                features[idx + i * 2] = min((p.info.get("cpu_percent", 0) or 0) / 100.0, 1.0)
-                features[idx + i * 2 + 1] = min((p.info.get("memory_percent", 0) or 0) / 100.0, 1.0)
-        except Exception:
-            pass
-        idx += 20
-
-        # Top 10 processes by memory (20 dims)
-        try:
-            procs = sorted(
-                psutil.process_iter(["cpu_percent", "memory_percent"]),
-                key=lambda p: p.info.get("memory_percent", 0) or 0,
-                reverse=True,
-            )[:10]
-            for i, p in enumerate(procs):
-                features[idx + i * 2] = min((p.info.get("cpu_percent", 0) or 0) / 100.0, 1.0)
-                features[idx + i * 2 + 1] = min((p.info.get("memory_percent", 0) or 0) / 100.0, 1.0)
-        except Exception:
-            pass
-        idx += 20
+        # Top 10 processes by CPU, then by memory (20 dims each: cpu%, mem%
+        # interleaved), both partitioned out of the same snapshot
+        for key_arr in (proc_cpu, proc_mem):
+            top = _top_k_desc(key_arr, 10)
+            n = len(top)
+            features[idx:idx + 2 * n:2] = np.minimum(proc_cpu[top] / 100.0, 1.0)
+            features[idx + 1:idx + 2 * n:2] = np.minimum(proc_mem[top] / 100.0, 1.0)
+            idx += 20
 
         # System counters (5 dims)
         try:
@@ -165,7 +230,7 @@ class OSStateVector:
         idx += 5
 
         # Remaining dims are padding (zeros)
-        return np.clip(features, 0.0, 1.0)
+        return np.clip(features, 0.0, 1.0, out=out)
 
 
 class OSStateEncoder(nn.Module):
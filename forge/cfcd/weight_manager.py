@@ -3,19 +3,195 @@ Weight versioning and hot-reload for cfcd.
 
 Manages versioned model checkpoints with atomic saves, manifest tracking,
 symlink-based current version, and auto-rollback on prediction degradation.
+Checkpoints are written in the background: save_version only snapshots the
+weights into host memory before returning.
+
+Versions are incremental: a checkpoint stores only the tensors whose content
+changed since the previous save, plus "refs" naming the file that holds each
+unchanged tensor. load_checkpoint resolves the refs transparently.
+
+With safetensors installed, versions are written as .safetensors files (raw
+tensors behind a JSON header, metadata in the header), so a reload maps just
+the tensors it copies and never unpickles anything. Older .pt versions, and
+every version when safetensors is missing, go through torch.load.
 """
 
+import hashlib
 import json
+import math
 import os
 import tempfile
+import threading
 import time
-from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Optional
 
 import torch
 import torch.nn as nn
 
+try:
+    import xxhash
+    HAS_XXHASH = True
+except ImportError:
+    HAS_XXHASH = False
+
+try:
+    import msgpack
+    HAS_MSGPACK = True
+except ImportError:
+    HAS_MSGPACK = False
+
+try:
+    from safetensors import safe_open
+    from safetensors.torch import save_file
+    HAS_SAFETENSORS = True
+except ImportError:
+    HAS_SAFETENSORS = False
+
+CHECKPOINT_SUFFIX = ".safetensors" if HAS_SAFETENSORS else ".pt"
+
+
+def _torch_load(path: str, map_location) -> dict:
+    try:
+        return torch.load(path, map_location=map_location, weights_only=False, mmap=True)
+    except RuntimeError:
+        return torch.load(path, map_location=map_location, weights_only=False)
+
+
+def _safetensors_load(path: str, map_location, keys: Optional[set] = None) -> dict:
+    """Read a .safetensors version back into checkpoint-dict form. Only the
+    tensors in keys (default: all) are read from the file."""
+    device = "cpu" if map_location is None else str(map_location)
+    with safe_open(path, framework="pt", device=device) as f:
+        meta = f.metadata() or {}
+        state_dict = {k: f.get_tensor(k) for k in f.keys() if keys is None or k in keys}
+    ckpt = {"model_state_dict": state_dict}
+    for field in ("version", "timestamp"):
+        if field in meta:
+            ckpt[field] = meta[field]
+    for field in ("metrics", "refs"):
+        if field in meta:
+            ckpt[field] = json.loads(meta[field])
+    return ckpt
+
+
+def _load_file(path: str, map_location, keys: Optional[set] = None) -> dict:
+    if path.endswith(".safetensors"):
+        return _safetensors_load(path, map_location, keys)
+    ckpt = _torch_load(path, map_location)
+    if keys is not None and isinstance(ckpt, dict):
+        state_dict = ckpt.get("model_state_dict", ckpt)
+        for k in [k for k in state_dict if k not in keys and isinstance(state_dict[k], torch.Tensor)]:
+            del state_dict[k]
+    return ckpt
+
+
+def load_checkpoint(path: str, map_location, keys: Optional[Iterable[str]] = None) -> dict:
+    """Load a checkpoint with its tensors memory-mapped, so they are paged in
+    from the file instead of read into a second in-memory copy. .safetensors
+    files are opened directly; torch files are torch.load-ed with mmap
+    (legacy non-zip checkpoints cannot be mapped and are loaded normally).
+
+    With keys, only those tensors are returned - for .safetensors files,
+    only those are read at all.
+
+    For an incremental version, tensors listed in its "refs" are loaded from
+    the referenced files (siblings of path) into model_state_dict. Refs
+    always name the file that holds the tensor, so no chain is followed.
+    """
+    keys = set(keys) if keys is not None else None
+    path = os.path.realpath(path)  # "current" is a symlink: dispatch on its target
+    ckpt = _load_file(path, map_location, keys)
+    refs = ckpt.pop("refs", None) if isinstance(ckpt, dict) else None
+    if refs:
+        base_dir = os.path.dirname(path)
+        state_dict = ckpt["model_state_dict"]
+        by_file: dict = {}
+        for key, filename in refs.items():
+            if keys is None or key in keys:
+                by_file.setdefault(filename, []).append(key)
+        for filename, file_keys in by_file.items():
+            parent = _load_file(os.path.join(base_dir, filename), map_location,
+                                set(file_keys))["model_state_dict"]
+            for key in file_keys:
+                state_dict[key] = parent[key]
+            del parent
+    return ckpt
+
+
+# Tensors kept at full precision when versions are saved in a reduced dtype
+FULL_PRECISION_KEYS = ("norm", "bias")
+
+
+def upcast_state_dict(state_dict: dict) -> dict:
+    """Cast reduced-precision floating-point tensors to fp32, in place (for
+    loaders that adopt checkpoint tensors with assign=True)."""
+    for k, v in state_dict.items():
+        if isinstance(v, torch.Tensor) and v.is_floating_point() and v.dtype != torch.float32:
+            state_dict[k] = v.float()
+    return state_dict
+
+
+def tensor_digest(t: torch.Tensor) -> tuple:
+    """Content hash of a CPU tensor: (dtype, shape, 128-bit digest)."""
+    data = t.contiguous().reshape(-1).view(torch.uint8).numpy()
+    if HAS_XXHASH:
+        digest = xxhash.xxh3_128_digest(data)
+    else:
+        digest = hashlib.blake2b(data, digest_size=16).digest()
+    return str(t.dtype), tuple(t.shape), digest
+
+
+def drop_gate_values(state_dict: dict) -> dict:
+    """Remove gate_values buffers (may have shape mismatches) in place."""
+    for k in [k for k in state_dict if "gate_values" in k]:
+        del state_dict[k]
+    return state_dict
+
+
+class RunningMean:
+    """Fixed-window mean of the last n values, O(1) per push and per mean().
+
+    Values sit in a preallocated ring with a running sum; the sum is
+    recomputed exactly each time the ring wraps, so float error stays
+    bounded.
+    """
+
+    def __init__(self, n: int):
+        self.n = n
+        self.buf = [0.0] * n
+        self.i = 0
+        self.count = 0
+        self.sum = 0.0
+
+    def push(self, x):
+        x = float(x)
+        if self.count == self.n:
+            self.sum += x - self.buf[self.i]
+        else:
+            self.sum += x
+            self.count += 1
+        self.buf[self.i] = x
+        self.i += 1
+        if self.i == self.n:
+            self.i = 0
+            self.sum = math.fsum(self.buf)
+
+    def extend(self, values):
+        for x in values:
+            self.push(x)
+
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def clear(self):
+        self.i = self.count = 0
+        self.sum = 0.0
+
+    def __len__(self):
+        return self.count
+
 
 class WeightManager:
     """Manages versioned model weights with rollback capability."""
@@ -26,73 +202,203 @@ class WeightManager:
         base_dir: str = "/var/lib/aether/aurora/models",
         max_versions: int = 10,
         auto_rollback_window: int = 100,
+        durable: bool = True,
+        save_dtype: Optional[torch.dtype] = None,
     ):
         self.model = model
         self.base_dir = Path(base_dir)
         self.base_dir.mkdir(parents=True, exist_ok=True)
         self.max_versions = max_versions
         self.current_version = 0
-        self.manifest_path = self.base_dir / "manifest.json"
+        # fsync checkpoints, the journal and directory entries; False trades
+        # crash safety for speed (e.g. versions only used for hot reload)
+        self.durable = durable
+        # On-disk dtype for floating-point weights (None: as in the model).
+        # Norm and bias tensors always keep their own precision.
+        self.save_dtype = save_dtype
+        # Binary manifest when msgpack is installed; manifest.json is then
+        # only read once, to migrate, and written by export_manifest_json()
+        self.json_manifest_path = self.base_dir / "manifest.json"
+        self.manifest_path = (self.base_dir / "manifest.msgpack" if HAS_MSGPACK
+                              else self.json_manifest_path)
+        # Append-only journal of add/prune records since the last snapshot
+        # (manifest_path); saves append to it, compaction folds it back in
+        self.manifest_log = self.manifest_path.with_name(self.manifest_path.name + ".log")
 
         # Auto-rollback tracking
         self.auto_rollback_window = auto_rollback_window
-        self.pre_update_errors: deque = deque(maxlen=auto_rollback_window)
-        self.post_update_errors: deque = deque(maxlen=auto_rollback_window)
+        self.pre_update_errors = RunningMean(auto_rollback_window)
+        self.post_update_errors = RunningMean(auto_rollback_window)
         self.last_good_version: Optional[str] = None
 
-        # Load existing manifest
+        # One writer thread serializes checkpoints in submission order; the
+        # lock guards self.manifest, which that thread appends to and prunes
+        self._save_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="weight-save")
+        self._pending_saves: list = []
+        self._manifest_lock = threading.Lock()
+
+        # Save-thread state for incremental versions: content digest of each
+        # tensor at the last save, and the file that holds those bytes. Empty
+        # at startup, so the first save of a run is always a full one.
+        self._last_digests: dict = {}
+        self._tensor_files: dict = {}
+        # Digests are computed in parallel: both hash backends release the
+        # GIL while hashing a buffer
+        self._hash_executor = ThreadPoolExecutor(
+            max_workers=min(8, os.cpu_count() or 1), thread_name_prefix="weight-hash")
+
+        # Load existing manifest, indexed by version string. get_manifest()
+        # hands out a cached tuple, rebuilt only after the manifest changes.
         self.manifest = self._load_manifest()
+        self._by_version = {e["version"]: e for e in self.manifest}
+        self._manifest_view: Optional[tuple] = None
         if self.manifest:
             self.current_version = max(e["version_num"] for e in self.manifest)
 
+    def _encode(self, obj) -> bytes:
+        if self.manifest_path != self.json_manifest_path:
+            return msgpack.packb(obj, use_bin_type=True)
+        return json.dumps(obj).encode()
+
+    def _decode(self, data: bytes):
+        if self.manifest_path != self.json_manifest_path:
+            return msgpack.unpackb(data, raw=False)
+        return json.loads(data)
+
     def _load_manifest(self) -> list:
-        if self.manifest_path.exists():
-            with open(self.manifest_path) as f:
-                return json.load(f)
-        return []
+        """Snapshot plus journal replay. Replaying is idempotent (adds of
+        known versions and prunes of unknown ones are no-ops), so a journal
+        older than the snapshot - a crash mid-compaction - is harmless."""
+        if self.manifest_path != self.json_manifest_path and self.manifest_path.exists():
+            manifest = self._decode(self.manifest_path.read_bytes())
+        elif self.json_manifest_path.exists():
+            with open(self.json_manifest_path) as f:
+                manifest = json.load(f)
+        else:
+            manifest = []
+
+        if self.manifest_log.exists():
+            known = {e["version"] for e in manifest}
+            for rec in self._read_log():
+                if rec["op"] == "add":
+                    if rec["entry"]["version"] not in known:
+                        manifest.append(rec["entry"])
+                        known.add(rec["entry"]["version"])
+                elif rec["op"] == "prune":
+                    pruned = set(rec["versions"])
+                    manifest = [e for e in manifest if e["version"] not in pruned]
+                    known -= pruned
+        return manifest
+
+    def _read_log(self) -> list:
+        """Journal records: 4-byte little-endian length, then the encoded
+        record. A torn tail (crash mid-append) ends the replay and is cut
+        off, so later appends stay readable."""
+        data = self.manifest_log.read_bytes()
+        records, pos = [], 0
+        while pos + 4 <= len(data):
+            n = int.from_bytes(data[pos : pos + 4], "little")
+            if pos + 4 + n > len(data):
+                break
+            try:
+                records.append(self._decode(data[pos + 4 : pos + 4 + n]))
+            except ValueError:
+                break
+            pos += 4 + n
+        if pos < len(data):
+            os.truncate(self.manifest_log, pos)
+        return records
+
+    def _append_log(self, *records: dict):
+        """Append records to the journal durably; compact once it outgrows
+        the snapshot. Caller holds the manifest lock."""
+        frames = []
+        for rec in records:
+            payload = self._encode(rec)
+            frames.append(len(payload).to_bytes(4, "little") + payload)
+        with open(self.manifest_log, "ab") as f:
+            f.write(b"".join(frames))
+            f.flush()
+            if self.durable:
+                os.fsync(f.fileno())
+            log_size = f.tell()
+
+        snap_size = self.manifest_path.stat().st_size if self.manifest_path.exists() else 0
+        if log_size > 4 * max(snap_size, 1024):
+            self._save_manifest()
 
     def _save_manifest(self):
-        with open(self.manifest_path, "w") as f:
-            json.dump(self.manifest, f, indent=2)
+        """Compaction: atomically write the full manifest as the snapshot,
+        then empty the journal. Caller holds the manifest lock."""
+        tmp = self.manifest_path.with_name(self.manifest_path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            if self.manifest_path != self.json_manifest_path:
+                f.write(self._encode(self.manifest))
+            else:
+                f.write(json.dumps(self.manifest, indent=2).encode())
+            f.flush()
+            if self.durable:
+                os.fsync(f.fileno())
+        os.replace(tmp, self.manifest_path)
+        self._fsync_dir()
+        with open(self.manifest_log, "wb") as f:
+            if self.durable:
+                os.fsync(f.fileno())
+
+    def export_manifest_json(self, path: Optional[str] = None) -> str:
+        """Write the manifest as indented JSON for inspection (default:
+        manifest.json next to the weights). Returns the path written."""
+        path = Path(path) if path else self.json_manifest_path
+        with self._manifest_lock:
+            text = json.dumps(self.manifest, indent=2)
+        path.write_text(text)
+        return str(path)
+
+    def _snapshot_state(self) -> dict:
+        """Copy the model's state_dict into host memory.
+
+        Each tensor gets its own CPU copy (pinned for CUDA tensors, copied
+        without blocking, then synchronized once), so training can keep
+        updating the live weights while the snapshot is being written.
+        With save_dtype, weights are cast on their device first, so the
+        transfer moves the reduced bytes.
+        """
+        snapshot = {}
+        on_cuda = False
+        for k, v in self.model.state_dict().items():
+            if isinstance(v, torch.Tensor):
+                v = v.detach()
+                if (self.save_dtype is not None and v.is_floating_point()
+                        and not any(name in k for name in FULL_PRECISION_KEYS)):
+                    v = v.to(self.save_dtype)
+                host = torch.empty_like(v, device="cpu", pin_memory=v.is_cuda)
+                host.copy_(v, non_blocking=v.is_cuda)
+                on_cuda = on_cuda or v.is_cuda
+                v = host
+            snapshot[k] = v
+        if on_cuda:
+            torch.cuda.synchronize()
+        return snapshot
 
     def save_version(self, metrics: Optional[dict] = None) -> str:
-        """Save current weights as a new version. Returns version string."""
+        """Save current weights as a new version. Returns version string.
+
+        Returns once the weights are snapshotted; the checkpoint file,
+        current symlink and manifest entry are written by the save thread
+        (see wait_for_pending_saves).
+        """
         self.current_version += 1
         version_str = f"v{self.current_version:04d}"
         timestamp = time.strftime("%Y%m%d_%H%M%S")
-        filename = f"{version_str}_{timestamp}.pt"
+        filename = f"{version_str}_{timestamp}{CHECKPOINT_SUFFIX}"
         filepath = self.base_dir / filename
 
-        # Atomic save: write to temp then rename
         state = {
-            "model_state_dict": self.model.state_dict(),
+            "model_state_dict": self._snapshot_state(),
             "version": version_str,
             "timestamp": timestamp,
             "metrics": metrics or {},
         }
-        fd, tmp_path = tempfile.mkstemp(dir=str(self.base_dir), suffix=".pt.tmp")
-        os.close(fd)
-        try:
-            torch.save(state, tmp_path)
-            os.rename(tmp_path, str(filepath))
-        except Exception:
-            if os.path.exists(tmp_path):
-                os.unlink(tmp_path)
-            raise
-
-        # Update current symlink
-        current_link = self.base_dir / "current"
-        tmp_link = self.base_dir / "current.tmp"
-        try:
-            os.symlink(str(filepath), str(tmp_link))
-            os.rename(str(tmp_link), str(current_link))
-        except OSError:
-            # Fallback: remove and recreate
-            if current_link.exists() or current_link.is_symlink():
-                current_link.unlink()
-            os.symlink(str(filepath), str(current_link))
-
-        # Update manifest
         entry = {
             "version": version_str,
             "version_num": self.current_version,
@@ -101,19 +407,124 @@ class WeightManager:
             "timestamp": timestamp,
             "metrics": metrics or {},
         }
-        self.manifest.append(entry)
-        self._save_manifest()
 
         self.last_good_version = version_str
 
-        # Prune old versions
-        self._prune_old_versions()
+        self._pending_saves = [f for f in self._pending_saves if not f.done()]
+        self._pending_saves.append(
+            self._save_executor.submit(self._finalize_save, state, filepath, entry))
 
         return version_str
 
+    def _split_delta(self, state: dict, entry: dict) -> dict:
+        """Replace unchanged tensors in state["model_state_dict"] with refs to
+        the files that already hold them."""
+        deltas, refs = {}, {}
+        tensors = {k: v for k, v in state["model_state_dict"].items() if isinstance(v, torch.Tensor)}
+        digests = dict(zip(tensors, self._hash_executor.map(tensor_digest, tensors.values())))
+        for k, v in state["model_state_dict"].items():
+            if k not in digests:
+                deltas[k] = v
+                continue
+            if self._last_digests.get(k) == digests[k] and k in self._tensor_files:
+                refs[k] = self._tensor_files[k]
+            else:
+                deltas[k] = v
+        state["model_state_dict"] = deltas
+        if refs:
+            state["refs"] = refs
+        entry["depends_on"] = sorted(set(refs.values()))
+        entry["delta_tensors"] = len(deltas)
+        return digests
+
+    def _finalize_save(self, state: dict, filepath: Path, entry: dict):
+        """Save-thread half of save_version: write, link, record, prune."""
+        digests = self._split_delta(state, entry)
+
+        # Atomic save: write to temp then rename
+        fd, tmp_path = tempfile.mkstemp(dir=str(self.base_dir), suffix=filepath.suffix + ".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                if filepath.suffix == ".safetensors":
+                    self._write_safetensors(state, tmp_path)
+                else:
+                    torch.save(state, f)
+                    f.flush()
+                # Data on disk before the rename makes it visible
+                if self.durable:
+                    os.fsync(f.fileno())
+            os.rename(tmp_path, str(filepath))
+        except Exception as e:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            print(f"Saving {entry['version']} failed: {e}")
+            raise
+
+        self._last_digests = digests
+        for k in state["model_state_dict"]:
+            if k in digests:
+                self._tensor_files[k] = filepath.name
+
+        # Update current symlink: rename over the old link is atomic, so
+        # "current" never goes missing. The relative target keeps the
+        # directory movable.
+        current_link = self.base_dir / "current"
+        tmp_link = self.base_dir / f"current.{os.getpid()}.tmp"
+        if tmp_link.is_symlink():
+            tmp_link.unlink()  # left over from a crashed save
+        os.symlink(filepath.name, tmp_link)
+        os.replace(tmp_link, current_link)
+        self._fsync_dir()
+
+        # Update manifest and prune old versions
+        with self._manifest_lock:
+            self.manifest.append(entry)
+            self._by_version[entry["version"]] = entry
+            self._manifest_view = None
+            records = [{"op": "add", "entry": entry}]
+            pruned = self._prune_old_versions()
+            if pruned:
+                records.append({"op": "prune", "versions": pruned})
+            self._append_log(*records)
+
+    @staticmethod
+    def _write_safetensors(state: dict, path: str):
+        """Tensors as the file body; version, timestamp, metrics and refs as
+        (string) header metadata."""
+        tensors = {k: v.contiguous() for k, v in state["model_state_dict"].items()
+                   if isinstance(v, torch.Tensor)}
+        metadata = {"version": state["version"], "timestamp": state["timestamp"],
+                    "metrics": json.dumps(state["metrics"])}
+        if "refs" in state:
+            metadata["refs"] = json.dumps(state["refs"])
+        save_file(tensors, path, metadata=metadata)
+
+    def _fsync_dir(self):
+        """Flush base_dir's entries (renames, new links) to disk."""
+        if not self.durable:
+            return
+        dfd = os.open(self.base_dir, os.O_DIRECTORY)
+        try:
+            os.fsync(dfd)
+        finally:
+            os.close(dfd)
+
+    def wait_for_pending_saves(self):
+        """Block until every submitted save has been written. Re-raises the
+        first save failure, if any."""
+        pending, self._pending_saves = self._pending_saves, []
+        for future in pending:
+            future.result()
+
     def rollback(self, version: str) -> bool:
         """Rollback to a specific version. Returns True on success."""
-        entry = next((e for e in self.manifest if e["version"] == version), None)
+        # The version may still be on its way to disk
+        try:
+            self.wait_for_pending_saves()
+        except Exception:
+            pass  # already reported by the save thread; its entry is just missing
+        with self._manifest_lock:
+            entry = self._by_version.get(version)
         if entry is None:
             return False
 
@@ -126,23 +537,49 @@ class WeightManager:
     def hot_reload(self, checkpoint_path: str) -> bool:
         """Load weights from a checkpoint into the running model."""
         try:
-            ckpt = torch.load(checkpoint_path, map_location="cpu", weights_only=False)
-            state_dict = ckpt.get("model_state_dict", ckpt)
-
-            # Filter out gate_values buffers (may have shape mismatches)
-            filtered = {k: v for k, v in state_dict.items() if "gate_values" not in k}
-            self.model.load_state_dict(filtered, strict=False)
+            live = dict(self.model.named_parameters())
+            live.update(self.model.named_buffers())
+            # Only the tensors the model will take are read
+            wanted = [k for k in live if "gate_values" not in k]
+            ckpt = load_checkpoint(checkpoint_path, map_location="cpu", keys=wanted)
+            state_dict = drop_gate_values(ckpt.get("model_state_dict", ckpt))
+            # Copied straight from the memory-mapped file into the live
+            # tensors (never replaced: the optimizer and compiled predict
+            # path hold references to them); copy_ casts reduced-precision
+            # versions back to the live dtype
+            pairs = [(k, live[k], v) for k, v in state_dict.items()
+                     if k in live and isinstance(v, torch.Tensor)]
+            # Like load_state_dict: a shape mismatch fails the reload before
+            # any weight is touched
+            mismatched = [k for k, dst, src in pairs if dst.shape != src.shape]
+            if mismatched:
+                raise RuntimeError(f"shape mismatch for {len(mismatched)} tensors, e.g. {mismatched[0]}")
+            with torch.no_grad():
+                for _, dst, src in pairs:
+                    dst.copy_(src)
+            del ckpt, state_dict, pairs
             return True
         except Exception as e:
             print(f"Hot reload failed: {e}")
             return False
 
-    def record_prediction_error(self, error: float, is_post_update: bool = False):
-        """Record prediction error for auto-rollback tracking."""
+    def record_prediction_error(self, error, is_post_update: bool = False):
+        """Record prediction error (float or 0-d tensor) for auto-rollback tracking."""
         if is_post_update:
-            self.post_update_errors.append(error)
+            self.post_update_errors.push(error)
         else:
-            self.pre_update_errors.append(error)
+            self.pre_update_errors.push(error)
+
+    def record_prediction_errors(self, errors, is_post_update: bool = False):
+        """Record a batch of prediction errors; 0-d tensors are copied to the
+        host together in one transfer."""
+        errors = list(errors)
+        if errors and isinstance(errors[0], torch.Tensor):
+            errors = torch.stack(errors).float().cpu().tolist()
+        if is_post_update:
+            self.post_update_errors.extend(errors)
+        else:
+            self.pre_update_errors.extend(errors)
 
     def should_rollback(self) -> bool:
         """Check if prediction errors have worsened since last update."""
@@ -152,8 +589,8 @@ class WeightManager:
         ):
             return False
 
-        pre_mean = sum(self.pre_update_errors) / len(self.pre_update_errors)
-        post_mean = sum(self.post_update_errors) / len(self.post_update_errors)
+        pre_mean = self.pre_update_errors.mean()
+        post_mean = self.post_update_errors.mean()
 
         # Rollback if post-update error is 20% worse
         return post_mean > pre_mean * 1.2
@@ -166,26 +603,53 @@ class WeightManager:
                 return self.last_good_version
         return None
 
-    def get_manifest(self) -> list:
-        return self.manifest
+    def get_manifest(self) -> tuple:
+        """Manifest entries, oldest first, as an immutable (shared) tuple."""
+        with self._manifest_lock:
+            if self._manifest_view is None:
+                self._manifest_view = tuple(self.manifest)
+            return self._manifest_view
 
     def get_current_version(self) -> str:
-        if self.manifest:
-            return self.manifest[-1]["version"]
+        with self._manifest_lock:
+            if self.manifest:
+                return self.manifest[-1]["version"]
         return "v0000"
 
-    def _prune_old_versions(self):
-        """Delete versions beyond max_versions, keeping current."""
+    def _prune_old_versions(self) -> list:
+        """Delete versions beyond max_versions, keeping current. Returns the
+        pruned version strings. Caller holds the manifest lock and records
+        the prune in the journal.
+
+        A pruned version's file is kept while a retained version still
+        references tensors in it, and deleted by a later prune once none does.
+        """
         if len(self.manifest) <= self.max_versions:
-            return
+            return []
 
         # Keep the most recent max_versions entries
-        to_remove = self.manifest[: -self.max_versions]
+        dropped = self.manifest[: -self.max_versions]
         self.manifest = self.manifest[-self.max_versions :]
-
-        for entry in to_remove:
-            path = Path(entry["path"])
+        pruned = [e["version"] for e in dropped]
+        for version in pruned:
+            self._by_version.pop(version, None)
+
+        needed = set()
+        for entry in self.manifest:
+            needed.add(entry["filename"])
+            needed.update(entry.get("depends_on", ()))
+
+        # Only files the manifest says belong to the dropped entries: their
+        # own, and ones they depended on (an earlier prune kept those while
+        # some entry still referenced them; dropping the last one frees it).
+        # Never a directory glob - other managers may share base_dir.
+        candidates = set()
+        for entry in dropped:
+            candidates.add(entry["filename"])
+            candidates.update(entry.get("depends_on", ()))
+        for filename in candidates - needed:
+            path = self.base_dir / filename
             if path.exists():
                 path.unlink()
 
-        self._save_manifest()
+        return pruned
@@ -8,14 +8,76 @@ import json
 import random
 import hashlib
 from pathlib import Path
-from dataclasses import dataclass, asdict
-from typing import Optional
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    import xxhash
+    HAS_XXHASH = True
+except ImportError:
+    HAS_XXHASH = False
 
 import os
+from collections import Counter, deque
+from contextlib import nullcontext
+from itertools import combinations
+from concurrent.futures import ProcessPoolExecutor
 DATA_DIR = Path(os.getenv("DATA_DIR", "/forge/data"))
 MACHINES_DIR = Path(os.getenv("MACHINES_DIR", "/forge/machines"))
-
-@dataclass
+WORKERS = int(os.getenv("ARCHITECT_WORKERS", os.cpu_count() or 1))
+# "jsonl": one machines.jsonl line per machine; "files": one <machine_id>.json each
+MACHINES_FORMAT = os.getenv("MACHINES_FORMAT", "jsonl")
+PARALLEL_MIN_COUNT = 500  # Below this, process startup costs more than it saves
+CHUNK_SIZE = 256  # Machines per worker task; bounds what is held in memory at once
+
+def canonical_json(obj) -> bytes:
+    """Serialize obj to compact, key-sorted JSON bytes (stable hash input)."""
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+    return json.dumps(obj, sort_keys=True, separators=(",", ":")).encode()
+
+def compact_json(obj) -> bytes:
+    """Serialize obj to single-line JSON bytes (one JSONL record)."""
+    if HAS_ORJSON:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+def pretty_json(obj) -> bytes:
+    """Serialize obj to 2-space indented JSON bytes."""
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2).encode()
+
+def write_bytes(path: Path, data: bytes):
+    """Write pre-serialized bytes to path with raw open/write/close syscalls.
+
+    Skips the buffered file object layer; on Linux the written pages are
+    also marked as not needed so thousands of machine files don't evict
+    more useful page cache.
+    """
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+
+@dataclass(slots=True)
 class MachineIdentity:
     machine_id: str
     profile: str  # "minimal", "desktop", "server", "workstation", "embedded"
@@ -29,6 +91,22 @@ class MachineIdentity:
     sound: Optional[dict]
     qemu_args: list[str]
 
+    def to_json_dict(self) -> dict:
+        """Field dict for serialization; shares references (unlike asdict)."""
+        return {
+            "machine_id": self.machine_id,
+            "profile": self.profile,
+            "cpu": self.cpu,
+            "memory_mb": self.memory_mb,
+            "storage": self.storage,
+            "network": self.network,
+            "usb_controller": self.usb_controller,
+            "usb_devices": self.usb_devices,
+            "gpu": self.gpu,
+            "sound": self.sound,
+            "qemu_args": self.qemu_args,
+        }
+
 # QEMU-supported virtual hardware that we know works
 QEMU_HARDWARE = {
     "cpu": [
@@ -145,51 +223,151 @@ PROFILES = {
     },
 }
 
-def generate_machine(profile_name: str = "minimal") -> MachineIdentity:
-    """Generate a synthetic machine configuration."""
+# Non-None variants of the optional hardware lists (None = "absent" is
+# decided by the profile's *_prob gate, never by the choice itself)
+NETWORK_CHOICES = tuple(n for n in QEMU_HARDWARE["network"] if n)
+USB_CONTROLLER_CHOICES = tuple(u for u in QEMU_HARDWARE["usb_controller"] if u)
+GPU_CHOICES = tuple(g for g in QEMU_HARDWARE["gpu"] if g)
+SOUND_CHOICES = tuple(s for s in QEMU_HARDWARE["sound"] if s)
+STORAGE_CHOICES = tuple(QEMU_HARDWARE["storage"])
+
+def _build_profile_pool(profile: dict) -> dict:
+    """Filter QEMU_HARDWARE down to the choices valid for one profile."""
+    cpu_lo, cpu_hi = profile["cpu_cores"]
+    mem_lo, mem_hi = profile["memory_range"]
+    cpu = tuple(c for c in QEMU_HARDWARE["cpu"] if cpu_lo <= c["cores"] <= cpu_hi)
+    return {
+        "cpu": cpu or ({"model": "qemu64", "cores": cpu_lo},),
+        "memory": tuple(m for m in QEMU_HARDWARE["memory_mb"] if mem_lo <= m <= mem_hi),
+        "storage": STORAGE_CHOICES,
+        "network": NETWORK_CHOICES,
+        "usb_controller": USB_CONTROLLER_CHOICES,
+        "gpu": GPU_CHOICES,
+        "sound": SOUND_CHOICES,
+    }
+
+# Per-profile hardware choices, computed once instead of on every machine
+PROFILE_POOLS = {name: _build_profile_pool(profile) for name, profile in PROFILES.items()}
+
+# Every USB device subset, grouped by size: USB_SUBSETS[k] lists all k-device
+# selections. Entries are shared between machines and must not be mutated.
+USB_SUBSETS = tuple(
+    tuple(list(combo) for combo in combinations(QEMU_HARDWARE["usb_devices"], k))
+    for k in range(len(QEMU_HARDWARE["usb_devices"]) + 1)
+)
+
+def generate_machine(profile_name: str = "minimal", seq: int = 0) -> MachineIdentity:
+    """Generate a synthetic machine configuration.
+
+    seq is the machine's position in the run; it becomes the id prefix.
+    """
     profile = PROFILES[profile_name]
+    pool = PROFILE_POOLS[profile_name]
 
     # CPU - pick from matching core count range
-    cpu_options = [c for c in QEMU_HARDWARE["cpu"]
-                   if profile["cpu_cores"][0] <= c["cores"] <= profile["cpu_cores"][1]]
-    cpu = random.choice(cpu_options) if cpu_options else {"model": "qemu64", "cores": profile["cpu_cores"][0]}
+    cpu = random.choice(pool["cpu"])
 
     # Memory
-    memory = random.choice([m for m in QEMU_HARDWARE["memory_mb"]
-                           if profile["memory_range"][0] <= m <= profile["memory_range"][1]])
+    memory = random.choice(pool["memory"])
 
     # Storage (always need one)
-    storage = random.choice(QEMU_HARDWARE["storage"])
+    storage = random.choice(pool["storage"])
 
     # Network (probabilistic)
     network = None
     if random.random() < profile["network_prob"]:
-        network = random.choice([n for n in QEMU_HARDWARE["network"] if n])
+        network = random.choice(pool["network"])
 
     # USB controller and devices
     usb_controller = None
     usb_devices = []
     if random.random() < profile["usb_prob"]:
-        usb_controller = random.choice([u for u in QEMU_HARDWARE["usb_controller"] if u])
+        usb_controller = random.choice(pool["usb_controller"])
         usb_count = random.randint(*profile["usb_count"])
-        usb_devices = random.sample(QEMU_HARDWARE["usb_devices"], min(usb_count, len(QEMU_HARDWARE["usb_devices"])))
+        subsets = USB_SUBSETS[min(usb_count, len(USB_SUBSETS) - 1)]
+        usb_devices = subsets[random.randrange(len(subsets))]
 
     # GPU (probabilistic)
     gpu = None
     if random.random() < profile["gpu_prob"]:
-        gpu = random.choice([g for g in QEMU_HARDWARE["gpu"] if g])
+        gpu = random.choice(pool["gpu"])
 
     # Sound (probabilistic)
     sound = None
     if random.random() < profile["sound_prob"]:
-        sound = random.choice([s for s in QEMU_HARDWARE["sound"] if s])
+        sound = random.choice(pool["sound"])
+
+    return _assemble_machine(profile_name, seq, cpu, memory, storage, network,
+                             usb_controller, usb_devices, gpu, sound)
+
+# Optional pools -> column of the gate matrix in generate_machines_batch
+GATED_POOLS = {"network": 0, "usb_controller": 1, "gpu": 2, "sound": 3}
 
+def generate_machines_batch(profile_name: str, n: int, start_seq: int = 0) -> list[MachineIdentity]:
+    """Generate n machines for one profile, drawing all randomness up front.
+
+    Machines are numbered start_seq..start_seq+n-1. Falls back to n
+    generate_machine() calls when numpy is unavailable.
+    """
+    if not HAS_NUMPY:
+        return [generate_machine(profile_name, start_seq + i) for i in range(n)]
+
+    profile = PROFILES[profile_name]
+    pool = PROFILE_POOLS[profile_name]
+    rng = np.random.default_rng()
+
+    # One vectorized draw per pool plus the network/usb/gpu/sound gates. The
+    # gates are folded into the index arrays: -1 selects the trailing None
+    # appended to each gated pool, so the loop below is plain gathers.
+    gate_probs = np.array([profile[f"{key}_prob"] for key in ("network", "usb", "gpu", "sound")])
+    gates = rng.random((n, len(gate_probs))) < gate_probs
+    choices = {}
+    picks = {}
+    for key, options in pool.items():
+        draw = rng.integers(0, len(options), size=n)
+        if key in GATED_POOLS:
+            options = options + (None,)
+            draw = np.where(gates[:, GATED_POOLS[key]], draw, -1)
+        choices[key] = options
+        picks[key] = draw.tolist()
+    usb_lo, usb_hi = profile["usb_count"]
+    usb_counts = np.where(gates[:, GATED_POOLS["usb_controller"]],
+                          rng.integers(usb_lo, usb_hi + 1, size=n), 0)
+    usb_counts = np.minimum(usb_counts, len(USB_SUBSETS) - 1)
+    subset_sizes = np.array([len(subsets) for subsets in USB_SUBSETS])
+    usb_picks = (rng.random(n) * subset_sizes[usb_counts]).astype(np.int64).tolist()
+    usb_counts = usb_counts.tolist()
+
+    machines = []
+    for i in range(n):
+        machines.append(_assemble_machine(
+            profile_name,
+            start_seq + i,
+            choices["cpu"][picks["cpu"][i]],
+            choices["memory"][picks["memory"][i]],
+            choices["storage"][picks["storage"][i]],
+            choices["network"][picks["network"][i]],
+            choices["usb_controller"][picks["usb_controller"][i]],
+            USB_SUBSETS[usb_counts[i]][usb_picks[i]],
+            choices["gpu"][picks["gpu"][i]],
+            choices["sound"][picks["sound"][i]],
+        ))
+    return machines
+
+def _assemble_machine(profile_name, seq, cpu, memory, storage, network,
+                      usb_controller, usb_devices, gpu, sound) -> MachineIdentity:
+    """Build QEMU args and the machine id for an already-chosen hardware set."""
     # Generate QEMU command line args
-    qemu_args = build_qemu_args(cpu, memory, storage, network, usb_controller, usb_devices, gpu, sound)
+    qemu_args = cached_qemu_args(cpu, memory, storage, network, usb_controller, usb_devices, gpu, sound)
 
-    # Generate unique machine ID
-    config_str = json.dumps([cpu, memory, storage, network, usb_controller, usb_devices, gpu, sound], sort_keys=True)
-    machine_id = hashlib.sha256(config_str.encode()).hexdigest()[:12]
+    # Machine ID: sequence number prefix (unique within a run, so no
+    # collision retries) + config fingerprint suffix. No security property
+    # is needed; components are fed to the hasher one at a time.
+    h = xxhash.xxh3_64() if HAS_XXHASH else hashlib.blake2b(digest_size=6)
+    h.update(profile_name.encode())
+    for part in (cpu, memory, storage, network, usb_controller, usb_devices, gpu, sound):
+        h.update(canonical_json(part))
+    machine_id = f"{seq:06x}{h.hexdigest()[:6]}"
 
     return MachineIdentity(
         machine_id=machine_id,
@@ -205,6 +383,45 @@ def generate_machine(profile_name: str = "minimal") -> MachineIdentity:
         qemu_args=qemu_args
     )
 
+# QEMU args per storage type, selected in O(1) by build_qemu_args
+STORAGE_ARGS = {
+    "virtio-blk": ("-drive", "file=DISK_IMAGE,format=raw,if=virtio"),
+    "ide-hd": ("-drive", "file=DISK_IMAGE,format=raw,if=ide,media=disk"),
+    "ide-cd": ("-drive", "file=DISK_IMAGE,format=raw,if=ide,media=cdrom"),
+    "nvme": ("-drive", "file=DISK_IMAGE,format=raw,if=none,id=nvme0",
+             "-device", "nvme,serial=deadbeef,drive=nvme0"),
+    "scsi-hd": ("-device", "virtio-scsi-pci,id=scsi0",
+                "-drive", "file=DISK_IMAGE,format=raw,if=none,id=hd0",
+                "-device", "scsi-hd,drive=hd0,bus=scsi0.0"),
+    "usb-storage": ("-drive", "file=DISK_IMAGE,format=raw,if=none,id=usbdisk",
+                    "-device", "usb-storage,drive=usbdisk"),
+}
+
+# QEMU args per network device type (None = no NIC)
+NETWORK_ARGS = {
+    n["type"]: ("-netdev", "user,id=net0", "-device", f"{n['type']},netdev=net0")
+    for n in NETWORK_CHOICES
+}
+NETWORK_ARGS[None] = ("-nic", "none")
+
+# Built arg tuples keyed by the hardware fields build_qemu_args reads
+_QEMU_ARGS_CACHE: dict[tuple, tuple[str, ...]] = {}
+
+def cached_qemu_args(cpu, memory, storage, network, usb_controller, usb_devices, gpu, sound) -> list[str]:
+    """build_qemu_args, memoized on the hardware combination."""
+    key = (
+        cpu["model"], cpu["cores"], memory, storage["type"],
+        network["type"] if network else None,
+        usb_controller, tuple(d["type"] for d in usb_devices),
+        gpu["model"] if gpu else None,
+        sound["model"] if sound else None,
+    )
+    args = _QEMU_ARGS_CACHE.get(key)
+    if args is None:
+        args = _QEMU_ARGS_CACHE[key] = tuple(
+            build_qemu_args(cpu, memory, storage, network, usb_controller, usb_devices, gpu, sound))
+    return list(args)
+
 def build_qemu_args(cpu, memory, storage, network, usb_controller, usb_devices, gpu, sound) -> list[str]:
     """Build QEMU command line arguments for this machine."""
     args = [
@@ -216,29 +433,10 @@ def build_qemu_args(cpu, memory, storage, network, usb_controller, usb_devices,
     ]
 
     # Storage
-    if storage["type"] == "virtio-blk":
-        args.extend(["-drive", "file=DISK_IMAGE,format=raw,if=virtio"])
-    elif storage["type"] == "ide-hd":
-        args.extend(["-drive", "file=DISK_IMAGE,format=raw,if=ide,media=disk"])
-    elif storage["type"] == "ide-cd":
-        args.extend(["-drive", "file=DISK_IMAGE,format=raw,if=ide,media=cdrom"])
-    elif storage["type"] == "nvme":
-        args.extend(["-drive", "file=DISK_IMAGE,format=raw,if=none,id=nvme0"])
-        args.extend(["-device", "nvme,serial=deadbeef,drive=nvme0"])
-    elif storage["type"] == "scsi-hd":
-        args.extend(["-device", "virtio-scsi-pci,id=scsi0"])
-        args.extend(["-drive", "file=DISK_IMAGE,format=raw,if=none,id=hd0"])
-        args.extend(["-device", "scsi-hd,drive=hd0,bus=scsi0.0"])
-    elif storage["type"] == "usb-storage":
-        args.extend(["-drive", "file=DISK_IMAGE,format=raw,if=none,id=usbdisk"])
-        args.extend(["-device", "usb-storage,drive=usbdisk"])
+    args += STORAGE_ARGS.get(storage["type"], ())
 
     # Network
-    if network:
-        args.extend(["-netdev", "user,id=net0"])
-        args.extend(["-device", f"{network['type']},netdev=net0"])
-    else:
-        args.extend(["-nic", "none"])
+    args += NETWORK_ARGS[network["type"] if network else None]
 
     # USB controller and devices
     if usb_controller:
@@ -258,6 +456,41 @@ def build_qemu_args(cpu, memory, storage, network, usb_controller, usb_devices,
 
     return args
 
+def _seed_worker():
+    """Re-seed the stdlib RNG so forked workers don't share MT state."""
+    random.seed()
+
+def serialize_machine(machine: MachineIdentity) -> bytes:
+    """Encode a machine for the configured MACHINES_FORMAT."""
+    if MACHINES_FORMAT == "files":
+        return pretty_json(machine.to_json_dict())
+    return compact_json(machine.to_json_dict()) + b"\n"
+
+def _gen_chunk(profile_name: str, n: int, start_seq: int) -> list[tuple[MachineIdentity, bytes]]:
+    """Generate n machines and serialize them (runs inside a worker)."""
+    return [(m, serialize_machine(m)) for m in generate_machines_batch(profile_name, n, start_seq)]
+
+def generate_parallel(executor, workers: int, profile_name: str, n: int,
+                      start_seq: int) -> Iterator[tuple[MachineIdentity, bytes]]:
+    """Yield n machines in sequence order, generated across the worker pool.
+
+    Work goes out in CHUNK_SIZE tasks with at most 2 * workers in flight,
+    and each chunk is yielded as soon as its turn comes, so only those
+    chunks are ever held in memory. Runs inline for 1 worker.
+    """
+    if workers <= 1 or n < workers:
+        yield from _gen_chunk(profile_name, n, start_seq)
+        return
+    size = min(CHUNK_SIZE, -(-n // workers))
+    pending = deque()
+    end = start_seq + n
+    while start_seq < end or pending:
+        while start_seq < end and len(pending) < 2 * workers:
+            k = min(size, end - start_seq)
+            pending.append(executor.submit(_gen_chunk, profile_name, k, start_seq))
+            start_seq += k
+        yield from pending.popleft().result()
+
 def main():
     import sys
 
@@ -288,52 +521,42 @@ def main():
             ("server", int(count_arg * 0.10)),       # 10%
         ]
 
-    all_machines = []
-    seen_ids = set()
-
-    for profile_name, count in machines_to_generate:
-        print(f"\nGenerating {count} '{profile_name}' machines:")
-        generated = 0
-        attempts = 0
-        max_attempts = count * 10  # Prevent infinite loops
-
-        while generated < count and attempts < max_attempts:
-            attempts += 1
-            machine = generate_machine(profile_name)
-
-            # Skip duplicates (hash collision)
-            if machine.machine_id in seen_ids:
-                continue
-
-            seen_ids.add(machine.machine_id)
-            all_machines.append(machine)
-            generated += 1
-
-            # Save individual machine file
-            machine_path = MACHINES_DIR / f"{machine.machine_id}.json"
-            with open(machine_path, 'w') as f:
-                json.dump(asdict(machine), f, indent=2)
-
-            # Summary output
-            hw_summary = f"{machine.cpu['cores']}C/{memory_str(machine.memory_mb)}"
-            hw_summary += f"/{storage.get('type', 'unknown')}" if (storage := machine.storage) else ""
-            hw_summary += f"/{network.get('type', 'no-net')[:8]}" if (network := machine.network) else "/no-net"
-            print(f"  {machine.machine_id}: {hw_summary}")
-
-    # Save index
-    index_path = MACHINES_DIR / "index.json"
-    with open(index_path, 'w') as f:
-        json.dump({
-            "count": len(all_machines),
-            "machines": [m.machine_id for m in all_machines],
-            "profiles": {
-                profile: len([m for m in all_machines if m.profile == profile])
-                for profile in PROFILES.keys()
-            }
-        }, f, indent=2)
-
-    print(f"\nGenerated {len(all_machines)} unique machines in {MACHINES_DIR}")
-    print(f"Profile distribution: {dict(json.load(open(index_path))['profiles'])}")
+    profile_counts = Counter()
+    total = 0
+
+    # Machines and the index are streamed as chunks come back from the
+    # workers, so memory is bounded by the chunks in flight rather than
+    # by the size of a profile or of the whole run.
+    workers = WORKERS if count_arg >= PARALLEL_MIN_COUNT else 1
+    with open(MACHINES_DIR / "index.json", 'wb') as index, \
+         (open(MACHINES_DIR / "machines.jsonl", 'wb') if MACHINES_FORMAT != "files" else nullcontext()) as jsonl, \
+         ProcessPoolExecutor(max_workers=max(1, workers), initializer=_seed_worker) as executor:
+        index.write(b'{\n  "machines": [')
+        for profile_name, count in machines_to_generate:
+            print(f"\nGenerating {count} '{profile_name}' machines:")
+
+            for machine, data in generate_parallel(executor, workers, profile_name, count, total):
+                # Save machine record
+                if jsonl:
+                    jsonl.write(data)
+                else:
+                    write_bytes(MACHINES_DIR / f"{machine.machine_id}.json", data)
+
+                index.write(b'%s\n    "%s"' % (b"," if total else b"", machine.machine_id.encode()))
+                profile_counts[machine.profile] += 1
+                total += 1
+
+                # Summary output
+                hw_summary = f"{machine.cpu['cores']}C/{memory_str(machine.memory_mb)}"
+                hw_summary += f"/{storage.get('type', 'unknown')}" if (storage := machine.storage) else ""
+                hw_summary += f"/{network.get('type', 'no-net')[:8]}" if (network := machine.network) else "/no-net"
+                print(f"  {machine.machine_id}: {hw_summary}")
+
+        profiles = {profile: profile_counts[profile] for profile in PROFILES}
+        index.write(b'\n  ],\n  "count": %d,\n  "profiles": %s\n}\n' % (total, compact_json(profiles)))
+
+    print(f"\nGenerated {total} machines in {MACHINES_DIR}")
+    print(f"Profile distribution: {profiles}")
 
 def memory_str(mb: int) -> str:
     """Format memory size for display."""
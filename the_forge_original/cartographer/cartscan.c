@@ -0,0 +1,190 @@
+/*
+ * Cartographer native ID scanner
+ *
+ * Finds the same device ID matches as the regexes in extract_drivers.py,
+ * with memchr() for the literal macro names and a small hand-written
+ * parser for their operands, and packs each pair as vendor << 16 | device. Loaded through ctypes; when the library is
+ * not built, extract_drivers.py uses its regexes instead.
+ *
+ * Build: gcc -O3 -shared -fPIC -o libcartscan.so cartscan.c
+ */
+
+#include <stddef.h>
+#include <stdint.h>
+#include <string.h>
+
+/* Parsed values above this are not 16-bit IDs (saturates, never wraps) */
+#define NOT_AN_ID 0x10000u
+
+/* Python re's \s on bytes: space, \t \n \v \f \r */
+static inline int is_space(unsigned char c)
+{
+    return c == ' ' || (c >= '\t' && c <= '\r');
+}
+
+/* Value of hex digit c, or -1 */
+static inline int hex_value(unsigned char c)
+{
+    if (c >= '0' && c <= '9')
+        return c - '0';
+    c |= 0x20;
+    if (c >= 'a' && c <= 'f')
+        return c - 'a' + 10;
+    return -1;
+}
+
+static inline size_t skip_space(const char *buf, size_t len, size_t i)
+{
+    while (i < len && is_space((unsigned char)buf[i]))
+        i++;
+    return i;
+}
+
+/* 0x[0-9a-fA-F]+ at i: end of the number, or 0 if there is none. Its
+ * value goes to *value, capped at NOT_AN_ID. */
+static size_t match_hex(const char *buf, size_t len, size_t i, uint32_t *value)
+{
+    uint32_t v = 0;
+    int d;
+
+    if (i + 2 >= len || buf[i] != '0' || buf[i + 1] != 'x'
+            || hex_value((unsigned char)buf[i + 2]) < 0)
+        return 0;
+    for (i += 2; i < len && (d = hex_value((unsigned char)buf[i])) >= 0; i++) {
+        v = v << 4 | (uint32_t)d;
+        if (v > NOT_AN_ID)
+            v = NOT_AN_ID;
+    }
+    *value = v;
+    return i;
+}
+
+/* \s*\(\s*HEX\s*,\s*HEX\s*\) at i, after a macro name: end of the match,
+ * or 0. id gets both numbers. */
+static size_t match_call(const char *buf, size_t len, size_t i, uint32_t *id)
+{
+    i = skip_space(buf, len, i);
+    if (i >= len || buf[i] != '(')
+        return 0;
+    i = skip_space(buf, len, i + 1);
+    if (!(i = match_hex(buf, len, i, &id[0])))
+        return 0;
+    i = skip_space(buf, len, i);
+    if (i >= len || buf[i] != ',')
+        return 0;
+    i = skip_space(buf, len, i + 1);
+    if (!(i = match_hex(buf, len, i, &id[1])))
+        return 0;
+    i = skip_space(buf, len, i);
+    if (i >= len || buf[i] != ')')
+        return 0;
+    return i + 1;
+}
+
+/* \s*=\s*HEX at i, after a field name: end of the number, or 0 */
+static size_t match_field(const char *buf, size_t len, size_t i, uint32_t *value)
+{
+    i = skip_space(buf, len, i);
+    if (i >= len || buf[i] != '=')
+        return 0;
+    i = skip_space(buf, len, i + 1);
+    return match_hex(buf, len, i, value);
+}
+
+/* .idVendor = HEX, then .idProduct = HEX within 256 bytes and no '}'.
+ * A shorter vendor number can't widen that window, so the longest one is
+ * the only one worth trying (as it is the one re tries first). */
+static size_t match_id_fields(const char *buf, size_t len, size_t i, uint32_t *id)
+{
+    size_t q, limit, end;
+
+    if (!(q = match_field(buf, len, i, &id[0])))
+        return 0;
+    for (limit = q + 256; q <= limit && q < len; q++) {
+        if (len - q > 10 && memcmp(buf + q, ".idProduct", 10) == 0
+                && (end = match_field(buf, len, q + 10, &id[1])))
+            return end;
+        if (buf[q] == '}')
+            break;
+    }
+    return 0;
+}
+
+/* memmem() for these short, capitalized needles: glibc's memchr() finds
+ * the rare first byte at vector speed, faster than its generic memmem() */
+static const char *find_literal(const char *hay, size_t len, const char *lit,
+                                size_t lit_len)
+{
+    const char *end = hay + len, *p = hay;
+
+    while ((size_t)(end - p) >= lit_len
+            && (p = memchr(p, lit[0], (size_t)(end - p) - lit_len + 1))) {
+        if (memcmp(p + 1, lit + 1, lit_len - 1) == 0)
+            return p;
+        p++;
+    }
+    return NULL;
+}
+
+typedef size_t (*matcher)(const char *, size_t, size_t, uint32_t *);
+
+/* Non-overlapping matches of one literal-prefixed pattern, like finditer.
+ * Pairs where either number is wider than 16 bits match but aren't IDs. */
+static size_t scan_pattern(const char *buf, size_t len, const char *lit,
+                           matcher match, uint32_t *ids, size_t cap, size_t n)
+{
+    size_t lit_len = strlen(lit);
+    size_t pos = 0, end;
+    uint32_t id[2];
+    const char *hit;
+
+    while (pos < len && (hit = find_literal(buf + pos, len - pos, lit, lit_len))) {
+        size_t at = (size_t)(hit - buf);
+        if ((end = match(buf, len, at + lit_len, id))) {
+            if (id[0] < NOT_AN_ID && id[1] < NOT_AN_ID) {
+                if (n < cap)
+                    ids[n] = id[0] << 16 | id[1];
+                n++;
+            }
+            pos = end;
+        } else {
+            pos = at + 1;
+        }
+    }
+    return n;
+}
+
+/*
+ * Scan buf for PCI_DEVICE(), USB_DEVICE() and .idVendor/.idProduct IDs.
+ * Up to cap packed IDs go to ids: the PCI ones first (*n_pci of them),
+ * then USB_DEVICE, then the field pairs. Returns the total found; if that
+ * is more than cap, call again with room for all of them.
+ */
+size_t cart_scan_ids(const char *buf, size_t len, uint32_t *ids, size_t cap,
+                     size_t *n_pci)
+{
+    size_t n;
+
+    n = scan_pattern(buf, len, "PCI_DEVICE", match_call, ids, cap, 0);
+    *n_pci = n;
+    n = scan_pattern(buf, len, "USB_DEVICE", match_call, ids, cap, n);
+    n = scan_pattern(buf, len, ".idVendor", match_id_fields, ids, cap, n);
+    return n;
+}
+
+/* len(buf.splitlines()) for bytes: \n, \r and \r\n end a line */
+size_t cart_count_lines(const char *buf, size_t len)
+{
+    const char *end = buf + len, *p;
+    size_t lines = 0;
+
+    for (p = buf; (p = memchr(p, '\n', (size_t)(end - p))); p++)
+        lines++;
+    /* A \r ends a line too, unless it is the start of a \r\n */
+    for (p = buf; (p = memchr(p, '\r', (size_t)(end - p))); p++)
+        if (p + 1 == end || p[1] != '\n')
+            lines++;
+    if (len && buf[len - 1] != '\n' && buf[len - 1] != '\r')
+        lines++;
+    return lines;
+}
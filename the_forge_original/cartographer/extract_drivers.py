@@ -4,130 +4,412 @@ The Cartographer
 Extracts driver ↔ device ID mappings from Linux kernel source.
 """
 
+import ctypes
+import mmap
 import os
+import pickle
 import re
 import json
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+from itertools import islice, repeat
 from pathlib import Path
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from typing import Optional
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# Native scanner (cartscan.c, built into the image); the regexes otherwise
+try:
+    _native = ctypes.CDLL(str(Path(__file__).with_name("libcartscan.so")))
+    _native.cart_scan_ids.restype = ctypes.c_size_t
+    _native.cart_scan_ids.argtypes = [
+        ctypes.c_char_p, ctypes.c_size_t, ctypes.POINTER(ctypes.c_uint32),
+        ctypes.c_size_t, ctypes.POINTER(ctypes.c_size_t),
+    ]
+    _native.cart_count_lines.restype = ctypes.c_size_t
+    _native.cart_count_lines.argtypes = [ctypes.c_char_p, ctypes.c_size_t]
+    HAS_NATIVE_SCAN = True
+except OSError:
+    HAS_NATIVE_SCAN = False
+
 KERNEL_SRC = Path("/forge/kernel_src")
 OUTPUT_DIR = Path("/forge/data")
+SCAN_CACHE_PATH = OUTPUT_DIR / "driver_cache.pkl"
+# Bump when extraction changes, so cached per-file results are discarded
+SCAN_CACHE_VERSION = 4
+# Files per scan worker opened ahead with POSIX_FADV_WILLNEED (Linux)
+READAHEAD_DEPTH = 32
+HAS_FADVISE = hasattr(os, 'posix_fadvise')
+HAS_MADVISE = hasattr(mmap, 'MADV_SEQUENTIAL')
+
+# Device ID patterns (on the raw file bytes: they are all ASCII, so files are
+# never decoded), compiled once for the whole scan. Each begins with a
+# literal, which re locates with its fast substring search; kept as separate
+# passes because one alternation of them loses that and scans every
+# character (measured slower, even before matching on a PU. charset).
+# libcartscan (cartscan.c) matches the same text natively when built; these
+# are the fallback. No hyperscan/re2: hyperscan reports match ends without
+# capture groups, so each hit would be re-matched here for its IDs anyway.
+# { PCI_DEVICE(0xVENDOR, 0xDEVICE) }
+_PCI_DEVICE_RE = re.compile(rb'PCI_DEVICE\s*\(\s*(0x[0-9a-fA-F]+)\s*,\s*(0x[0-9a-fA-F]+)\s*\)')
+# { PCI_VDEVICE(VENDOR, 0xDEVICE) } - vendor from a define, not resolved yet
+_PCI_VDEVICE_RE = re.compile(rb'PCI_VDEVICE\s*\(\s*(\w+)\s*,\s*(0x[0-9a-fA-F]+)\s*\)')
+# { USB_DEVICE(0xVENDOR, 0xPRODUCT) }
+_USB_DEVICE_RE = re.compile(rb'USB_DEVICE\s*\(\s*(0x[0-9a-fA-F]+)\s*,\s*(0x[0-9a-fA-F]+)\s*\)')
+# USB_DEVICE_ID with vendor/product fields. Both must sit in the same struct
+# initializer (no '}' between them, at most 256 bytes apart), as kernel USB
+# device tables write them; the bound stops .*? running across whole files.
+_USB_IDVENDOR_RE = re.compile(rb'\.idVendor\s*=\s*(0x[0-9a-fA-F]+)[^}]{0,256}?\.idProduct\s*=\s*(0x[0-9a-fA-F]+)')
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Driver:
     name: str
     path: str
     category: str
-    pci_ids: list[tuple[str, str]]  # (vendor, device)
-    usb_ids: list[tuple[str, str]]  # (vendor, product)
+    pci_ids: array  # 'I': vendor << 16 | device
+    usb_ids: array  # 'I': vendor << 16 | product
     complexity: int  # lines of code
     
-def extract_pci_ids(content: str) -> list[tuple[str, str]]:
+    def to_dict(self) -> dict:
+        d = {name: getattr(self, name) for name in self.__slots__}
+        d["pci_ids"] = unpack_ids(self.pci_ids)
+        d["usb_ids"] = unpack_ids(self.usb_ids)
+        return d
+
+def _append_id(ids: array, vendor: bytes, device: bytes):
+    """Append a packed vendor:device pair. PCI and USB IDs are 16-bit, so a
+    wider literal is not one and is dropped."""
+    vendor_id = int(vendor, 16)
+    device_id = int(device, 16)
+    if vendor_id <= 0xffff and device_id <= 0xffff:
+        ids.append(vendor_id << 16 | device_id)
+
+def _unique_ids(ids: array) -> array:
+    """ids without repeats, in first-seen order."""
+    if len(ids) < 2:
+        return ids
+    return array('I', dict.fromkeys(ids))
+
+def unpack_ids(ids: array) -> list[tuple[str, str]]:
+    """Packed IDs as ("0xvvvv", "0xdddd") pairs, the manifest's format."""
+    return [(f"0x{x >> 16:04x}", f"0x{x & 0xffff:04x}") for x in ids]
+    
+def extract_pci_ids(content: 'bytes | mmap.mmap') -> array:
     """Extract PCI device IDs from MODULE_DEVICE_TABLE macro."""
-    ids = []
-    
-    # Pattern: { PCI_DEVICE(0xVENDOR, 0xDEVICE) }
-    pattern = r'PCI_DEVICE\s*\(\s*(0x[0-9a-fA-F]+)\s*,\s*(0x[0-9a-fA-F]+)\s*\)'
-    for match in re.finditer(pattern, content):
-        vendor = match.group(1).lower()
-        device = match.group(2).lower()
-        ids.append((vendor, device))
-    
-    # Pattern: { PCI_VDEVICE(VENDOR, 0xDEVICE) } - vendor from define
-    pattern2 = r'PCI_VDEVICE\s*\(\s*(\w+)\s*,\s*(0x[0-9a-fA-F]+)\s*\)'
-    for match in re.finditer(pattern2, content):
-        # We'd need to resolve the vendor define, skip for now
-        pass
+    ids = array('I')
+    
+    for match in _PCI_DEVICE_RE.finditer(content):
+        _append_id(ids, match.group(1), match.group(2))
+    
+    # PCI_VDEVICE entries (_PCI_VDEVICE_RE) would need the vendor define
+    # resolved, so they are skipped for now - without scanning for them
         
     return ids
 
-def extract_usb_ids(content: str) -> list[tuple[str, str]]:
+def extract_usb_ids(content: 'bytes | mmap.mmap') -> array:
     """Extract USB device IDs from MODULE_DEVICE_TABLE macro."""
-    ids = []
-    
-    # Pattern: { USB_DEVICE(0xVENDOR, 0xPRODUCT) }
-    pattern = r'USB_DEVICE\s*\(\s*(0x[0-9a-fA-F]+)\s*,\s*(0x[0-9a-fA-F]+)\s*\)'
-    for match in re.finditer(pattern, content):
-        vendor = match.group(1).lower()
-        product = match.group(2).lower()
-        ids.append((vendor, product))
-    
-    # Pattern: USB_DEVICE_ID with vendor/product fields
-    pattern2 = r'\.idVendor\s*=\s*(0x[0-9a-fA-F]+).*?\.idProduct\s*=\s*(0x[0-9a-fA-F]+)'
-    for match in re.finditer(pattern2, content, re.DOTALL):
-        vendor = match.group(1).lower()
-        product = match.group(2).lower()
-        ids.append((vendor, product))
+    ids = array('I')
+    
+    for match in _USB_DEVICE_RE.finditer(content):
+        _append_id(ids, match.group(1), match.group(2))
+    
+    for match in _USB_IDVENDOR_RE.finditer(content):
+        _append_id(ids, match.group(1), match.group(2))
         
     return ids
 
+# Directory name -> (priority, category). A path in several category
+# directories gets the lowest priority number (e.g. usb/net/ is network).
+_CATEGORY_DIRS = {
+    'gpu': (0, 'gpu'), 'drm': (0, 'gpu'),
+    'net': (1, 'network'),
+    'usb': (2, 'usb'),
+    'input': (3, 'input'),
+    'sound': (4, 'audio'), 'audio': (4, 'audio'),
+    'block': (5, 'storage'), 'nvme': (5, 'storage'), 'ata': (5, 'storage'),
+    'pci': (6, 'pci'),
+    'acpi': (7, 'acpi'),
+}
+
 def categorize_driver(path: str) -> str:
     """Determine driver category from path."""
-    path_lower = path.lower()
-    
-    if '/gpu/' in path_lower or '/drm/' in path_lower:
-        return 'gpu'
-    elif '/net/' in path_lower:
-        return 'network'
-    elif '/usb/' in path_lower:
-        return 'usb'
-    elif '/input/' in path_lower:
-        return 'input'
-    elif '/sound/' in path_lower or '/audio/' in path_lower:
-        return 'audio'
-    elif '/block/' in path_lower or '/nvme/' in path_lower or '/ata/' in path_lower:
-        return 'storage'
-    elif '/pci/' in path_lower:
-        return 'pci'
-    elif '/acpi/' in path_lower:
-        return 'acpi'
-    else:
-        return 'other'
-
-def scan_drivers(kernel_path: Path) -> list[Driver]:
-    """Scan kernel source for all drivers with device IDs."""
-    drivers = []
-    driver_dirs = [
-        kernel_path / "drivers",
-        kernel_path / "sound",
-    ]
-    
-    for base_dir in driver_dirs:
-        if not base_dir.exists():
+    # Only inner segments count: the first has no '/' before it and the
+    # last (the file name) none after it
+    best = (len(_CATEGORY_DIRS), 'other')
+    for segment in path.lower().split('/')[1:-1]:
+        rank = _CATEGORY_DIRS.get(segment)
+        if rank is not None and rank < best:
+            best = rank
+    return best[1]
+
+def walk_c_files(root: str):
+    """Yield the .c files under root, in Path.rglob("*.c") order: each
+    directory's files, then its subdirectories depth-first. One scandir
+    per directory; directory symlinks are not followed."""
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        subdirs = []
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    try:
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    if is_dir:
+                        subdirs.append(entry.path)
+                    elif entry.name.endswith('.c'):
+                        yield entry.path
+        except OSError:
             continue
+        stack.extend(reversed(subdirs))
+
+def _native_scan_ids(mm: mmap.mmap) -> tuple[array, array]:
+    """extract_pci_ids and extract_usb_ids in one libcartscan call."""
+    size = len(mm)
+    buf = (ctypes.c_char * size).from_buffer(mm)
+    try:
+        cap = 64
+        while True:
+            packed = (ctypes.c_uint32 * cap)()
+            n_pci = ctypes.c_size_t()
+            total = _native.cart_scan_ids(buf, size, packed, cap, ctypes.byref(n_pci))
+            if total <= cap:
+                break
+            cap = total
+    finally:
+        del buf  # release the export, or the mmap can't be closed
+    
+    # Already packed in C: one bulk copy per list, no per-ID Python work
+    split = n_pci.value * ctypes.sizeof(ctypes.c_uint32)
+    raw = memoryview(packed).cast('B')[:total * ctypes.sizeof(ctypes.c_uint32)]
+    pci_ids = array('I')
+    usb_ids = array('I')
+    pci_ids.frombytes(raw[:split])
+    usb_ids.frombytes(raw[split:])
+    return pci_ids, usb_ids
+
+def _count_lines(mm: mmap.mmap) -> int:
+    """len(content.splitlines()) of the mapped file."""
+    if HAS_NATIVE_SCAN:
+        buf = (ctypes.c_char * len(mm)).from_buffer(mm)
+        try:
+            return _native.cart_count_lines(buf, len(mm))
+        finally:
+            del buf
+    # Count line ends (\n, \r, \r\n) instead of building the list of lines
+    content = mm[:]
+    lines = content.count(b'\n') + content.count(b'\r') - content.count(b'\r\n')
+    if content and content[-1] not in b'\r\n':
+        lines += 1
+    return lines
+
+def _open_ahead(c_file: str) -> Optional[int]:
+    """Open c_file and ask the kernel to start reading it in the background."""
+    try:
+        fd = os.open(c_file, os.O_RDONLY)
+    except OSError:
+        return None
+    if HAS_FADVISE:
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        except OSError:
+            pass
+    return fd
+
+def scan_file(c_file: str, kernel_root: str, fd: Optional[int] = None) -> Optional[Driver]:
+    """Scan one source file; None unless it has a device table with IDs.
+    kernel_root is the kernel source path with a trailing separator. An
+    already-open fd for c_file may be passed in; it is closed either way."""
+    try:
+        if fd is None:
+            fd = os.open(c_file, os.O_RDONLY)
+        # The native scanner needs a writable buffer to point ctypes at;
+        # ACCESS_COPY is a private mapping, never written, so never copied
+        access = mmap.ACCESS_COPY if HAS_NATIVE_SCAN else mmap.ACCESS_READ
+        with mmap.mmap(fd, 0, access=access) as mm:
+            if HAS_MADVISE:
+                # Every pass reads front to back: let faults read ahead wide
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            # Only process files with device tables - most have none, and
+            # are rejected from the mapping without copying them in
+            if mm.find(b'MODULE_DEVICE_TABLE') == -1:
+                return None
             
-        for c_file in base_dir.rglob("*.c"):
-            try:
-                content = c_file.read_text(errors='ignore')
-            except Exception:
-                continue
-            
-            # Only process files with device tables
-            if 'MODULE_DEVICE_TABLE' not in content:
-                continue
-            
-            pci_ids = extract_pci_ids(content)
-            usb_ids = extract_usb_ids(content)
+            if HAS_NATIVE_SCAN:
+                pci_ids, usb_ids = _native_scan_ids(mm)
+            else:
+                pci_ids = extract_pci_ids(mm)
+                usb_ids = extract_usb_ids(mm)
             
             if not pci_ids and not usb_ids:
-                continue
+                return None
             
-            rel_path = str(c_file.relative_to(kernel_path))
-            driver_name = c_file.stem
-            
-            driver = Driver(
-                name=driver_name,
-                path=rel_path,
-                category=categorize_driver(rel_path),
-                pci_ids=pci_ids,
-                usb_ids=usb_ids,
-                complexity=len(content.splitlines())
-            )
+            # Tables often list an ID twice (under several macros or
+            # driver_data variants); keep its first occurrence only
+            pci_ids = _unique_ids(pci_ids)
+            usb_ids = _unique_ids(usb_ids)
+            complexity = _count_lines(mm)
+    except (OSError, ValueError):  # ValueError: empty files can't be mapped
+        return None
+    finally:
+        if fd is not None:
+            os.close(fd)
+    
+    rel_path = c_file[len(kernel_root):]
+    driver_name = os.path.splitext(os.path.basename(c_file))[0]
+    
+    return Driver(
+        name=driver_name,
+        path=rel_path,
+        category=categorize_driver(rel_path),
+        pci_ids=pci_ids,
+        usb_ids=usb_ids,
+        complexity=complexity
+    )
+
+def _scan_chunk(kernel_root: str, c_files: list[str]) -> list[Optional[Driver]]:
+    """Worker-process body: scan a run of files, one result per file.
+    
+    The next READAHEAD_DEPTH files are kept open with readahead requested,
+    so their reads are in flight while the current file is scanned.
+    """
+    results = []
+    upcoming = iter(c_files)
+    pending = deque((c_file, _open_ahead(c_file))
+                    for c_file in islice(upcoming, READAHEAD_DEPTH))
+    try:
+        while pending:
+            c_file, fd = pending.popleft()
+            next_file = next(upcoming, None)
+            if next_file is not None:
+                pending.append((next_file, _open_ahead(next_file)))
+            results.append(scan_file(c_file, kernel_root, fd) if fd is not None else None)
+    finally:
+        for _, fd in pending:
+            if fd is not None:
+                os.close(fd)
+    return results
+
+def _scan_files(kernel_root: str, c_files: list[str], workers: int) -> list[Optional[Driver]]:
+    """Scan c_files in `workers` processes; results keep the file order."""
+    if workers == 1 or len(c_files) < 2:
+        return _scan_chunk(kernel_root, c_files)
+    
+    # Several chunks per worker, so one slow chunk doesn't idle the rest
+    chunk_size = max(1, -(-len(c_files) // (workers * 4)))
+    chunks = [c_files[i:i + chunk_size] for i in range(0, len(c_files), chunk_size)]
+    
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for chunk_results in executor.map(_scan_chunk, repeat(kernel_root), chunks):
+            results.extend(chunk_results)
+    return results
+
+def load_scan_cache(cache_path: Path) -> dict:
+    """Load the per-file scan cache: path -> ((mtime_ns, size), Driver or
+    None). A missing, unreadable or older-format cache is just empty."""
+    try:
+        with open(cache_path, 'rb') as f:
+            cache = pickle.load(f)
+    except Exception:
+        return {}
+    if not isinstance(cache, dict) or cache.get("version") != SCAN_CACHE_VERSION:
+        return {}
+    return cache["files"]
+
+def save_scan_cache(cache_path: Path, files: dict):
+    """Write the scan cache atomically (tmp file + os.replace)."""
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = cache_path.with_name(cache_path.name + ".tmp")
+    with open(tmp, 'wb') as f:
+        pickle.dump({"version": SCAN_CACHE_VERSION, "files": files}, f,
+                    protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, cache_path)
+
+def scan_drivers(kernel_path: Path, workers: Optional[int] = None,
+                 cache_path: Optional[Path] = None) -> list[Driver]:
+    """Scan kernel source for all drivers with device IDs.
+    
+    Files are scanned by `workers` processes (default: one per CPU), in
+    chunks of consecutive files; drivers come back in traversal order.
+    With cache_path, files whose (mtime, size) match the cache reuse their
+    earlier result (including "no driver") and only the rest are scanned.
+    """
+    kernel_root = os.path.join(str(kernel_path), '')
+    driver_dirs = [
+        os.path.join(kernel_root, "drivers"),
+        os.path.join(kernel_root, "sound"),
+    ]
+    
+    c_files = []
+    for base_dir in driver_dirs:
+        if not os.path.exists(base_dir):
+            continue
+        c_files.extend(walk_c_files(base_dir))
+    
+    cache = load_scan_cache(cache_path) if cache_path is not None else {}
+    
+    # Stat before scanning: a file changed mid-scan is cached under its old
+    # stamp, so the next run rescans it
+    stamps = []
+    stale = []
+    for c_file in c_files:
+        try:
+            st = os.stat(c_file)
+            stamp = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            stamp = None
+        stamps.append(stamp)
+        entry = cache.get(c_file)
+        if stamp is None or entry is None or entry[0] != stamp:
+            stale.append(c_file)
+    
+    workers = workers or os.cpu_count() or 1
+    scanned = dict(zip(stale, _scan_files(kernel_root, stale, workers)))
+    
+    drivers = []
+    files = {}
+    for c_file, stamp in zip(c_files, stamps):
+        driver = scanned[c_file] if c_file in scanned else cache[c_file][1]
+        if stamp is not None:
+            files[c_file] = (stamp, driver)
+        if driver is not None:
             drivers.append(driver)
     
+    if cache_path is not None and (stale or len(files) != len(cache)):
+        save_scan_cache(cache_path, files)
+    
     return drivers
 
+def _pretty_json(obj) -> bytes:
+    """Serialize obj to 2-space indented JSON bytes."""
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2).encode()
+
+def write_manifest(manifest_path: Path, header: dict, drivers: list[Driver]):
+    """Write the manifest - header fields, then a "drivers" array - one
+    driver at a time, in the same layout as json.dump(..., indent=2), so
+    no dict copy of the whole driver list is ever built."""
+    with open(manifest_path, 'wb') as f:
+        # Header without its closing brace
+        f.write(_pretty_json(header)[:-2])
+        f.write(b',\n  "drivers": [')
+        sep = b'\n    '
+        for d in drivers:
+            f.write(sep)
+            f.write(_pretty_json(d.to_dict()).replace(b'\n', b'\n    '))
+            sep = b',\n    '
+        f.write(b'\n  ]\n}' if drivers else b']\n}')
+
 def main():
     print(f"Scanning kernel source: {KERNEL_SRC}")
     
@@ -136,7 +418,7 @@ def main():
         print("Run inside Docker container with kernel source mounted.")
         return
     
-    drivers = scan_drivers(KERNEL_SRC)
+    drivers = scan_drivers(KERNEL_SRC, cache_path=SCAN_CACHE_PATH)
     
     # Summary stats
     total_pci = sum(len(d.pci_ids) for d in drivers)
@@ -159,16 +441,13 @@ def main():
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
     manifest_path = OUTPUT_DIR / "driver_manifest.json"
     
-    manifest = {
+    header = {
         "kernel_version": "6.6.70",
         "driver_count": len(drivers),
         "pci_id_count": total_pci,
         "usb_id_count": total_usb,
-        "drivers": [asdict(d) for d in drivers]
     }
-    
-    with open(manifest_path, 'w') as f:
-        json.dump(manifest, f, indent=2)
+    write_manifest(manifest_path, header, drivers)
     
     print(f"\nManifest saved: {manifest_path}")
 
@@ -22,6 +22,16 @@ if [[ -z "$MACHINE_ID" ]]; then
 fi
 
 MACHINE_JSON="$MACHINES_DIR/${MACHINE_ID}.json"
+MACHINES_JSONL="$MACHINES_DIR/machines.jsonl"
+
+# The Architect writes a single machines.jsonl by default; materialize this
+# machine's record as a standalone file for the steps below.
+if [[ ! -f "$MACHINE_JSON" && -f "$MACHINES_JSONL" ]]; then
+    mkdir -p "$BUILD_DIR/${MACHINE_ID}"
+    MACHINE_JSON="$BUILD_DIR/${MACHINE_ID}/machine.json"
+    grep -F "\"machine_id\":\"${MACHINE_ID}\"" "$MACHINES_JSONL" | head -n 1 > "$MACHINE_JSON"
+    [[ -s "$MACHINE_JSON" ]] || rm -f "$MACHINE_JSON"
+fi
 
 if [[ ! -f "$MACHINE_JSON" ]]; then
     echo "ERROR: Machine config not found: $MACHINE_JSON"
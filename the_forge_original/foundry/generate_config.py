@@ -4,12 +4,23 @@ Kernel Config Generator
 Reads machine JSON and generates a bespoke .config with only required drivers.
 """
 
+import functools
 import json
 import sys
 from pathlib import Path
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# Shared by every USB HID device; the tablet adds evdev
+USB_HID_BASE = frozenset(["CONFIG_USB_HID=y", "CONFIG_HID=y", "CONFIG_HID_GENERIC=y"])
+USB_TABLET = USB_HID_BASE | frozenset(["CONFIG_INPUT_EVDEV=y"])
+
 # Hardware → Kernel config mapping
-HARDWARE_CONFIG_MAP = {
+_RAW_HARDWARE_CONFIG_MAP = {
     "storage": {
         "virtio-blk": ["CONFIG_VIRTIO_BLK=y", "CONFIG_VIRTIO=y", "CONFIG_VIRTIO_PCI=y"],
         "ide-hd": ["CONFIG_ATA=y", "CONFIG_ATA_PIIX=y", "CONFIG_BLK_DEV_SD=y"],
@@ -33,9 +44,9 @@ HARDWARE_CONFIG_MAP = {
         "qemu-xhci": ["CONFIG_USB=y", "CONFIG_USB_XHCI_HCD=y"],
     },
     "usb_devices": {
-        "usb-kbd": ["CONFIG_USB_HID=y", "CONFIG_HID=y", "CONFIG_HID_GENERIC=y"],
-        "usb-mouse": ["CONFIG_USB_HID=y", "CONFIG_HID=y", "CONFIG_HID_GENERIC=y"],
-        "usb-tablet": ["CONFIG_USB_HID=y", "CONFIG_HID=y", "CONFIG_HID_GENERIC=y", "CONFIG_INPUT_EVDEV=y"],
+        "usb-kbd": USB_HID_BASE,
+        "usb-mouse": USB_HID_BASE,
+        "usb-tablet": USB_TABLET,
     },
     "gpu": {
         "std": ["CONFIG_DRM=y", "CONFIG_DRM_BOCHS=y"],
@@ -109,61 +120,59 @@ CONFIG_DEBUG_KERNEL=n
 CONFIG_DEBUG_INFO=n
 """
 
+# Parsed once at import: options as frozensets, unioned per machine
+# (frozenset() of a frozenset is that same object, so shared sets stay shared)
+BASE_CONFIG_SET = frozenset(
+    line.strip() for line in BASE_CONFIG.splitlines()
+    if line.strip() and not line.startswith('#')
+)
+HARDWARE_CONFIG_MAP = {
+    category: {hw: frozenset(options) for hw, options in variants.items()}
+    for category, variants in _RAW_HARDWARE_CONFIG_MAP.items()
+}
+_NONE = frozenset()
+
+
+def _hardware_key(machine: dict) -> tuple:
+    """The machine fields that select config options. Machines with the
+    same hardware (whatever their id or profile) share a key."""
+    return (
+        (machine.get("storage") or {}).get("type"),
+        (machine.get("network") or {}).get("type"),
+        machine.get("usb_controller"),
+        frozenset(d.get("type") for d in machine.get("usb_devices") or ()),
+        (machine.get("gpu") or {}).get("model"),
+        (machine.get("sound") or {}).get("model"),
+    )
+
+
+@functools.lru_cache(maxsize=1024)
+def _config_body(hardware_key: tuple) -> str:
+    """Sorted option lines for one hardware combination."""
+    storage, network, usb_controller, usb_devices, gpu, sound = hardware_key
+    config_options = set(BASE_CONFIG_SET)
+    config_options |= HARDWARE_CONFIG_MAP["storage"].get(storage, _NONE)
+    config_options |= HARDWARE_CONFIG_MAP["network"].get(network, _NONE)
+    config_options |= HARDWARE_CONFIG_MAP["usb_controller"].get(usb_controller, _NONE)
+    # usb_devices is a set of types: identical peripherals are merged once
+    for device_type in usb_devices:
+        config_options |= HARDWARE_CONFIG_MAP["usb_devices"].get(device_type, _NONE)
+    config_options |= HARDWARE_CONFIG_MAP["gpu"].get(gpu, _NONE)
+    config_options |= HARDWARE_CONFIG_MAP["sound"].get(sound, _NONE)
+    return "\n".join(sorted(config_options))
+
 
 def generate_config_for_machine(machine_json_path: Path) -> str:
     """Generate kernel .config for a specific machine."""
 
-    with open(machine_json_path) as f:
-        machine = json.load(f)
-
-    config_options = set()
-
-    # Start with base config
-    for line in BASE_CONFIG.strip().split('\n'):
-        if line.strip() and not line.startswith('#'):
-            config_options.add(line.strip())
-
-    # Storage
-    if storage := machine.get("storage"):
-        storage_type = storage.get("type")
-        if storage_type in HARDWARE_CONFIG_MAP["storage"]:
-            config_options.update(HARDWARE_CONFIG_MAP["storage"][storage_type])
-
-    # Network
-    if network := machine.get("network"):
-        network_type = network.get("type")
-        if network_type in HARDWARE_CONFIG_MAP["network"]:
-            config_options.update(HARDWARE_CONFIG_MAP["network"][network_type])
-
-    # USB controller
-    if usb_controller := machine.get("usb_controller"):
-        if usb_controller in HARDWARE_CONFIG_MAP["usb_controller"]:
-            config_options.update(HARDWARE_CONFIG_MAP["usb_controller"][usb_controller])
-
-    # USB devices
-    if usb_devices := machine.get("usb_devices"):
-        for device in usb_devices:
-            device_type = device.get("type")
-            if device_type in HARDWARE_CONFIG_MAP["usb_devices"]:
-                config_options.update(HARDWARE_CONFIG_MAP["usb_devices"][device_type])
-
-    # GPU
-    if gpu := machine.get("gpu"):
-        gpu_model = gpu.get("model")
-        if gpu_model in HARDWARE_CONFIG_MAP["gpu"]:
-            config_options.update(HARDWARE_CONFIG_MAP["gpu"][gpu_model])
-
-    # Sound
-    if sound := machine.get("sound"):
-        sound_model = sound.get("model")
-        if sound_model in HARDWARE_CONFIG_MAP["sound"]:
-            config_options.update(HARDWARE_CONFIG_MAP["sound"][sound_model])
+    data = Path(machine_json_path).read_bytes()
+    machine = orjson.loads(data) if HAS_ORJSON else json.loads(data)
 
     # Generate config file
     config_lines = ["# Generated config for machine: " + machine.get("machine_id", "unknown")]
     config_lines.append(f"# Profile: {machine.get('profile', 'unknown')}")
     config_lines.append("")
-    config_lines.extend(sorted(config_options))
+    config_lines.append(_config_body(_hardware_key(machine)))
 
     return "\n".join(config_lines) + "\n"
 
@@ -4,12 +4,13 @@ Scout Profile → Kernel Config Generator
 Converts Scout hardware profile to kernel .config
 """
 
+import functools
 import json
 import sys
 from pathlib import Path
 
 # Vendor/Device ID → Kernel Config mapping
-DRIVER_MAP = {
+_RAW_DRIVER_MAP = {
     # AMD Storage
     "1022:43f6": ["CONFIG_SATA_AHCI=y", "CONFIG_ATA=y"],
     "1022:7901": ["CONFIG_SATA_AHCI=y", "CONFIG_ATA=y"],
@@ -86,6 +87,39 @@ CONFIG_BINFMT_SCRIPT=y
 CONFIG_MODULES=n
 """
 
+# Parsed once at import into bitmasks over CONFIG_NAMES, which is sorted,
+# so a profile's options come out in order by walking its mask's set bits
+BASE_CONFIG_SET = frozenset(
+    line.strip() for line in BASE_CONFIG.strip().split('\n')
+    if line.strip() and not line.startswith('#') and '=' in line
+)
+CONFIG_NAMES = tuple(sorted(BASE_CONFIG_SET.union(*_RAW_DRIVER_MAP.values())))
+_CONFIG_BIT = {name: 1 << bit for bit, name in enumerate(CONFIG_NAMES)}
+BASE_CONFIG_MASK = sum(_CONFIG_BIT[name] for name in BASE_CONFIG_SET)
+
+
+def _pack_id(vendor_id: str, device_id: str) -> int:
+    return int(vendor_id, 16) << 16 | int(device_id, 16)
+
+
+# (vendor << 16 | device) -> mask of the options it needs
+DRIVER_MASKS = {
+    _pack_id(*dev_id.split(':')): sum(_CONFIG_BIT[name] for name in set(options))
+    for dev_id, options in _RAW_DRIVER_MAP.items()
+}
+
+
+@functools.lru_cache(maxsize=1024)
+def _config_body(mask: int) -> str:
+    """Option lines for one mask, in sorted order. Profiles from the same
+    hardware share the entry."""
+    lines = []
+    while mask:
+        low = mask & -mask
+        lines.append(CONFIG_NAMES[low.bit_length() - 1])
+        mask ^= low
+    return "\n".join(lines)
+
 
 def generate_config_from_scout(scout_json: Path) -> str:
     """Generate kernel config from Scout hardware profile"""
@@ -93,22 +127,19 @@ def generate_config_from_scout(scout_json: Path) -> str:
     with open(scout_json) as f:
         profile = json.load(f)
 
-    config_options = set()
-
-    # Start with base config
-    for line in BASE_CONFIG.strip().split('\n'):
-        if line.strip() and not line.startswith('#') and '=' in line:
-            config_options.add(line.strip())
-
     # Map PCI devices to drivers
     print(f"Analyzing {len(profile['pci_devices'])} PCI devices...", file=sys.stderr)
 
+    mask = BASE_CONFIG_MASK
     for device in profile['pci_devices']:
-        dev_id = f"{device['vendor_id']}:{device['device_id']}"
+        try:
+            device_mask = DRIVER_MASKS.get(_pack_id(device['vendor_id'], device['device_id']))
+        except (TypeError, ValueError):  # missing or non-hex ID
+            continue
 
-        if dev_id in DRIVER_MAP:
-            print(f"  {dev_id}: {device['description']}", file=sys.stderr)
-            config_options.update(DRIVER_MAP[dev_id])
+        if device_mask is not None:
+            print(f"  {device['vendor_id']}:{device['device_id']}: {device['description']}", file=sys.stderr)
+            mask |= device_mask
 
     # Generate header
     lines = [
@@ -119,7 +150,8 @@ def generate_config_from_scout(scout_json: Path) -> str:
         "",
     ]
 
-    lines.extend(sorted(config_options))
+    # Base config plus the matched devices' options
+    lines.append(_config_body(mask))
 
     return "\n".join(lines) + "\n"
 
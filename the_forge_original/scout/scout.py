@@ -14,14 +14,27 @@ import subprocess
 import json
 import hashlib
 import re
+import socket
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from typing import Optional, List, Dict
 import argparse
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
 
-@dataclass
+# /proc/cpuinfo fields, matched on the raw bytes
+_MODEL_RE = re.compile(rb'^model name\s*:\s*(.+)$', re.MULTILINE)
+_PHYS_RE = re.compile(rb'^physical id\s*:\s*(\d+)', re.MULTILINE)
+_PROC_RE = re.compile(rb'^processor\s*:', re.MULTILINE)
+
+
+@dataclass(slots=True)
 class DeviceInfo:
     """Generic device information"""
     vendor_id: Optional[str]
@@ -31,8 +44,11 @@ class DeviceInfo:
     device_class: Optional[str]
     description: str
 
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
 
-@dataclass
+@dataclass(slots=True)
 class MachineProfile:
     """Physical machine hardware profile"""
     machine_id: str
@@ -67,6 +83,14 @@ class MachineProfile:
     # ACPI (optional)
     acpi_tables: Optional[Dict[str, str]]
 
+    def to_dict(self) -> dict:
+        """Plain-dict form for the stdlib json fallback (a flat rebuild
+        instead of asdict's recursive deep copy)."""
+        d = {name: getattr(self, name) for name in self.__slots__}
+        d["pci_devices"] = [dev.to_dict() for dev in self.pci_devices]
+        d["usb_devices"] = [dev.to_dict() for dev in self.usb_devices]
+        return d
+
 
 def run_command(cmd: List[str], check=True) -> str:
     """Execute command and return output"""
@@ -87,7 +111,99 @@ def run_command(cmd: List[str], check=True) -> str:
         return ""
 
 
+SYSFS_PCI = Path("/sys/bus/pci/devices")
+
+# PCI class code (base class + subclass) -> lspci's class name, which is the
+# DeviceInfo description; anything else falls back to its base class name
+PCI_CLASS_NAMES = {
+    "0000": "Non-VGA unclassified device",
+    "0100": "SCSI storage controller",
+    "0101": "IDE interface",
+    "0104": "RAID bus controller",
+    "0106": "SATA controller",
+    "0107": "Serial Attached SCSI controller",
+    "0108": "Non-Volatile memory controller",
+    "0200": "Ethernet controller",
+    "0280": "Network controller",
+    "0300": "VGA compatible controller",
+    "0302": "3D controller",
+    "0380": "Display controller",
+    "0401": "Multimedia audio controller",
+    "0403": "Audio device",
+    "0500": "RAM memory",
+    "0600": "Host bridge",
+    "0601": "ISA bridge",
+    "0604": "PCI bridge",
+    "0680": "Bridge",
+    "0700": "Serial controller",
+    "0780": "Communication controller",
+    "0880": "System peripheral",
+    "0c03": "USB controller",
+    "0c05": "SMBus",
+    "1080": "Encryption controller",
+    "1180": "Signal processing controller",
+    "ff00": "Unassigned class",
+}
+PCI_BASE_CLASS_NAMES = {
+    "00": "Unclassified device",
+    "01": "Mass storage controller",
+    "02": "Network controller",
+    "03": "Display controller",
+    "04": "Multimedia controller",
+    "05": "Memory controller",
+    "06": "Bridge",
+    "07": "Communication controller",
+    "08": "Generic system peripheral",
+    "09": "Input device controller",
+    "0c": "Serial bus controller",
+    "0d": "Wireless controller",
+    "10": "Encryption controller",
+    "11": "Signal processing controller",
+    "12": "Processing accelerators",
+    "ff": "Unassigned class",
+}
+
+
+def _read_hex_id(path: Path) -> Optional[str]:
+    """A sysfs "0x8086"-style id file as lowercase hex without the prefix."""
+    try:
+        return path.read_text().strip().lower().removeprefix("0x")
+    except OSError:
+        return None
+
+
 def scan_pci_devices() -> List[DeviceInfo]:
+    """Scan PCI devices from sysfs, or with lspci where sysfs is absent"""
+    if not SYSFS_PCI.is_dir():
+        return scan_pci_devices_lspci()
+
+    devices = []
+    # Sorted by domain:bus:device.function, lspci's order (the machine ID
+    # fingerprints the first devices)
+    for dev_dir in sorted(SYSFS_PCI.iterdir()):
+        vendor_id = _read_hex_id(dev_dir / "vendor")
+        device_id = _read_hex_id(dev_dir / "device")
+        if not vendor_id or not device_id:
+            continue
+        pci_class = _read_hex_id(dev_dir / "class")
+        device_class = pci_class[:4] if pci_class else None
+        description = (PCI_CLASS_NAMES.get(device_class)
+                       or PCI_BASE_CLASS_NAMES.get((device_class or "")[:2])
+                       or f"Class {device_class}")
+
+        devices.append(DeviceInfo(
+            vendor_id=vendor_id,
+            device_id=device_id,
+            subsystem_vendor=_read_hex_id(dev_dir / "subsystem_vendor"),
+            subsystem_device=_read_hex_id(dev_dir / "subsystem_device"),
+            device_class=device_class,
+            description=description
+        ))
+
+    return devices
+
+
+def scan_pci_devices_lspci() -> List[DeviceInfo]:
     """Scan PCI devices using lspci"""
     devices = []
 
@@ -153,20 +269,51 @@ def scan_usb_devices() -> List[DeviceInfo]:
     return devices
 
 
+# MachineProfile attribute -> /sys/class/dmi/id file (readable without root)
+SYSFS_DMI = Path("/sys/class/dmi/id")
+SYSFS_DMI_FIELDS = {
+    "dmi_manufacturer": "sys_vendor",
+    "dmi_product": "product_name",
+    "dmi_version": "product_version",
+    "dmi_bios_vendor": "bios_vendor",
+    "dmi_bios_version": "bios_version",
+}
+
+# (dmidecode section title, field) -> MachineProfile attribute
+DMI_FIELDS = {
+    ("System Information", "Manufacturer"): "dmi_manufacturer",
+    ("System Information", "Product Name"): "dmi_product",
+    ("System Information", "Version"): "dmi_version",
+    ("BIOS Information", "Vendor"): "dmi_bios_vendor",
+    ("BIOS Information", "Version"): "dmi_bios_version",
+}
+
+
 def get_dmi_info() -> Dict[str, Optional[str]]:
     """Extract DMI/SMBIOS information"""
-    dmi = {}
-
-    # Try dmidecode (requires root)
-    for field, dmi_type in [
-        ("manufacturer", "system-manufacturer"),
-        ("product", "system-product-name"),
-        ("version", "system-version"),
-        ("bios_vendor", "bios-vendor"),
-        ("bios_version", "bios-version"),
-    ]:
-        value = run_command(["dmidecode", "-s", dmi_type], check=False).strip()
-        dmi[f"dmi_{field}"] = value if value else None
+    dmi = dict.fromkeys(DMI_FIELDS.values())
+
+    # The kernel exports the fields as plain files: no subprocess, no root
+    if SYSFS_DMI.is_dir():
+        for key, filename in SYSFS_DMI_FIELDS.items():
+            try:
+                dmi[key] = (SYSFS_DMI / filename).read_text().strip() or None
+            except OSError:
+                pass
+        return dmi
+
+    # Fallback: one dmidecode run (requires root) for every field. Section titles are
+    # unindented; their fields are "\tName: value" lines.
+    output = run_command(["dmidecode", "-t", "system", "-t", "bios"], check=False)
+    section = None
+    for line in output.splitlines():
+        if line and not line[0].isspace():
+            section = line.strip()
+        elif line.startswith("\t") and not line.startswith("\t\t") and ":" in line:
+            name, _, value = line.strip().partition(":")
+            key = DMI_FIELDS.get((section, name))
+            if key and dmi[key] is None:
+                dmi[key] = value.strip() or None
 
     return dmi
 
@@ -180,20 +327,18 @@ def get_cpu_info() -> Dict[str, any]:
     }
 
     try:
-        with open("/proc/cpuinfo", "r") as f:
-            content = f.read()
+        content = Path("/proc/cpuinfo").read_bytes()  # bytes: no decode pass
 
         # Extract model name
-        model_match = re.search(r'model name\s*:\s*(.+)', content)
+        model_match = _MODEL_RE.search(content)
         if model_match:
-            cpu_info["cpu_model"] = model_match.group(1).strip()
+            cpu_info["cpu_model"] = model_match.group(1).decode(errors="replace").strip()
 
         # Count physical cores and threads
-        physical_ids = set(re.findall(r'physical id\s*:\s*(\d+)', content))
+        physical_ids = set(_PHYS_RE.findall(content))
         cpu_info["cpu_cores"] = len(physical_ids) if physical_ids else 1
 
-        processors = len(re.findall(r'^processor\s*:', content, re.MULTILINE))
-        cpu_info["cpu_threads"] = processors
+        cpu_info["cpu_threads"] = sum(1 for _ in _PROC_RE.finditer(content))
 
     except FileNotFoundError:
         pass
@@ -253,8 +398,55 @@ def get_network_interfaces() -> List[Dict[str, str]]:
     return interfaces
 
 
+SYSFS_BLOCK = Path("/sys/class/block")
+
+
+def _human_size(nbytes: int) -> str:
+    """Byte count in lsblk's SIZE format: 1024-based, one decimal, "256G"."""
+    size = float(nbytes)
+    for unit in "BKMGTP":
+        if size < 1024 or unit == "P":
+            break
+        size /= 1024
+    text = f"{size:.1f}".removesuffix(".0")
+    return f"{text}{unit}"
+
+
 def get_block_devices() -> List[Dict[str, str]]:
-    """List block devices"""
+    """List disks from sysfs, or with lsblk where sysfs is absent.
+
+    Matches lsblk's default TYPE=disk rows: partitions, RAM disks, loop,
+    device-mapper and md devices and CD-ROMs (SCSI type 5) are skipped.
+    """
+    if not SYSFS_BLOCK.is_dir():
+        return get_block_devices_lsblk()
+
+    devices = []
+    for bd in sorted(SYSFS_BLOCK.iterdir()):
+        if (bd.name.startswith(("loop", "ram")) or (bd / "partition").exists()
+                or (bd / "dm").exists() or (bd / "md").exists()):
+            continue
+        try:
+            size_sectors = int((bd / "size").read_text())
+        except (OSError, ValueError):
+            continue
+        try:
+            if (bd / "device" / "type").read_text().strip() == "5":
+                continue
+        except OSError:
+            pass
+        try:
+            model = (bd / "device" / "model").read_text().strip() or "unknown"
+        except OSError:
+            model = "unknown"
+        # sysfs sizes are in 512-byte sectors regardless of the logical block size
+        devices.append({"name": bd.name, "size": _human_size(size_sectors * 512), "model": model})
+
+    return devices
+
+
+def get_block_devices_lsblk() -> List[Dict[str, str]]:
+    """List block devices using lsblk"""
     devices = []
 
     output = run_command(["lsblk", "-ndo", "NAME,SIZE,TYPE,MODEL"], check=False)
@@ -294,17 +486,17 @@ def dump_acpi_tables() -> Optional[Dict[str, str]]:
 
 def generate_machine_id(profile: MachineProfile) -> str:
     """Generate unique machine ID from hardware fingerprint"""
-    # Use DMI info + CPU + PCI devices for fingerprint
-    fingerprint = {
-        "dmi": (profile.dmi_manufacturer, profile.dmi_product, profile.dmi_version),
-        "cpu": profile.cpu_model,
-        "pci_devices": [(d.vendor_id, d.device_id) for d in profile.pci_devices[:10]],  # First 10
-    }
+    # Use DMI info + CPU + PCI devices for fingerprint. Not a security
+    # property, so a 6-byte BLAKE2b (12 hex chars) fed field by field.
+    h = hashlib.blake2b(digest_size=6)
+    for field in (profile.dmi_manufacturer, profile.dmi_product, profile.dmi_version,
+                  profile.cpu_model):
+        h.update((field or "").encode())
+        h.update(b"\x00")
+    for d in profile.pci_devices[:10]:  # First 10
+        h.update(bytes.fromhex((d.vendor_id or "0000") + (d.device_id or "0000")))
 
-    fingerprint_str = json.dumps(fingerprint, sort_keys=True)
-    machine_id = hashlib.sha256(fingerprint_str.encode()).hexdigest()[:12]
-
-    return machine_id
+    return h.hexdigest()
 
 
 def scan_machine(include_acpi: bool = False) -> MachineProfile:
@@ -313,41 +505,50 @@ def scan_machine(include_acpi: bool = False) -> MachineProfile:
     print("The Scout: Scanning hardware...", file=sys.stderr)
     print("", file=sys.stderr)
 
-    # Collect all information
-    dmi_info = get_dmi_info()
-    cpu_info = get_cpu_info()
-    memory_mb = get_memory_info()
+    # Every probe is an independent subprocess or /proc//sys read, so run
+    # them concurrently (subprocess waits release the GIL)
+    probes = {
+        "dmi": get_dmi_info,
+        "cpu": get_cpu_info,
+        "memory": get_memory_info,
+        "pci": scan_pci_devices,
+        "usb": scan_usb_devices,
+        "net": get_network_interfaces,
+        "blk": get_block_devices,
+    }
+    if include_acpi:
+        probes["acpi"] = dump_acpi_tables
+    with ThreadPoolExecutor(max_workers=len(probes)) as executor:
+        futures = {name: executor.submit(fn) for name, fn in probes.items()}
+        results = {name: future.result() for name, future in futures.items()}
+
+    dmi_info = results["dmi"]
+    cpu_info = results["cpu"]
+    memory_mb = results["memory"]
 
     print(f"System: {dmi_info.get('dmi_manufacturer', 'Unknown')} {dmi_info.get('dmi_product', 'Unknown')}", file=sys.stderr)
     print(f"CPU: {cpu_info['cpu_model']} ({cpu_info['cpu_threads']} threads)", file=sys.stderr)
     print(f"Memory: {memory_mb} MB", file=sys.stderr)
     print("", file=sys.stderr)
 
-    print("Scanning PCI devices...", file=sys.stderr)
-    pci_devices = scan_pci_devices()
+    pci_devices = results["pci"]
     print(f"  Found {len(pci_devices)} PCI devices", file=sys.stderr)
 
-    print("Scanning USB devices...", file=sys.stderr)
-    usb_devices = scan_usb_devices()
+    usb_devices = results["usb"]
     print(f"  Found {len(usb_devices)} USB devices", file=sys.stderr)
 
-    print("Scanning network interfaces...", file=sys.stderr)
-    network_interfaces = get_network_interfaces()
+    network_interfaces = results["net"]
     print(f"  Found {len(network_interfaces)} network interfaces", file=sys.stderr)
 
-    print("Scanning block devices...", file=sys.stderr)
-    block_devices = get_block_devices()
+    block_devices = results["blk"]
     print(f"  Found {len(block_devices)} block devices", file=sys.stderr)
 
-    acpi_tables = None
-    if include_acpi:
-        print("Dumping ACPI tables...", file=sys.stderr)
-        acpi_tables = dump_acpi_tables()
+    acpi_tables = results.get("acpi")
 
     print("", file=sys.stderr)
 
     # Create profile
-    hostname = run_command(["hostname"], check=False).strip() or "unknown"
+    hostname = socket.gethostname() or "unknown"
 
     profile = MachineProfile(
         machine_id="",  # Will be generated
@@ -398,19 +599,19 @@ def main():
     # Scan machine
     profile = scan_machine(include_acpi=args.dump_acpi)
 
-    # Convert to dict
-    profile_dict = asdict(profile)
-
-    # Output
-    indent = 2 if args.pretty else None
-    json_output = json.dumps(profile_dict, indent=indent)
+    # Output (orjson serializes the dataclasses directly)
+    if HAS_ORJSON:
+        json_output = orjson.dumps(profile, option=orjson.OPT_INDENT_2 if args.pretty else 0)
+    else:
+        indent = 2 if args.pretty else None
+        json_output = json.dumps(profile.to_dict(), indent=indent).encode()
 
     if args.output:
-        args.output.write_text(json_output)
+        args.output.write_bytes(json_output)
         print(f"Profile saved to: {args.output}", file=sys.stderr)
         print(f"Machine ID: {profile.machine_id}", file=sys.stderr)
     else:
-        print(json_output)
+        sys.stdout.buffer.write(json_output + b"\n")
 
 
 if __name__ == "__main__":
@@ -56,7 +56,7 @@ echo "  - images/build_info.json      Build metadata"
 echo ""
 echo "Generated Data:"
 echo "  - data/driver_manifest.json   Driver database"
-echo "  - machines/*.json             Machine configs ($(ls machines/*.json 2>/dev/null | wc -l) total)"
+echo "  - machines/machines.jsonl     Machine configs ($(cat machines/machines.jsonl 2>/dev/null | wc -l) total)"
 echo "  - results/summary.json        Test results"
 echo ""
 echo "Test Results:"